@@ -187,6 +187,131 @@ def init():
     asyncio.run(_init())
 
 
+@cli.command("napcat-replay")
+@click.argument("path", type=click.Path(exists=True))
+@click.option("--speed", type=float, default=0, help="回放倍速，1 为原速，0 为最快速度")
+@click.option(
+    "--target",
+    type=click.Choice(["pipeline", "handler"]),
+    default="pipeline",
+    help="pipeline: 完整接入流程；handler: 只解析事件并调用处理器",
+)
+@click.option("--workers", type=int, default=8, help="事件分发工作协程数量")
+@click.option("--handler-delay", type=float, default=0, help="模拟处理器耗时（毫秒）")
+@click.option("--output", type=click.Path(), help="把回放报告写入 JSON 文件")
+def napcat_replay(path, speed, target, workers, handler_delay, output):
+    """回放录制的 NapCat 上报数据并统计吞吐量与分发延迟"""
+    import json
+    from nekobot.core.platform.sources.napcat.napcat_capture import read_frames
+    from nekobot.core.platform.sources.napcat.napcat_connection import (
+        NapCatConnectionRegistry,
+    )
+    from nekobot.core.platform.sources.napcat.napcat_pipeline import (
+        NapCatEventPipeline,
+    )
+    from nekobot.core.platform.sources.napcat.napcat_replay import FrameReplayer
+
+    async def _replay(frames):
+        pipeline = NapCatEventPipeline(
+            workers=workers, registry=NapCatConnectionRegistry()
+        )
+
+        async def simulated_handler(event):
+            if handler_delay:
+                await asyncio.sleep(handler_delay / 1000)
+
+        pipeline.on_message(simulated_handler)
+        pipeline.on_notice(simulated_handler)
+        pipeline.on_request(simulated_handler)
+
+        return await FrameReplayer(target, pipeline).replay(frames, speed)
+
+    # 读取数据和写入报告都在事件循环之外进行，不阻塞回放
+    try:
+        frames = list(read_frames(path))
+        if not frames:
+            click.echo("没有可回放的数据")
+            return
+        click.echo(f"已读取 {len(frames)} 条上报数据，开始回放...")
+        report = asyncio.run(_replay(frames))
+    except Exception as e:
+        click.echo(f"回放时出错: {e}", err=True)
+        return
+
+    click.echo(json.dumps(report, ensure_ascii=False, indent=2))
+    if output:
+        Path(output).write_text(
+            json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        click.echo(f"回放报告已写入 {output}")
+
+
+@cli.command("napcat-loadgen")
+@click.option("--clients", type=int, default=4, help="模拟 NapCat 客户端（账号）数量")
+@click.option("--rate", type=float, default=1000, help="合计每秒上报的事件数")
+@click.option("--duration", type=float, default=30, help="上报持续时间（秒）")
+@click.option(
+    "--mix",
+    default="group=0.7,private=0.15,notice=0.1,heartbeat=0.05",
+    help="各类事件的比例",
+)
+@click.option("--reply-ratio", type=float, default=0.1, help="触发 send_group_msg 的群消息比例")
+@click.option(
+    "--api-transport",
+    type=click.Choice(["ws", "http"]),
+    default="ws",
+    help="出站调用方式",
+)
+@click.option("--workers", type=int, default=8, help="事件分发工作协程数量")
+@click.option("--output", type=click.Path(), help="把测试报告写入 JSON 文件")
+def napcat_loadgen(
+    clients, rate, duration, mix, reply_ratio, api_transport, workers, output
+):
+    """模拟多个 NapCat 客户端进行负载测试"""
+    import json
+    from nekobot.core.platform.sources.napcat.napcat_loadgen import LoadGenerator
+
+    try:
+        mix_ratios = {}
+        for item in mix.split(","):
+            kind, ratio = item.split("=")
+            mix_ratios[kind.strip()] = float(ratio)
+    except ValueError:
+        click.echo(f"无效的事件比例: {mix}", err=True)
+        return
+
+    unknown = set(mix_ratios) - {"group", "private", "notice", "heartbeat"}
+    if unknown:
+        click.echo(f"未知的事件类别: {', '.join(sorted(unknown))}", err=True)
+        return
+
+    click.echo(
+        f"开始负载测试: {clients} 个客户端, {rate:g} 事件/秒, 持续 {duration:g} 秒..."
+    )
+    generator = LoadGenerator(
+        clients=clients,
+        rate=rate,
+        duration=duration,
+        mix=mix_ratios,
+        reply_ratio=reply_ratio,
+        api_transport=api_transport,
+        workers=workers,
+    )
+
+    try:
+        report = asyncio.run(generator.run())
+    except Exception as e:
+        click.echo(f"负载测试时出错: {e}", err=True)
+        return
+
+    click.echo(json.dumps(report, ensure_ascii=False, indent=2))
+    if output:
+        Path(output).write_text(
+            json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        click.echo(f"测试报告已写入 {output}")
+
+
 if __name__ == "__main__":
     cli()
 
@@ -2,9 +2,12 @@
 平台适配器管理器
 """
 
-from typing import Dict, Optional
-from pathlib import Path
+import time
+import random
+import asyncio
+from typing import Dict, Any, Optional
 
+from nekobot.core.platform.registry import get_adapter_registry
 from nekobot.database.engine import get_db_manager
 from nekobot.database.models import PlatformAdapter
 from nekobot.utils.logger import get_logger
@@ -12,13 +15,39 @@ from sqlmodel import select
 
 logger = get_logger("adapter_manager")
 
+# 适配器状态
+STATE_DISCONNECTED = "disconnected"
+STATE_CONNECTING = "connecting"
+STATE_CONNECTED = "connected"
+STATE_FAILED = "failed"
+STATE_STOPPED = "stopped"
+
 
 class AdapterManager:
-    """平台适配器管理器"""
+    """
+    平台适配器管理器
+
+    负责适配器的完整生命周期：创建实例、订阅事件、启动时并发连接（每个适配器单独限时）、
+    定期并发健康检查，连接失败或检查失败的适配器在后台按指数退避重连。
+    运行中添加或移除的适配器同样会订阅 / 注销事件并连接 / 断开。
+    """
 
     def __init__(self):
         self.adapters: Dict[str, any] = {}
         self.db_manager = get_db_manager()
+        self.registry = get_adapter_registry()
+
+        self.connect_timeout = 10.0
+        self.health_interval = 30.0
+        self.health_timeout = 5.0
+        self.reconnect_initial = 1.0
+        self.reconnect_max = 60.0
+
+        self.running = False
+        self.event_handler = None
+        self._health_task: Optional[asyncio.Task] = None
+        self._reconnect_tasks: Dict[str, asyncio.Task] = {}
+        self._connect_tasks: Dict[str, asyncio.Task] = {}
         logger.info("平台适配器管理器初始化完成")
 
     async def load_adapters_from_db(self):
@@ -44,22 +73,269 @@ class AdapterManager:
     async def _load_adapter(self, adapter_config):
         """加载单个适配器"""
         platform_type = adapter_config.platform_type.lower()
-        adapter_path = (
-            Path("nekobot/core/platform/sources") / platform_type
-        )
-
-        if not adapter_path.exists():
-            logger.warning(f"平台适配器目录不存在: {platform_type}")
+        if not self.registry.is_registered(platform_type):
+            logger.warning(f"未注册的平台适配器类型: {platform_type}")
             return False
 
+        # 只有启用的适配器才导入适配器模块
+        instance = None
+        if adapter_config.is_active:
+            instance = self.registry.create(platform_type, adapter_config.config)
+
         logger.info(f"平台适配器 {adapter_config.name} 配置已加载")
         self.adapters[adapter_config.name] = {
             "type": platform_type,
             "config": adapter_config.config,
             "is_active": adapter_config.is_active,
+            "instance": instance,
+            "state": STATE_DISCONNECTED,
+            "connect_latency_ms": None,
+            "connected_since": None,
+            "last_error": None,
+            "last_check": None,
+            "failures": 0,
+            "reconnects": 0,
         }
+        self._bind(adapter_config.name)
+        return True
+
+    def bind_events(self, event_handler):
+        """
+        让所有适配器订阅事件（之后添加的适配器会自动订阅）
+
+        Args:
+            event_handler: 接收平台事件的 EventHandler
+        """
+        self.event_handler = event_handler
+        for name in self.adapters:
+            self._bind(name)
+
+    def _bind(self, name: str):
+        """让一个适配器订阅事件（重复调用时先注销之前的订阅）"""
+        instance = self.adapters[name].get("instance")
+        if self.event_handler is None or not hasattr(instance, "bind_events"):
+            return
+        self._unbind(name)
+        instance.bind_events(self.event_handler)
+
+    def _unbind(self, name: str):
+        """注销一个适配器订阅的事件"""
+        instance = self.adapters[name].get("instance")
+        if hasattr(instance, "unbind_events"):
+            instance.unbind_events()
+
+    async def start(
+        self,
+        connect_timeout: float = 10.0,
+        health_interval: float = 30.0,
+        health_timeout: float = 5.0,
+        reconnect_initial: float = 1.0,
+        reconnect_max: float = 60.0,
+    ):
+        """
+        并发连接所有已加载的适配器，并启动健康检查
+
+        连接失败的适配器不会阻塞启动，而是在后台重连。
+
+        Args:
+            connect_timeout: 单个适配器的连接超时时间（秒）
+            health_interval: 健康检查间隔（秒），0 表示不检查
+            health_timeout: 单个适配器的健康检查超时时间（秒）
+            reconnect_initial: 首次重连的最大等待时间（秒）
+            reconnect_max: 重连等待时间上限（秒）
+        """
+        self.connect_timeout = connect_timeout
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.reconnect_initial = reconnect_initial
+        self.reconnect_max = reconnect_max
+        self.running = True
+
+        names = [n for n, a in self.adapters.items() if a.get("instance") is not None]
+        started = time.monotonic()
+        results = await asyncio.gather(*(self._connect(name) for name in names))
+        logger.info(
+            f"平台适配器连接完成: {sum(results)}/{len(names)} 个成功，"
+            f"用时 {time.monotonic() - started:.2f} 秒"
+        )
+
+        if self.health_interval > 0 and self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def stop(self, timeout: float = 10.0):
+        """
+        停止健康检查与重连，并断开所有适配器
+
+        Args:
+            timeout: 等待所有适配器断开的最长时间（秒）
+        """
+        self.running = False
+        tasks = list(self._reconnect_tasks.values()) + list(
+            self._connect_tasks.values()
+        )
+        if self._health_task is not None:
+            tasks.append(self._health_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._health_task = None
+        self._reconnect_tasks.clear()
+        self._connect_tasks.clear()
+
+        names = [n for n, a in self.adapters.items() if a.get("instance") is not None]
+        if not names:
+            return
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(self._disconnect(name) for name in names)), timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"等待平台适配器断开超时（{timeout} 秒）")
+
+    async def _connect(self, name: str, reconnect: bool = True) -> bool:
+        """
+        连接一个适配器
+
+        Args:
+            name: 适配器名称
+            reconnect: 失败时是否安排后台重连
+
+        Returns:
+            是否连接成功
+        """
+        adapter = self.adapters.get(name)
+        if adapter is None or adapter.get("instance") is None:
+            return False
+
+        adapter["state"] = STATE_CONNECTING
+        started = time.monotonic()
+        try:
+            connected = await asyncio.wait_for(
+                adapter["instance"].connect(), self.connect_timeout
+            )
+            if connected is False:
+                raise ConnectionError("连接失败")
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                error = f"连接超时（{self.connect_timeout} 秒）"
+            else:
+                error = str(e) or e.__class__.__name__
+            self._mark_failed(name, error, reconnect)
+            return False
+
+        adapter["state"] = STATE_CONNECTED
+        adapter["connect_latency_ms"] = round((time.monotonic() - started) * 1000, 1)
+        adapter["connected_since"] = time.time()
+        adapter["last_error"] = None
+        adapter["failures"] = 0
+        logger.info(f"平台适配器已连接: {name} ({adapter['connect_latency_ms']} ms)")
         return True
 
+    def _connect_in_background(self, name: str):
+        """在后台连接一个适配器（保存任务引用，移除适配器或停止时取消）"""
+        if name in self._connect_tasks:
+            return
+        task = asyncio.create_task(self._connect(name))
+        self._connect_tasks[name] = task
+
+        def done(finished: asyncio.Task):
+            if self._connect_tasks.get(name) is finished:
+                del self._connect_tasks[name]
+            if not finished.cancelled() and finished.exception() is not None:
+                logger.error(f"连接平台适配器 {name} 时出错: {finished.exception()}")
+
+        task.add_done_callback(done)
+
+    async def _cancel_tasks(self, name: str):
+        """取消并等待一个适配器的连接和重连任务"""
+        tasks = [
+            task
+            for task in (
+                self._connect_tasks.pop(name, None),
+                self._reconnect_tasks.pop(name, None),
+            )
+            if task is not None
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _disconnect(self, name: str):
+        """断开一个适配器"""
+        adapter = self.adapters.get(name)
+        if adapter is None or adapter.get("instance") is None:
+            return
+        try:
+            await adapter["instance"].disconnect()
+        except Exception as e:
+            logger.warning(f"断开平台适配器失败 {name}: {e}")
+        adapter["state"] = STATE_STOPPED
+        adapter["connected_since"] = None
+
+    def _mark_failed(self, name: str, error: str, reconnect: bool = True):
+        """记录失败，必要时安排后台重连"""
+        adapter = self.adapters[name]
+        adapter["state"] = STATE_FAILED
+        adapter["connected_since"] = None
+        adapter["last_error"] = error
+        adapter["failures"] += 1
+        logger.warning(f"平台适配器 {name} 不可用: {error}")
+
+        if reconnect and self.running and name not in self._reconnect_tasks:
+            self._reconnect_tasks[name] = asyncio.create_task(self._reconnect(name))
+
+    async def _reconnect(self, name: str):
+        """按带随机抖动的指数退避重连，直到成功或适配器被移除"""
+        attempt = 0
+        try:
+            while self.running:
+                ceiling = min(self.reconnect_max, self.reconnect_initial * 2**attempt)
+                attempt += 1
+                await asyncio.sleep(random.uniform(0, ceiling))
+
+                adapter = self.adapters.get(name)
+                if adapter is None:
+                    return
+                adapter["reconnects"] += 1
+                if await self._connect(name, reconnect=False):
+                    return
+        finally:
+            if self._reconnect_tasks.get(name) is asyncio.current_task():
+                del self._reconnect_tasks[name]
+
+    async def _check(self, name: str):
+        """检查一个适配器"""
+        adapter = self.adapters[name]
+        instance = adapter["instance"]
+        adapter["last_check"] = time.time()
+        try:
+            healthy = await asyncio.wait_for(
+                instance.health_check(), self.health_timeout
+            )
+            error = None if healthy else "健康检查未通过"
+        except asyncio.TimeoutError:
+            error = f"健康检查超时（{self.health_timeout} 秒）"
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+
+        if error is not None and adapter["state"] == STATE_CONNECTED:
+            self._mark_failed(name, error)
+
+    async def _health_loop(self):
+        """定期并发检查所有已连接的适配器"""
+        while True:
+            await asyncio.sleep(self.health_interval)
+            names = [
+                name
+                for name, adapter in self.adapters.items()
+                if adapter["state"] == STATE_CONNECTED
+                and hasattr(adapter.get("instance"), "health_check")
+            ]
+            if names:
+                await asyncio.gather(
+                    *(self._check(name) for name in names), return_exceptions=True
+                )
+
     async def add_adapter(
         self, name: str, platform_type: str, config: Dict, is_active: bool = True
     ) -> bool:
@@ -76,6 +352,8 @@ class AdapterManager:
                 await session.commit()
 
             await self._load_adapter(adapter)
+            if self.running and self.adapters.get(name, {}).get("instance"):
+                self._connect_in_background(name)
             logger.info(f"平台适配器已添加: {name}")
             return True
 
@@ -87,6 +365,9 @@ class AdapterManager:
         """移除平台适配器"""
         try:
             if name in self.adapters:
+                await self._cancel_tasks(name)
+                self._unbind(name)
+                await self._disconnect(name)
                 del self.adapters[name]
 
             async with self.db_manager.async_session_maker() as session:
@@ -113,6 +394,30 @@ class AdapterManager:
         """获取所有平台适配器"""
         return self.adapters.copy()
 
+    def get_status(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        获取适配器的运行状态
+
+        Returns:
+            状态、连接耗时、已连接时长、最近错误等，适配器不存在时返回 None
+        """
+        adapter = self.adapters.get(name)
+        if adapter is None:
+            return None
+        connected_since = adapter.get("connected_since")
+        return {
+            "state": adapter.get("state", STATE_DISCONNECTED),
+            "connect_latency_ms": adapter.get("connect_latency_ms"),
+            "uptime": (
+                round(time.time() - connected_since, 1) if connected_since else None
+            ),
+            "last_error": adapter.get("last_error"),
+            "last_check": adapter.get("last_check"),
+            "consecutive_failures": adapter.get("failures", 0),
+            "reconnects": adapter.get("reconnects", 0),
+            "reconnecting": name in self._reconnect_tasks,
+        }
+
 
 # 全局适配器管理器实例
 _adapter_manager: Optional[AdapterManager] = None
@@ -124,4 +429,3 @@ def get_adapter_manager() -> AdapterManager:
     if _adapter_manager is None:
         _adapter_manager = AdapterManager()
     return _adapter_manager
-
@@ -9,11 +9,10 @@ from nekobot.database.models import User
 from nekobot.auth.jwt_auth import JWTAuth
 from nekobot.plugin.manager import get_plugin_manager
 from nekobot.llm.manager import get_llm_manager
+from nekobot.core.adapter_manager import get_adapter_manager
 from nekobot.web.app import create_app
 from nekobot.utils.logger import get_logger
-from nekobot.core.platform.sources.napcat.napcat_server import NapCatWebSocketServer
 from sqlmodel import select
-import asyncio
 
 logger = get_logger("bot")
 
@@ -27,8 +26,10 @@ class NekoBotCore:
         self.db_manager = get_db_manager()
         self.plugin_manager = get_plugin_manager()
         self.llm_manager = get_llm_manager()
+        self.adapter_manager = get_adapter_manager()
         self.app = None
         self.napcat_server = None
+        self.napcat_client = None
 
         logger.info("NekoBot 核心初始化完成")
         logger.info("配置热重载已启用")
@@ -52,8 +53,12 @@ class NekoBotCore:
         # 创建 Web 应用
         self.app = create_app()
 
-        # 初始化 NapCat WebSocket 服务器（如果启用）
+        # 初始化 NapCat WebSocket 服务器与客户端（如果启用）
         await self._init_napcat_server()
+        await self._init_napcat_client()
+
+        # 加载并连接平台适配器
+        await self._init_adapters()
 
         logger.info("NekoBot 初始化完成")
 
@@ -83,21 +88,117 @@ class NekoBotCore:
         ws_config = self.config_manager.get("websocket_server", {})
 
         if ws_config.get("enabled", False):
+            # 启用时才导入 NapCat 模块
+            from nekobot.core.platform.sources.napcat.napcat_server import (
+                NapCatWebSocketServer,
+                set_napcat_server,
+            )
+
             host = ws_config.get("host", "0.0.0.0")
             port = ws_config.get("port", 6299)
             token = ws_config.get("token")
+            # mount 为 true 时挂载到 Web 仪表盘所在的应用上，不再单独监听端口
+            mount = ws_config.get("mount", False)
+            path = ws_config.get("path", "/onebot/ws" if mount else "/ws")
 
             self.napcat_server = NapCatWebSocketServer(
-                host=host, port=port, access_token=token
+                host=host,
+                port=port,
+                access_token=token,
+                workers=ws_config.get("workers", 8),
+                queue_size=ws_config.get("queue_size", 1000),
+                conversation_size=ws_config.get("conversation_size", 100),
+                handler_timeout=ws_config.get("handler_timeout"),
+                heartbeat_max_missed=ws_config.get("heartbeat_max_missed", 2),
+                ingress=ws_config.get("ingress"),
+                capture=ws_config.get("capture"),
+                dedup=ws_config.get("dedup"),
+                app=self.app if mount else None,
+                path=path,
             )
+            set_napcat_server(self.napcat_server)
 
-            # 在后台启动服务器
-            asyncio.create_task(self.napcat_server.run())
-
-            logger.info(f"NapCat WebSocket 服务器已启动: ws://{host}:{port}/ws")
+            if mount:
+                server_host = self.config_manager.get("server.host", "0.0.0.0")
+                server_port = self.config_manager.get("server.port", 6285)
+                logger.info(
+                    f"NapCat WebSocket 服务器已挂载: ws://{server_host}:{server_port}{path}"
+                )
+            else:
+                # 在后台启动服务器
+                await self.napcat_server.start_background()
+                logger.info(f"NapCat WebSocket 服务器已启动: ws://{host}:{port}{path}")
         else:
             logger.info("NapCat WebSocket 服务器未启用")
 
+    async def _init_napcat_client(self):
+        """初始化 NapCat 正向 WebSocket 客户端"""
+        client_config = self.config_manager.get("websocket_client", {})
+
+        if not client_config.get("enabled", False):
+            return
+
+        from nekobot.core.platform.sources.napcat.napcat_client import (
+            NapCatWebSocketClient,
+            set_napcat_client,
+        )
+        from nekobot.core.platform.sources.napcat.napcat_pipeline import (
+            NapCatEventPipeline,
+        )
+
+        # 同时启用服务器时共用同一个接入流程（处理器、分发器）
+        if self.napcat_server:
+            pipeline = self.napcat_server.pipeline
+        else:
+            pipeline = NapCatEventPipeline(
+                workers=client_config.get("workers", 8),
+                queue_size=client_config.get("queue_size", 1000),
+                conversation_size=client_config.get("conversation_size", 100),
+                handler_timeout=client_config.get("handler_timeout"),
+                heartbeat_max_missed=client_config.get("heartbeat_max_missed", 2),
+                ingress=client_config.get("ingress"),
+                capture=client_config.get("capture"),
+                dedup=client_config.get("dedup"),
+            )
+
+        url = client_config.get("url", "ws://127.0.0.1:3001")
+        self.napcat_client = NapCatWebSocketClient(
+            url=url,
+            access_token=client_config.get("token"),
+            self_id=client_config.get("self_id"),
+            pipeline=pipeline,
+            reconnect_initial=client_config.get("reconnect_initial", 1.0),
+            reconnect_max=client_config.get("reconnect_max", 60.0),
+        )
+        set_napcat_client(self.napcat_client)
+
+        # 在后台连接 NapCat
+        self.napcat_client.start_background()
+
+        logger.info(f"NapCat WebSocket 客户端已启动: {url}")
+
+    async def _init_adapters(self):
+        """加载数据库中的平台适配器，并发连接并启动健康检查"""
+        await self.adapter_manager.load_adapters_from_db()
+
+        # NapCat 适配器订阅事件，用于失效缓存、记录消息（运行中添加的适配器同样会订阅）
+        pipeline = None
+        if self.napcat_server:
+            pipeline = self.napcat_server.pipeline
+        elif self.napcat_client:
+            pipeline = self.napcat_client.pipeline
+        if pipeline is not None:
+            self.adapter_manager.bind_events(pipeline.event_handler)
+
+        adapters_config = self.config_manager.get("adapters", {})
+        await self.adapter_manager.start(
+            connect_timeout=adapters_config.get("connect_timeout", 10.0),
+            health_interval=adapters_config.get("health_interval", 30.0),
+            health_timeout=adapters_config.get("health_timeout", 5.0),
+            reconnect_initial=adapters_config.get("reconnect_initial", 1.0),
+            reconnect_max=adapters_config.get("reconnect_max", 60.0),
+        )
+
     async def start(self):
         """启动 NekoBot"""
         await self.initialize()
@@ -121,6 +222,26 @@ class NekoBotCore:
         # 停止配置文件监控
         self.config_manager.stop_watching()
 
+        # 先关闭 NapCat：停止接收新事件并等待处理中的事件完成，
+        # 此时插件和数据库仍可用，处理器发出的回复不会丢失
+        drain_timeout = self.config_manager.get("websocket_server", {}).get(
+            "shutdown_timeout", 10.0
+        )
+        if self.napcat_client:
+            await self.napcat_client.pipeline.drain(drain_timeout)
+        if self.napcat_server:
+            await self.napcat_server.pipeline.drain(drain_timeout)
+
+        # 事件处理完毕后断开平台适配器（发送完排队中的消息），再关闭 NapCat 连接
+        await self.adapter_manager.stop()
+
+        if self.napcat_client:
+            await self.napcat_client.stop(drain_timeout=drain_timeout)
+            self.napcat_client.pipeline.close()
+            logger.info("NapCat WebSocket 客户端已关闭")
+        if self.napcat_server:
+            await self.napcat_server.stop(timeout=drain_timeout)
+
         # 卸载所有插件
         for plugin_name in list(self.plugin_manager.plugins.keys()):
             await self.plugin_manager.unload_plugin(plugin_name)
@@ -128,10 +249,6 @@ class NekoBotCore:
         # 关闭数据库连接
         await self.db_manager.close()
 
-        # 关闭 NapCat 服务器
-        if self.napcat_server:
-            logger.info("NapCat WebSocket 服务器已关闭")
-
         logger.info("NekoBot 已关闭")
 
 
@@ -0,0 +1,199 @@
+"""
+平台适配器注册表
+记录平台类型到适配器类的映射，适配器模块（及其依赖的 SDK）在第一次
+创建该类型的适配器时才导入
+"""
+
+import importlib
+from importlib.metadata import entry_points, EntryPoint
+from typing import Dict, Any, Optional, Union
+
+from nekobot.utils.logger import get_logger
+
+logger = get_logger("adapter_registry")
+
+# 第三方包通过该入口点组提供适配器，例如在 pyproject.toml 中:
+# [project.entry-points."nekobot.adapters"]
+# myplatform = "nekobot_myplatform.adapter:MyPlatformAdapter"
+ENTRY_POINT_GROUP = "nekobot.adapters"
+
+# 内置适配器："模块路径:类名"
+BUILTIN_ADAPTERS: Dict[str, str] = {
+    "napcat": "nekobot.core.platform.sources.napcat.napcat_adapter:NapCatAdapter",
+}
+
+AdapterTarget = Union[str, type, EntryPoint]
+
+
+class AdapterRegistry:
+    """
+    平台适配器注册表
+
+    适配器来源（后者覆盖前者）：
+    - builtin: 内置适配器
+    - entry_point: 已安装的包通过 "nekobot.adapters" 入口点提供的适配器
+    - plugin: 插件在 register() 中调用 register_adapter() 注册的适配器
+
+    注册时只记录 "模块路径:类名" 或入口点，不导入模块。
+    """
+
+    def __init__(self):
+        self._targets: Dict[str, AdapterTarget] = {}
+        self._sources: Dict[str, str] = {}
+        self._classes: Dict[str, type] = {}
+        self._entry_points_loaded = False
+
+        for platform_type, target in BUILTIN_ADAPTERS.items():
+            self._targets[platform_type] = target
+            self._sources[platform_type] = "builtin"
+
+    def _load_entry_points(self):
+        """读取入口点（只读取元数据，不导入模块）"""
+        if self._entry_points_loaded:
+            return
+        self._entry_points_loaded = True
+        try:
+            discovered = entry_points(group=ENTRY_POINT_GROUP)
+        except Exception as e:
+            logger.warning(f"读取适配器入口点失败: {e}")
+            return
+
+        for ep in discovered:
+            platform_type = ep.name.lower()
+            if self._sources.get(platform_type) == "plugin":
+                continue
+            if platform_type in self._targets:
+                logger.info(f"入口点 {ep.value} 覆盖平台类型 {platform_type}")
+            self._targets[platform_type] = ep
+            self._sources[platform_type] = "entry_point"
+            self._classes.pop(platform_type, None)
+
+    def register(
+        self, platform_type: str, target: AdapterTarget, source: str = "plugin"
+    ):
+        """
+        注册适配器
+
+        Args:
+            platform_type: 平台类型（不区分大小写）
+            target: 适配器类，或 "模块路径:类名" 字符串（推荐，用到时才导入）
+            source: 来源，用于展示
+        """
+        self._load_entry_points()
+        platform_type = platform_type.lower()
+        self._targets[platform_type] = target
+        self._sources[platform_type] = source
+        self._classes.pop(platform_type, None)
+        logger.info(f"平台适配器类型已注册: {platform_type} ({source})")
+
+    def unregister(self, platform_type: str):
+        """
+        注销适配器，被覆盖的入口点或内置适配器会重新生效
+
+        Args:
+            platform_type: 平台类型
+        """
+        platform_type = platform_type.lower()
+        self._classes.pop(platform_type, None)
+        if platform_type in BUILTIN_ADAPTERS:
+            self._targets[platform_type] = BUILTIN_ADAPTERS[platform_type]
+            self._sources[platform_type] = "builtin"
+        else:
+            self._targets.pop(platform_type, None)
+            self._sources.pop(platform_type, None)
+        # 下次查询时重新读取入口点
+        self._entry_points_loaded = False
+
+    def is_registered(self, platform_type: str) -> bool:
+        """平台类型是否有可用的适配器"""
+        self._load_entry_points()
+        return platform_type.lower() in self._targets
+
+    def get_class(self, platform_type: str) -> Optional[type]:
+        """
+        获取适配器类，第一次调用时导入适配器模块
+
+        Args:
+            platform_type: 平台类型
+
+        Returns:
+            适配器类，未注册时返回 None
+
+        Raises:
+            ImportError: 适配器模块或其依赖导入失败
+        """
+        self._load_entry_points()
+        platform_type = platform_type.lower()
+        cls = self._classes.get(platform_type)
+        if cls is not None:
+            return cls
+
+        target = self._targets.get(platform_type)
+        if target is None:
+            return None
+        if isinstance(target, EntryPoint):
+            cls = target.load()
+        elif isinstance(target, str):
+            module_name, _, attr = target.partition(":")
+            cls = getattr(importlib.import_module(module_name), attr)
+        else:
+            cls = target
+
+        self._classes[platform_type] = cls
+        logger.debug(f"平台适配器已导入: {platform_type} -> {cls.__module__}")
+        return cls
+
+    def create(self, platform_type: str, config: Dict[str, Any]):
+        """
+        创建适配器实例
+
+        Args:
+            platform_type: 平台类型
+            config: 适配器配置
+
+        Returns:
+            适配器实例，平台类型未注册时返回 None
+        """
+        cls = self.get_class(platform_type)
+        if cls is None:
+            return None
+        return cls(config or {})
+
+    def get_types(self) -> Dict[str, Dict[str, Any]]:
+        """获取所有已注册的平台类型及其来源、是否已导入"""
+        self._load_entry_points()
+        return {
+            platform_type: {
+                "source": self._sources[platform_type],
+                "loaded": platform_type in self._classes,
+            }
+            for platform_type in sorted(self._targets)
+        }
+
+
+# 全局适配器注册表
+_adapter_registry: Optional[AdapterRegistry] = None
+
+
+def get_adapter_registry() -> AdapterRegistry:
+    """获取适配器注册表实例"""
+    global _adapter_registry
+    if _adapter_registry is None:
+        _adapter_registry = AdapterRegistry()
+    return _adapter_registry
+
+
+def register_adapter(platform_type: str, target: AdapterTarget):
+    """
+    注册平台适配器（供插件调用）
+
+    Args:
+        platform_type: 平台类型
+        target: 适配器类，或 "模块路径:类名" 字符串
+    """
+    get_adapter_registry().register(platform_type, target, source="plugin")
+
+
+def unregister_adapter(platform_type: str):
+    """注销插件注册的平台适配器"""
+    get_adapter_registry().unregister(platform_type)
@@ -3,9 +3,18 @@ NapCat 平台适配器
 基于 OneBot V11 协议对接 QQ 个人号
 """
 
-import aiohttp
-from typing import Dict, Any, Optional, List
+import asyncio
+from typing import Dict, Any, Optional, List, Hashable, Iterable, Tuple, Callable
 from nekobot.utils.logger import get_logger
+from nekobot.core.platform.sources.napcat.napcat_transport import create_transport
+from nekobot.core.platform.sources.napcat.napcat_cache import MetadataCache
+from nekobot.core.platform.sources.napcat.napcat_members import GroupMemberDirectory
+from nekobot.core.platform.sources.napcat.napcat_history import MessageHistory
+from nekobot.core.platform.sources.napcat.napcat_outbound import (
+    OutboundScheduler,
+    PRIORITY_NORMAL,
+    PRIORITY_LOW,
+)
 
 logger = get_logger("napcat")
 
@@ -24,6 +33,24 @@ class NapCatAdapter:
                 - access_token: 访问令牌 (可选)
                 - ws_host: WebSocket 服务器地址 (用于接收消息)
                 - ws_port: WebSocket 服务器端口
+                - api_transport: API 调用方式，"http"（默认）或 "ws"（复用反向 WebSocket）
+                - self_id: 使用 ws 方式时对应的机器人 QQ 号（只有一个账号时可省略）
+                - api_timeout: 调用超时（秒，默认 10；http 方式为读取响应超时）
+                - connect_timeout: http 方式建立连接超时（秒，默认 3）
+                - http_pool_size: http 方式连接池大小（默认 32）
+                - http_keepalive: http 方式空闲连接保持时间（秒，默认 30）
+                - max_retries: http 方式暂时性故障的最大重试次数（默认 2）
+                - retry_backoff: http 方式首次重试前的等待时间（秒，默认 0.2）
+                - breaker_threshold: http 方式连续失败多少次后熔断（默认 5）
+                - breaker_reset: http 方式熔断后多久尝试恢复（秒，默认 30）
+                - outbound: 出站消息限速配置 (enabled / account_rate / account_burst /
+                  group_rate / group_burst / private_rate / private_burst /
+                  max_in_flight / coalesce)，默认关闭；coalesce 为消息合并配置，默认关闭
+                - cache: 群/好友信息缓存配置 (enabled / ttl / max_entries)，默认开启
+                - members: 群成员索引配置 (enabled / concurrency / refresh_delay)，
+                  开启后连接成功时在后台拉取所有群的成员，默认关闭
+                - history: 最近消息记录配置 (enabled / max_messages / max_bytes /
+                  max_conversations)，用于在本地响应 get_msg，默认开启
         """
         self.host = config.get("host", "localhost")
         self.port = config.get("port", 3000)
@@ -37,31 +64,182 @@ class NapCatAdapter:
         if self.access_token:
             self.headers["Authorization"] = f"Bearer {self.access_token}"
 
-        self.session: Optional[aiohttp.ClientSession] = None
+        self.transport = create_transport(config, self.base_url, self.headers)
         self.bot_info: Optional[Dict] = None
 
-        logger.info(f"NapCat 适配器初始化: {self.base_url}")
+        outbound = dict(config.get("outbound") or {})
+        self.outbound: Optional[OutboundScheduler] = None
+        # 默认关闭：开启后发送会按速率排队，已有部署不应在升级后被静默限速
+        if outbound.pop("enabled", False):
+            self.outbound = OutboundScheduler(
+                self._call_api, on_sent=self._record_sent, **outbound
+            )
+
+        cache = dict(config.get("cache") or {})
+        self.cache: Optional[MetadataCache] = None
+        if cache.pop("enabled", True):
+            self.cache = MetadataCache(**cache)
+
+        members = dict(config.get("members") or {})
+        self.members: Optional[GroupMemberDirectory] = None
+        if members.pop("enabled", False):
+            # 成员列表直接请求，不经过缓存，避免同时保存两份完整的成员数据
+            self.members = GroupMemberDirectory(
+                self.get_group_list,
+                lambda group_id: self._call_api(
+                    "get_group_member_list", {"group_id": group_id}
+                ),
+                **members,
+            )
+
+        history = dict(config.get("history") or {})
+        self.history: Optional[MessageHistory] = None
+        if history.pop("enabled", True):
+            self.history = MessageHistory(**history)
+
+        # bind_events() 注册的 (EventHandler, 处理函数)
+        self._bound_handlers: List[Tuple[Any, Callable]] = []
+
+        logger.info(f"NapCat 适配器初始化: {self.base_url} ({self.transport.name})")
 
     async def connect(self):
         """连接到 NapCat"""
-        self.session = aiohttp.ClientSession(headers=self.headers)
+        await self.transport.start()
 
         try:
             self.bot_info = await self.get_login_info()
+            if self.outbound and self.outbound.coalescer:
+                # 合并转发消息的节点以机器人自己的身份发送
+                self.outbound.coalescer.self_id = self.bot_info.get("user_id")
+                self.outbound.coalescer.nickname = (
+                    self.bot_info.get("nickname") or self.outbound.coalescer.nickname
+                )
             logger.info(
                 f"NapCat 连接成功 - 账号: {self.bot_info.get('nickname')} "
                 f"({self.bot_info.get('user_id')})"
             )
+            if self.members:
+                self.members.start()
             return True
         except Exception as e:
             logger.error(f"NapCat 连接失败: {e}")
             return False
 
-    async def disconnect(self):
-        """断开连接"""
-        if self.session:
-            await self.session.close()
-            logger.info("NapCat 连接已关闭")
+    async def disconnect(self, flush_timeout: float = 10.0):
+        """
+        断开连接
+
+        Args:
+            flush_timeout: 等待排队中的消息发送完毕的最长时间（秒）
+        """
+        if self.members:
+            await self.members.stop()
+        if self.outbound:
+            await self.outbound.flush(flush_timeout)
+            await self.outbound.stop()
+        await self.transport.close()
+        logger.info("NapCat 连接已关闭")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取适配器状态（传输层、熔断器）"""
+        return {
+            "bot_info": self.bot_info,
+            **self.transport.get_stats(),
+            "outbound": self.outbound.get_stats() if self.outbound else None,
+            "cache": self.cache.get_stats() if self.cache is not None else None,
+            "members": self.members.get_stats() if self.members else None,
+            "history": self.history.get_stats() if self.history is not None else None,
+        }
+
+    def bind_events(self, event_handler):
+        """
+        订阅事件：用群成员变动、管理员变动、群名片变更、新增好友等通知
+        失效缓存并更新群成员索引，记录收到的消息
+
+        Args:
+            event_handler: 接收该账号事件的 EventHandler
+        """
+
+        def own_event(raw_event: Dict[str, Any]) -> bool:
+            # 多个账号共用一个事件处理器时，只处理本账号的事件
+            self_id = self.bot_info.get("user_id") if self.bot_info else None
+            return self_id is None or raw_event.get("self_id") in (None, self_id)
+
+        if self.cache is not None or self.members is not None:
+
+            @event_handler.on_notice
+            async def _invalidate_cache(event):
+                raw_event = event.raw_event
+                if not own_event(raw_event):
+                    return
+                self_id = self.bot_info.get("user_id") if self.bot_info else None
+                if self.cache is not None:
+                    self.cache.on_notice(raw_event, self_id)
+                if self.members:
+                    self.members.on_notice(raw_event, self_id)
+
+            self._bound_handlers.append((event_handler, _invalidate_cache))
+
+        if self.history is not None:
+
+            @event_handler.on_message
+            async def _record_message(event):
+                if own_event(event.raw_event):
+                    self.history.record_event(event.raw_event)
+
+            self._bound_handlers.append((event_handler, _record_message))
+
+    def unbind_events(self):
+        """注销 bind_events() 注册的所有处理器"""
+        for event_handler, func in self._bound_handlers:
+            event_handler.remove_handler(func)
+        self._bound_handlers.clear()
+
+    async def _cached_call(
+        self,
+        endpoint: str,
+        args: tuple,
+        data: Optional[Dict] = None,
+        no_cache: bool = False,
+    ) -> Any:
+        """调用查询接口，开启缓存时优先返回缓存的结果"""
+        if self.cache is None:
+            return await self._call_api(endpoint, data)
+        return await self.cache.get(
+            endpoint, args, lambda: self._call_api(endpoint, data), refresh=no_cache
+        )
+
+    async def _send(
+        self, target: Hashable, action: str, data: Dict[str, Any], priority: int
+    ) -> Dict[str, Any]:
+        """发送消息，开启限速时经由出站调度器排队"""
+        if self.outbound is not None:
+            # 由调度器在实际发送后记录（合并发送时记录合并后的内容）
+            return await self.outbound.submit(target, action, data, priority)
+
+        result = await self._call_api(action, data)
+        self._record_sent(target, action, data, result)
+        return result
+
+    def _record_sent(
+        self, target: Hashable, action: str, params: Dict[str, Any], result: Any
+    ):
+        """把实际发出的消息写入最近消息记录"""
+        if self.history is None or not isinstance(result, dict):
+            return
+        message_id = result.get("message_id")
+        # 合并转发消息（messages 为节点列表）的内容无法按 get_msg 格式还原，不记录
+        if message_id is None or "message" not in params:
+            return
+        sender = {}
+        if self.bot_info:
+            sender = {
+                "user_id": self.bot_info.get("user_id"),
+                "nickname": self.bot_info.get("nickname"),
+            }
+        self.history.record_sent(
+            message_id, target[0], target[1], params["message"], sender
+        )
 
     async def _call_api(
         self, endpoint: str, data: Optional[Dict] = None
@@ -76,27 +254,21 @@ class NapCatAdapter:
         Returns:
             API 响应数据
         """
-        if not self.session:
-            raise RuntimeError("NapCat 未连接")
-
-        url = f"{self.base_url}/{endpoint}"
-
         try:
-            async with self.session.post(url, json=data or {}) as resp:
-                result = await resp.json()
+            result = await self.transport.call(endpoint, data)
 
-                if result.get("status") != "ok":
-                    logger.error(f"API 调用失败: {result}")
-                    raise Exception(f"API 错误: {result.get('message', 'Unknown')}")
+            if result.get("status") != "ok":
+                logger.error(f"API 调用失败: {result}")
+                raise Exception(f"API 错误: {result.get('message', 'Unknown')}")
 
-                return result.get("data", {})
+            return result.get("data", {})
 
         except Exception as e:
             logger.error(f"API 调用异常 [{endpoint}]: {e}")
             raise
 
     async def send_group_msg(
-        self, group_id: int, message: List[Dict]
+        self, group_id: int, message: List[Dict], priority: int = PRIORITY_NORMAL
     ) -> Dict[str, Any]:
         """
         发送群消息
@@ -104,6 +276,7 @@ class NapCatAdapter:
         Args:
             group_id: 群号
             message: 消息内容 (OneBot V11 消息段格式)
+            priority: 出站优先级 (PRIORITY_HIGH / PRIORITY_NORMAL / PRIORITY_LOW)
 
         Returns:
             包含 message_id 的字典
@@ -111,10 +284,10 @@ class NapCatAdapter:
         data = {"group_id": group_id, "message": message}
 
         logger.info(f"发送群消息 -> 群 {group_id}")
-        return await self._call_api("send_group_msg", data)
+        return await self._send(("group", group_id), "send_group_msg", data, priority)
 
     async def send_private_msg(
-        self, user_id: int, message: List[Dict]
+        self, user_id: int, message: List[Dict], priority: int = PRIORITY_NORMAL
     ) -> Dict[str, Any]:
         """
         发送私聊消息
@@ -122,6 +295,7 @@ class NapCatAdapter:
         Args:
             user_id: QQ 号
             message: 消息内容 (OneBot V11 消息段格式)
+            priority: 出站优先级 (PRIORITY_HIGH / PRIORITY_NORMAL / PRIORITY_LOW)
 
         Returns:
             包含 message_id 的字典
@@ -129,10 +303,16 @@ class NapCatAdapter:
         data = {"user_id": user_id, "message": message}
 
         logger.info(f"发送私聊消息 -> 用户 {user_id}")
-        return await self._call_api("send_private_msg", data)
+        return await self._send(
+            ("private", user_id), "send_private_msg", data, priority
+        )
 
     async def send_msg(
-        self, message_type: str, target_id: int, message: List[Dict]
+        self,
+        message_type: str,
+        target_id: int,
+        message: List[Dict],
+        priority: int = PRIORITY_NORMAL,
     ) -> Dict[str, Any]:
         """
         发送消息（通用）
@@ -141,6 +321,7 @@ class NapCatAdapter:
             message_type: 消息类型 ("group" 或 "private")
             target_id: 目标 ID (群号或 QQ 号)
             message: 消息内容
+            priority: 出站优先级 (PRIORITY_HIGH / PRIORITY_NORMAL / PRIORITY_LOW)
 
         Returns:
             包含 message_id 的字典
@@ -148,10 +329,38 @@ class NapCatAdapter:
         if message_type == "group":
             data = {"message_type": "group", "group_id": target_id, "message": message}
         else:
+            message_type = "private"
             data = {"message_type": "private", "user_id": target_id, "message": message}
 
         logger.info(f"发送{message_type}消息 -> {target_id}")
-        return await self._call_api("send_msg", data)
+        return await self._send((message_type, target_id), "send_msg", data, priority)
+
+    async def broadcast_group_msg(
+        self,
+        group_ids: Iterable[int],
+        message: List[Dict],
+        priority: int = PRIORITY_LOW,
+    ) -> Dict[int, Any]:
+        """
+        向多个群发送同一条消息
+
+        开启出站限速时消息以低优先级排队，按账号和群的限速尽快发送完毕，
+        不会挤占普通回复；未开启时直接并发发送。
+
+        Args:
+            group_ids: 群号列表
+            message: 消息内容
+            priority: 出站优先级，默认 PRIORITY_LOW
+
+        Returns:
+            群号 -> 发送结果（失败时为异常对象）
+        """
+        group_ids = list(group_ids)
+        results = await asyncio.gather(
+            *(self.send_group_msg(gid, message, priority) for gid in group_ids),
+            return_exceptions=True,
+        )
+        return dict(zip(group_ids, results))
 
     async def delete_msg(self, message_id: int) -> Dict[str, Any]:
         """
@@ -167,18 +376,78 @@ class NapCatAdapter:
         logger.info(f"撤回消息: {message_id}")
         return await self._call_api("delete_msg", data)
 
-    async def get_msg(self, message_id: int) -> Dict[str, Any]:
+    async def get_msg(self, message_id: int, no_cache: bool = False) -> Dict[str, Any]:
         """
         获取消息详情
 
+        最近收到和发出的消息直接从本地记录返回，不在记录中时再请求 NapCat。
+
         Args:
             message_id: 消息 ID
+            no_cache: 跳过本地记录，直接请求 NapCat
 
         Returns:
             消息详情
         """
+        if self.history is not None and not no_cache:
+            record = self.history.get(message_id)
+            if record is not None:
+                return record
+
         data = {"message_id": message_id}
-        return await self._call_api("get_msg", data)
+        result = await self._call_api("get_msg", data)
+        if self.history is not None and isinstance(result, dict):
+            self.history.add(result)
+        return result
+
+    async def get_reply_chain(
+        self, message_id: int, max_depth: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        获取消息的回复链
+
+        从指定消息开始，沿回复消息段依次获取被回复的消息，
+        消息在最近消息记录中时不需要请求 NapCat。
+
+        Args:
+            message_id: 起始消息 ID
+            max_depth: 最多获取多少条消息
+
+        Returns:
+            从起始消息到最早被回复的消息依次排列，获取失败的消息及其之前的部分会被省略
+        """
+        chain: List[Dict[str, Any]] = []
+        seen = set()
+        current: Optional[int] = message_id
+        while current is not None and current not in seen and len(chain) < max_depth:
+            seen.add(current)
+            try:
+                record = await self.get_msg(current)
+            except Exception as e:
+                logger.debug(f"获取被回复的消息 {current} 失败: {e}")
+                break
+            chain.append(record)
+
+            current = None
+            message = record.get("message")
+            if isinstance(message, list):
+                for seg in message:
+                    if seg.get("type") == "reply":
+                        reply_id = seg.get("data", {}).get("id")
+                        if reply_id is not None and str(reply_id).lstrip("-").isdigit():
+                            current = int(reply_id)
+                        break
+        return chain
+
+    async def health_check(self) -> bool:
+        """
+        检查 NapCat 是否在线
+
+        Returns:
+            QQ 账号在线且状态正常时返回 True
+        """
+        status = await self._call_api("get_status") or {}
+        return bool(status.get("online", True)) and status.get("good", True) is not False
 
     async def get_login_info(self) -> Dict[str, Any]:
         """
@@ -189,43 +458,56 @@ class NapCatAdapter:
         """
         return await self._call_api("get_login_info")
 
-    async def get_group_list(self) -> List[Dict[str, Any]]:
+    async def get_group_list(self, no_cache: bool = False) -> List[Dict[str, Any]]:
         """
         获取群列表
 
+        Args:
+            no_cache: 跳过缓存，重新获取
+
         Returns:
             群列表
         """
-        return await self._call_api("get_group_list")
+        return await self._cached_call("get_group_list", (), no_cache=no_cache)
 
-    async def get_group_info(self, group_id: int) -> Dict[str, Any]:
+    async def get_group_info(
+        self, group_id: int, no_cache: bool = False
+    ) -> Dict[str, Any]:
         """
         获取群信息
 
         Args:
             group_id: 群号
+            no_cache: 跳过缓存，重新获取
 
         Returns:
             群信息
         """
         data = {"group_id": group_id}
-        return await self._call_api("get_group_info", data)
+        return await self._cached_call(
+            "get_group_info", (int(group_id),), data, no_cache
+        )
 
-    async def get_group_member_list(self, group_id: int) -> List[Dict[str, Any]]:
+    async def get_group_member_list(
+        self, group_id: int, no_cache: bool = False
+    ) -> List[Dict[str, Any]]:
         """
         获取群成员列表
 
         Args:
             group_id: 群号
+            no_cache: 跳过缓存，重新获取
 
         Returns:
             群成员列表
         """
         data = {"group_id": group_id}
-        return await self._call_api("get_group_member_list", data)
+        return await self._cached_call(
+            "get_group_member_list", (int(group_id),), data, no_cache
+        )
 
     async def get_group_member_info(
-        self, group_id: int, user_id: int
+        self, group_id: int, user_id: int, no_cache: bool = False
     ) -> Dict[str, Any]:
         """
         获取群成员信息
@@ -233,21 +515,27 @@ class NapCatAdapter:
         Args:
             group_id: 群号
             user_id: QQ 号
+            no_cache: 跳过缓存，重新获取
 
         Returns:
             群成员信息
         """
         data = {"group_id": group_id, "user_id": user_id}
-        return await self._call_api("get_group_member_info", data)
+        return await self._cached_call(
+            "get_group_member_info", (int(group_id), int(user_id)), data, no_cache
+        )
 
-    async def get_friend_list(self) -> List[Dict[str, Any]]:
+    async def get_friend_list(self, no_cache: bool = False) -> List[Dict[str, Any]]:
         """
         获取好友列表
 
+        Args:
+            no_cache: 跳过缓存，重新获取
+
         Returns:
             好友列表
         """
-        return await self._call_api("get_friend_list")
+        return await self._cached_call("get_friend_list", (), no_cache=no_cache)
 
     async def set_group_ban(
         self, group_id: int, user_id: int, duration: int = 600
@@ -287,7 +575,11 @@ class NapCatAdapter:
             "reject_add_request": reject_add_request,
         }
         logger.info(f"踢出群成员: 群 {group_id}, 用户 {user_id}")
-        return await self._call_api("set_group_kick", data)
+        result = await self._call_api("set_group_kick", data)
+        if self.cache is not None:
+            self.cache.invalidate("get_group_member_list", int(group_id))
+            self.cache.invalidate("get_group_member_info", int(group_id), int(user_id))
+        return result
 
     async def set_group_card(
         self, group_id: int, user_id: int, card: str
@@ -305,7 +597,11 @@ class NapCatAdapter:
         """
         data = {"group_id": group_id, "user_id": user_id, "card": card}
         logger.info(f"设置群名片: 群 {group_id}, 用户 {user_id}")
-        return await self._call_api("set_group_card", data)
+        result = await self._call_api("set_group_card", data)
+        if self.cache is not None:
+            self.cache.invalidate("get_group_member_list", int(group_id))
+            self.cache.invalidate("get_group_member_info", int(group_id), int(user_id))
+        return result
 
     def build_text_message(self, text: str) -> List[Dict]:
         """
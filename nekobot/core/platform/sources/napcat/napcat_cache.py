@@ -0,0 +1,213 @@
+"""
+NapCat 元数据缓存
+缓存群列表、群信息、群成员、好友列表等查询结果，并根据通知事件精确失效
+"""
+
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Callable, Awaitable, Tuple
+
+from nekobot.utils.logger import get_logger
+
+logger = get_logger("napcat.cache")
+
+# 各接口的默认缓存时间（秒）
+DEFAULT_TTLS: Dict[str, float] = {
+    "get_group_list": 300.0,
+    "get_group_info": 300.0,
+    "get_group_member_list": 300.0,
+    "get_group_member_info": 60.0,
+    "get_friend_list": 300.0,
+}
+
+
+class _MethodStats:
+    """单个接口的缓存统计"""
+
+    __slots__ = ("hits", "misses", "shared", "invalidations")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.invalidations = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.shared
+        served = self.hits + self.shared
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            # 未命中但复用了其他协程正在进行的请求
+            "shared": self.shared,
+            "invalidations": self.invalidations,
+            "hit_ratio": round(served / lookups, 3) if lookups else 0.0,
+        }
+
+
+class MetadataCache:
+    """
+    元数据缓存
+
+    - 每个接口单独配置缓存时间，ttl 为 0 的接口不缓存
+    - 同一个键同时未命中时只发出一次请求，其余协程等待同一个结果（single-flight）
+    - 请求进行中被失效时，返回的结果不会写入缓存，避免用旧数据覆盖
+    - 条目总数超过 max_entries 时淘汰最久未使用的条目
+
+    返回的列表和字典是缓存中的同一个对象，调用方不要修改。
+    """
+
+    def __init__(
+        self, ttl: Optional[Dict[str, float]] = None, max_entries: int = 10000
+    ):
+        """
+        初始化缓存
+
+        Args:
+            ttl: 接口名 -> 缓存时间（秒），覆盖 DEFAULT_TTLS 中的默认值
+            max_entries: 最多缓存的条目数
+        """
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttl or {})
+        self.max_entries = max(1, max_entries)
+
+        # (接口名, *参数) -> (过期时间, 结果)
+        self._entries: OrderedDict = OrderedDict()
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self._stats: Dict[str, _MethodStats] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _stat(self, method: str) -> _MethodStats:
+        stats = self._stats.get(method)
+        if stats is None:
+            stats = self._stats[method] = _MethodStats()
+        return stats
+
+    async def get(
+        self,
+        method: str,
+        args: Tuple,
+        fetch: Callable[[], Awaitable[Any]],
+        refresh: bool = False,
+    ) -> Any:
+        """
+        读取缓存，未命中时调用 fetch 获取并写入缓存
+
+        Args:
+            method: 接口名
+            args: 接口参数（作为缓存键的一部分）
+            fetch: 获取数据的协程函数
+            refresh: 忽略已缓存的结果，重新获取
+
+        Returns:
+            接口返回的数据
+        """
+        ttl = self.ttls.get(method, 0)
+        if ttl <= 0:
+            return await fetch()
+
+        key = (method,) + tuple(args)
+        stats = self._stat(method)
+        now = time.monotonic()
+
+        if not refresh:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                stats.hits += 1
+                return entry[1]
+
+            future = self._inflight.get(key)
+            if future is not None:
+                stats.shared += 1
+                try:
+                    # shield: 某个等待者被取消时不影响请求本身和其他等待者
+                    return await asyncio.shield(future)
+                except asyncio.CancelledError:
+                    # 发起请求的协程被取消，由当前协程重新请求
+                    if not future.cancelled():
+                        raise
+
+        stats.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await fetch()
+        except BaseException as e:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # 标记异常已读取，没有其他等待者时不产生警告
+                future.exception()
+            raise
+
+        # 请求期间被失效（或被 refresh 取代）时不写入缓存
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        future.set_result(value)
+        return value
+
+    def invalidate(self, method: str, *args):
+        """
+        失效一个缓存条目
+
+        Args:
+            method: 接口名
+            *args: 接口参数
+        """
+        key = (method,) + args
+        removed = self._entries.pop(key, None) is not None
+        removed = self._inflight.pop(key, None) is not None or removed
+        if removed:
+            self._stat(method).invalidations += 1
+
+    def clear(self):
+        """清空缓存"""
+        self._entries.clear()
+        self._inflight.clear()
+
+    def on_notice(self, raw_event: Dict[str, Any], self_id: Optional[int] = None):
+        """
+        根据通知事件失效相关条目
+
+        Args:
+            raw_event: 通知事件的原始数据
+            self_id: 机器人 QQ 号，用于判断是否是机器人自己入群/退群
+        """
+        notice_type = raw_event.get("notice_type")
+        group_id = raw_event.get("group_id")
+        user_id = raw_event.get("user_id")
+
+        if notice_type in ("group_increase", "group_decrease"):
+            self.invalidate("get_group_member_list", group_id)
+            self.invalidate("get_group_member_info", group_id, user_id)
+            # 群人数变化
+            self.invalidate("get_group_info", group_id)
+            if self_id is not None and user_id == self_id:
+                self.invalidate("get_group_list")
+        elif notice_type in ("group_admin", "group_card"):
+            self.invalidate("get_group_member_list", group_id)
+            self.invalidate("get_group_member_info", group_id, user_id)
+        elif notice_type == "friend_add":
+            self.invalidate("get_friend_list")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "inflight": len(self._inflight),
+            "methods": {
+                method: stats.to_dict() for method, stats in self._stats.items()
+            },
+        }
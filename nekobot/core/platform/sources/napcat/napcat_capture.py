@@ -0,0 +1,175 @@
+"""
+NapCat 上报数据录制
+把收到的原始数据连同到达时间追加写入 gzip 压缩的 NDJSON 分段文件，供 napcat_replay 回放
+"""
+
+import gzip
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple, Union, Iterator
+
+from nekobot.utils.logger import get_logger
+from nekobot.core.platform.sources.napcat.napcat_codec import loads, dumps
+
+logger = get_logger("napcat.capture")
+
+SEGMENT_SUFFIX = ".ndjson.gz"
+
+
+class FrameRecorder:
+    """
+    上报数据录制器
+
+    每行一条记录：{"t": 到达时间戳, "frame": 原始上报数据}。
+    数据先写入内存缓冲区，缓冲区满或距上次写入超过 flush_interval 秒时
+    压缩为一个独立的 gzip 成员追加到文件末尾，进程意外退出也只会丢失缓冲区中的数据。
+    压缩和写文件在单独的写入线程中按顺序执行，record() 不会阻塞事件循环。
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path] = "data/napcat_capture",
+        segment_size_mb: float = 64,
+        buffer_size_kb: float = 256,
+        flush_interval: float = 1.0,
+    ):
+        """
+        初始化录制器
+
+        Args:
+            directory: 录制文件目录
+            segment_size_mb: 单个分段文件的最大（未压缩）大小，超过后切换新文件
+            buffer_size_kb: 内存缓冲区大小
+            flush_interval: 最长写入间隔（秒）
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_size = int(segment_size_mb * 1024 * 1024)
+        self.buffer_size = int(buffer_size_kb * 1024)
+        self.flush_interval = flush_interval
+
+        self._buffer: List[bytes] = []
+        self._buffered = 0
+        self._last_flush = time.time()
+        self._segment: Optional[Path] = None
+        self._segment_written = 0
+        self._segment_index = 0
+        self._writer = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="napcat-capture"
+        )
+
+        self.frames = 0
+        self.bytes = 0
+
+    def _new_segment(self) -> Path:
+        """生成新的分段文件路径"""
+        self._segment_index += 1
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        return self.directory / f"frames-{stamp}-{self._segment_index:04d}{SEGMENT_SUFFIX}"
+
+    def record(self, data: Union[str, bytes], arrived_at: Optional[float] = None):
+        """
+        录制一条上报数据
+
+        Args:
+            data: WebSocket 收到的原始数据
+            arrived_at: 到达时间戳，默认取当前时间
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        # NapCat 上报的是紧凑 JSON，含换行时重新编码以保证一行一条
+        if b"\n" in data:
+            data = dumps(loads(data))
+
+        line = b'{"t":%.6f,"frame":%s}\n' % (arrived_at or time.time(), data)
+        self._buffer.append(line)
+        self._buffered += len(line)
+        self.frames += 1
+
+        if (
+            self._buffered >= self.buffer_size
+            or time.time() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self):
+        """把缓冲区交给写入线程，追加到当前分段文件"""
+        self._last_flush = time.time()
+        if not self._buffer:
+            return
+
+        if self._segment is None or self._segment_written >= self.segment_size:
+            self._segment = self._new_segment()
+            self._segment_written = 0
+            logger.info(f"开始录制新的分段文件: {self._segment}")
+
+        chunk = b"".join(self._buffer)
+        self._writer.submit(self._write, self._segment, chunk)
+
+        self._segment_written += len(chunk)
+        self.bytes += len(chunk)
+        self._buffer = []
+        self._buffered = 0
+
+    @staticmethod
+    def _write(segment: Path, chunk: bytes):
+        """压缩并追加写入（在写入线程中执行）"""
+        try:
+            with open(segment, "ab") as f:
+                f.write(gzip.compress(chunk, compresslevel=3))
+        except Exception as e:
+            logger.error(f"写入录制文件失败: {segment}: {e}")
+
+    def close(self):
+        """写入剩余数据，并等待写入线程完成"""
+        self.flush()
+        self._writer.shutdown(wait=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取录制统计信息"""
+        return {
+            "directory": str(self.directory),
+            "segment": str(self._segment) if self._segment else None,
+            "frames": self.frames,
+            "bytes": self.bytes,
+        }
+
+
+def iter_segments(path: Union[str, Path]) -> List[Path]:
+    """
+    列出录制文件
+
+    Args:
+        path: 单个分段文件或录制目录
+
+    Returns:
+        按文件名（即录制时间）排序的分段文件列表
+    """
+    path = Path(path)
+    if path.is_dir():
+        return sorted(path.glob(f"*{SEGMENT_SUFFIX}"))
+    return [path]
+
+
+def read_frames(path: Union[str, Path]) -> Iterator[Tuple[float, bytes]]:
+    """
+    读取录制的上报数据
+
+    Args:
+        path: 单个分段文件或录制目录
+
+    Returns:
+        (到达时间戳, 原始上报数据) 迭代器
+    """
+    for segment in iter_segments(path):
+        with gzip.open(segment, "rb") as f:
+            try:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = loads(line)
+                    yield record["t"], dumps(record["frame"])
+            except EOFError:
+                # 录制进程意外退出时最后一个 gzip 成员可能不完整
+                logger.warning(f"分段文件不完整，已读取到末尾: {segment}")
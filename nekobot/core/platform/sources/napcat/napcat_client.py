@@ -0,0 +1,193 @@
+"""
+NapCat 正向 WebSocket 客户端
+由 NekoBot 主动连接 NapCat 的 WebSocket 服务，事件上报与 API 调用共用同一个连接
+"""
+
+import time
+import random
+import asyncio
+from typing import Dict, Any, Optional, Callable
+
+import aiohttp
+
+from nekobot.utils.logger import get_logger
+from nekobot.core.platform.sources.napcat.napcat_pipeline import NapCatEventPipeline
+
+logger = get_logger("napcat.client")
+
+
+class NapCatWebSocketClient:
+    """
+    NapCat 正向 WebSocket 客户端
+
+    连接断开后按带随机抖动的指数退避自动重连（full jitter），
+    避免多个实例在 NapCat 重启后同时重连。
+    收到的数据交给与反向 WebSocket 服务器相同的接入流程处理，
+    重连前后重复上报的事件由接入流程的去重窗口过滤。
+    """
+
+    def __init__(
+        self,
+        url: str,
+        access_token: Optional[str] = None,
+        self_id: Optional[int] = None,
+        pipeline: Optional[NapCatEventPipeline] = None,
+        reconnect_initial: float = 1.0,
+        reconnect_max: float = 60.0,
+    ):
+        """
+        初始化客户端
+
+        Args:
+            url: NapCat WebSocket 服务地址，例如 ws://127.0.0.1:3001
+            access_token: 访问令牌（可选）
+            self_id: 机器人 QQ 号，未指定时从首个事件中获取
+            pipeline: 事件接入流程，默认新建
+            reconnect_initial: 首次重连的最大等待时间（秒）
+            reconnect_max: 重连等待时间上限（秒）
+        """
+        self.url = url
+        self.access_token = access_token
+        self.self_id = self_id
+        self.pipeline = pipeline or NapCatEventPipeline()
+        self.event_handler = self.pipeline.event_handler
+        self.reconnect_initial = reconnect_initial
+        self.reconnect_max = reconnect_max
+
+        self.connected = False
+        self.connects = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self._attempt = 0
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+        logger.info(f"NapCat WebSocket 客户端初始化: {url}")
+
+    def _headers(self) -> Dict[str, str]:
+        """连接请求头"""
+        headers = {}
+        if self.access_token:
+            headers["Authorization"] = f"Bearer {self.access_token}"
+        if self.self_id:
+            headers["X-Self-ID"] = str(self.self_id)
+        return headers
+
+    def _next_delay(self) -> float:
+        """下一次重连前的等待时间（秒）"""
+        ceiling = min(self.reconnect_max, self.reconnect_initial * 2**self._attempt)
+        self._attempt += 1
+        return random.uniform(0, ceiling)
+
+    async def _session(self, session: aiohttp.ClientSession):
+        """建立一次连接并持续接收数据，直到连接断开"""
+        async with session.ws_connect(
+            self.url, headers=self._headers(), max_msg_size=0
+        ) as ws:
+            connection = self.pipeline.create_connection(
+                remote=self.url, self_id=self.self_id, sender=ws.send_str
+            )
+            self.pipeline.attach(connection)
+            self.connected = True
+            self.connects += 1
+            self._attempt = 0
+
+            try:
+                async for msg in ws:
+                    if msg.type in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                        await self.pipeline.handle_frame(connection, msg.data)
+                    elif msg.type == aiohttp.WSMsgType.ERROR:
+                        raise ws.exception()
+            finally:
+                self.connected = False
+                await self.pipeline.detach(connection)
+
+    async def run(self):
+        """运行客户端，断开后自动重连，直到调用 stop()"""
+        logger.info(f"NapCat WebSocket 客户端启动: {self.url}")
+        async with aiohttp.ClientSession() as session:
+            while not self._stopping:
+                started = time.time()
+                try:
+                    await self._session(session)
+                    self.last_error = "连接被对端关闭"
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.failures += 1
+                    self.last_error = str(e) or e.__class__.__name__
+
+                if self._stopping:
+                    break
+                # 连接保持过一段时间才断开，说明不是持续性故障，从头开始退避
+                if time.time() - started > self.reconnect_max:
+                    self._attempt = 0
+                delay = self._next_delay()
+                logger.warning(
+                    f"NapCat WebSocket 连接断开 ({self.last_error})，"
+                    f"{delay:.1f} 秒后重连"
+                )
+                await asyncio.sleep(delay)
+
+    def start_background(self):
+        """在后台启动客户端"""
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self, drain_timeout: Optional[float] = None):
+        """
+        停止客户端并断开连接
+
+        Args:
+            drain_timeout: 断开前等待已收到的事件处理完毕的最长时间（秒），
+                None 表示立即断开
+        """
+        self._stopping = True
+        if drain_timeout is not None:
+            await self.pipeline.drain(drain_timeout)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取客户端状态"""
+        return {
+            "url": self.url,
+            "connected": self.connected,
+            "connects": self.connects,
+            "failures": self.failures,
+            "reconnect_attempt": self._attempt,
+            "last_error": self.last_error,
+        }
+
+    def on_message(self, func: Optional[Callable] = None, **kwargs):
+        """注册消息处理器（装饰器）"""
+        return self.event_handler.on_message(func, **kwargs)
+
+    def on_notice(self, func: Optional[Callable] = None, **kwargs):
+        """注册通知处理器（装饰器）"""
+        return self.event_handler.on_notice(func, **kwargs)
+
+    def on_request(self, func: Optional[Callable] = None, **kwargs):
+        """注册请求处理器（装饰器）"""
+        return self.event_handler.on_request(func, **kwargs)
+
+
+# 全局 NapCat WebSocket 客户端实例（未启用时为 None）
+_napcat_client: Optional[NapCatWebSocketClient] = None
+
+
+def set_napcat_client(client: Optional[NapCatWebSocketClient]):
+    """设置全局 NapCat WebSocket 客户端实例"""
+    global _napcat_client
+    _napcat_client = client
+
+
+def get_napcat_client() -> Optional[NapCatWebSocketClient]:
+    """获取全局 NapCat WebSocket 客户端实例"""
+    return _napcat_client
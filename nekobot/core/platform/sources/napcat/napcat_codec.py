@@ -0,0 +1,113 @@
+"""
+OneBot JSON 编解码
+优先使用 orjson 或 msgspec，未安装时回退到标准库 json
+"""
+
+import json
+from typing import Any, Dict, Optional, Union
+
+from nekobot.utils.logger import get_logger
+
+logger = get_logger("napcat.codec")
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+class JsonCodec:
+    """标准库 json 编解码"""
+
+    name = "json"
+    decode_errors = (ValueError,)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        """解码 JSON"""
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        """编码为 UTF-8 JSON 字节串"""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode(
+            "utf-8"
+        )
+
+
+class OrjsonCodec(JsonCodec):
+    """orjson 编解码"""
+
+    name = "orjson"
+
+    def __init__(self):
+        self.decode_errors = (orjson.JSONDecodeError,)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return orjson.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+
+class MsgspecCodec(JsonCodec):
+    """msgspec 编解码"""
+
+    name = "msgspec"
+
+    def __init__(self):
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder()
+        self.decode_errors = (msgspec.DecodeError,)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return self._decoder.decode(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+
+_CODEC_CLASSES: Dict[str, Optional[type]] = {
+    "orjson": OrjsonCodec if orjson is not None else None,
+    "msgspec": MsgspecCodec if msgspec is not None else None,
+    "json": JsonCodec,
+}
+
+
+def get_available_codecs() -> Dict[str, JsonCodec]:
+    """获取当前环境中所有可用的编解码器"""
+    return {name: cls() for name, cls in _CODEC_CLASSES.items() if cls is not None}
+
+
+def get_codec(name: Optional[str] = None) -> JsonCodec:
+    """
+    获取编解码器
+
+    Args:
+        name: 编解码器名称 ("orjson" / "msgspec" / "json")，None 表示自动选择最快的可用实现
+
+    Returns:
+        编解码器实例
+    """
+    if name is not None:
+        cls = _CODEC_CLASSES.get(name)
+        if cls is None:
+            raise ValueError(f"JSON 编解码器不可用: {name}")
+        return cls()
+
+    for cls in _CODEC_CLASSES.values():
+        if cls is not None:
+            return cls()
+    return JsonCodec()
+
+
+# 默认编解码器
+codec = get_codec()
+loads = codec.loads
+dumps = codec.dumps
+DECODE_ERRORS = codec.decode_errors
+
+logger.debug(f"OneBot JSON 编解码器: {codec.name}")
@@ -0,0 +1,378 @@
+"""
+NapCat 连接状态
+记录每个 WebSocket 连接的心跳与在线状态，并按机器人账号（self_id）管理连接
+"""
+
+import time
+import asyncio
+import itertools
+from typing import Dict, Any, Optional, Union, List, Callable, Awaitable
+from nekobot.utils.logger import get_logger
+from nekobot.core.platform.sources.napcat.napcat_ingress import IngressQueue
+from nekobot.core.platform.sources.napcat.napcat_codec import dumps
+
+logger = get_logger("napcat.connection")
+
+# 心跳/生命周期元事件的特征串。JSON 字符串值中的引号一定被转义，
+# 因此未转义的特征串只可能出现在顶层字段上，可以在解码前安全地判断
+_META_MARKER = '"post_type":"meta_event"'
+_META_MARKER_BYTES = _META_MARKER.encode()
+
+# 超过此长度的数据不可能是心跳，直接走完整解析流程
+_META_FRAME_MAX_LENGTH = 512
+
+# 默认心跳间隔（秒），在收到第一个心跳前使用
+DEFAULT_HEARTBEAT_INTERVAL = 30.0
+
+_connection_ids = itertools.count(1)
+_echo_ids = itertools.count(1)
+
+
+def is_meta_frame(data: Union[str, bytes]) -> bool:
+    """
+    在解码前快速判断一条上报数据是否为元事件（心跳、生命周期）
+
+    Args:
+        data: WebSocket 收到的原始数据
+
+    Returns:
+        是否为元事件
+    """
+    if len(data) > _META_FRAME_MAX_LENGTH:
+        return False
+    if isinstance(data, bytes):
+        return _META_MARKER_BYTES in data
+    return _META_MARKER in data
+
+
+class NapCatConnection:
+    """单个 NapCat WebSocket 连接的状态"""
+
+    def __init__(
+        self,
+        remote: Optional[str] = None,
+        self_id: Optional[int] = None,
+        ingress: Optional[IngressQueue] = None,
+        sender: Optional[Callable[[str], Awaitable]] = None,
+    ):
+        """
+        初始化连接状态
+
+        Args:
+            remote: 对端地址
+            self_id: 机器人 QQ 号（来自 X-Self-ID 头，可能为空）
+            ingress: 入站队列，默认使用默认参数创建
+            sender: 向对端发送文本帧的协程函数
+        """
+        self.conn_id = next(_connection_ids)
+        self.remote = remote
+        self.self_id = self_id
+        self.account: Optional["NapCatAccount"] = None
+        self.connected_at = time.time()
+        self._sender = sender
+        self._pending: Dict[str, asyncio.Future] = {}
+
+        self.online = True
+        self.healthy = True
+        self.last_heartbeat: Optional[float] = None
+        self.heartbeat_interval = DEFAULT_HEARTBEAT_INTERVAL
+        self.missed_heartbeats = 0
+
+        self.ingress = ingress or IngressQueue()
+        self.last_frame_at: Optional[float] = None
+        self.frames_received = 0
+        self.heartbeats_received = 0
+        self.api_calls = 0
+        self.api_timeouts = 0
+
+    def on_frame(self):
+        """记录收到一条数据（任何数据都说明连接仍然存活）"""
+        self.frames_received += 1
+        self.last_frame_at = time.time()
+
+    async def send(self, data: str):
+        """
+        向对端发送数据（OneBot v11 要求使用文本帧）
+
+        Args:
+            data: 已编码的 JSON 文本
+        """
+        if self._sender is None:
+            raise RuntimeError(f"连接不支持发送数据: {self.describe()}")
+        await self._sender(data)
+
+    async def call_api(
+        self, action: str, params: Optional[Dict] = None, timeout: float = 10.0
+    ) -> Dict[str, Any]:
+        """
+        通过 WebSocket 调用 OneBot API
+
+        请求带有唯一的 echo，NapCat 的响应通过 resolve_response() 按 echo
+        找到对应的 Future，因此同一连接上可以同时有多个调用在进行。
+
+        Args:
+            action: API 名称
+            params: 请求参数
+            timeout: 超时时间（秒）
+
+        Returns:
+            NapCat 的原始响应（包含 status、retcode、data）
+        """
+        echo = str(next(_echo_ids))
+        future = asyncio.get_running_loop().create_future()
+        self._pending[echo] = future
+        self.api_calls += 1
+
+        try:
+            # 编解码器输出 UTF-8 字节串，直接发送会成为二进制帧
+            await self.send(
+                dumps({"action": action, "params": params or {}, "echo": echo}).decode(
+                    "utf-8"
+                )
+            )
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self.api_timeouts += 1
+            raise
+        finally:
+            self._pending.pop(echo, None)
+
+    def resolve_response(self, response: Dict[str, Any]) -> bool:
+        """
+        处理 API 响应
+
+        Args:
+            response: 解码后的响应数据
+
+        Returns:
+            是否匹配到了等待中的调用
+        """
+        future = self._pending.get(str(response.get("echo")))
+        if future is None or future.done():
+            return False
+        future.set_result(response)
+        return True
+
+    def fail_pending(self, reason: str = "连接已断开"):
+        """让所有等待中的 API 调用失败"""
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError(reason))
+        self._pending.clear()
+
+    def handle_meta_event(self, event_data: Dict[str, Any]):
+        """
+        处理元事件，只更新连接状态，不进入插件分发流程
+
+        Args:
+            event_data: 解码后的元事件数据
+        """
+        meta_event_type = event_data.get("meta_event_type")
+        if meta_event_type == "heartbeat":
+            self.heartbeats_received += 1
+            self.last_heartbeat = time.time()
+            interval = event_data.get("interval")
+            if interval:
+                self.heartbeat_interval = interval / 1000
+            status = event_data.get("status") or {}
+            self.online = status.get("online", True)
+
+            if not self.healthy:
+                self.healthy = True
+                logger.info(f"NapCat 连接心跳已恢复: {self.describe()}")
+            self.missed_heartbeats = 0
+
+        elif meta_event_type == "lifecycle":
+            sub_type = event_data.get("sub_type")
+            self.online = sub_type != "disable"
+            logger.info(f"NapCat 生命周期事件 [{sub_type}]: {self.describe()}")
+
+    def check_heartbeat(
+        self, max_missed: int = 2, now: Optional[float] = None
+    ) -> bool:
+        """
+        检查心跳是否超时
+
+        Args:
+            max_missed: 允许连续丢失的心跳数
+            now: 当前时间戳，默认取 time.time()
+
+        Returns:
+            连接是否健康
+        """
+        now = now or time.time()
+        # 积压时心跳可能被丢弃，因此以最近收到任意数据的时间为准
+        last = max(self.last_heartbeat or self.connected_at, self.last_frame_at or 0)
+        self.missed_heartbeats = int((now - last) / self.heartbeat_interval)
+
+        if self.missed_heartbeats > max_missed and self.healthy:
+            self.healthy = False
+            logger.warning(
+                f"NapCat 连接心跳超时: {self.describe()}, "
+                f"已丢失 {self.missed_heartbeats} 个心跳"
+            )
+        return self.healthy
+
+    def describe(self) -> str:
+        """连接的简短描述（用于日志）"""
+        return f"#{self.conn_id} {self.self_id or '-'}@{self.remote or '-'}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {
+            "conn_id": self.conn_id,
+            "self_id": self.self_id,
+            "remote": self.remote,
+            "connected_at": self.connected_at,
+            "online": self.online,
+            "healthy": self.healthy,
+            "last_heartbeat": self.last_heartbeat,
+            "heartbeat_interval": self.heartbeat_interval,
+            "missed_heartbeats": self.missed_heartbeats,
+            "frames_received": self.frames_received,
+            "heartbeats_received": self.heartbeats_received,
+            "api_calls": self.api_calls,
+            "api_timeouts": self.api_timeouts,
+            "api_pending": len(self._pending),
+            "ingress": self.ingress.get_stats(),
+        }
+
+
+class NapCatAccount:
+    """单个机器人账号的状态，跨越多次连接保留"""
+
+    def __init__(self, self_id: int):
+        self.self_id = self_id
+        self.connection: Optional[NapCatConnection] = None
+        self.first_seen = time.time()
+        self.connects = 0
+        self.disconnects = 0
+        self.events_received = 0
+        self.last_event_at: Optional[float] = None
+
+    @property
+    def is_connected(self) -> bool:
+        """账号当前是否有可用连接"""
+        return self.connection is not None
+
+    def on_event(self):
+        """记录收到一个（非元）事件"""
+        self.events_received += 1
+        self.last_event_at = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {
+            "self_id": self.self_id,
+            "connected": self.is_connected,
+            "first_seen": self.first_seen,
+            "connects": self.connects,
+            "disconnects": self.disconnects,
+            "events_received": self.events_received,
+            "last_event_at": self.last_event_at,
+            "connection": self.connection.to_dict() if self.connection else None,
+        }
+
+
+class NapCatConnectionRegistry:
+    """
+    连接注册表
+
+    以机器人 QQ 号（X-Self-ID 头或事件中的 self_id）为键管理连接，
+    使一个进程中的多个账号可以共用同一个反向 WebSocket 端口，
+    并把出站调用路由到对应账号的连接上。
+    """
+
+    def __init__(self):
+        self.connections: Dict[int, NapCatConnection] = {}
+        self.accounts: Dict[int, NapCatAccount] = {}
+
+    def add(self, connection: NapCatConnection):
+        """
+        登记新连接，已知 self_id 时立即绑定到账号
+
+        Args:
+            connection: 连接对象
+        """
+        self.connections[connection.conn_id] = connection
+        if connection.self_id is not None:
+            self.bind(connection, connection.self_id)
+
+    def bind(self, connection: NapCatConnection, self_id: int):
+        """
+        将连接绑定到账号
+
+        Args:
+            connection: 连接对象
+            self_id: 机器人 QQ 号
+        """
+        account = self.accounts.get(self_id)
+        if account is None:
+            account = NapCatAccount(self_id)
+            self.accounts[self_id] = account
+
+        if account.connection is not None and account.connection is not connection:
+            logger.warning(
+                f"账号 {self_id} 已有连接 {account.connection.describe()}，"
+                f"出站调用改用新连接 {connection.describe()}"
+            )
+
+        connection.self_id = self_id
+        connection.account = account
+        account.connection = connection
+        account.connects += 1
+        logger.info(f"NapCat 账号已上线: {self_id} ({connection.describe()})")
+
+    def remove(self, connection: NapCatConnection):
+        """
+        注销连接
+
+        Args:
+            connection: 连接对象
+        """
+        self.connections.pop(connection.conn_id, None)
+
+        account = connection.account
+        if account is None:
+            return
+        account.disconnects += 1
+        if account.connection is connection:
+            # 如果同一账号还有其他连接，改用其中一个
+            account.connection = next(
+                (c for c in self.connections.values() if c.account is account), None
+            )
+            if account.connection is None:
+                logger.info(f"NapCat 账号已离线: {account.self_id}")
+
+    def get(self, self_id: Optional[int] = None) -> Optional[NapCatConnection]:
+        """
+        获取账号的连接
+
+        Args:
+            self_id: 机器人 QQ 号，None 表示只有一个在线账号时返回它的连接
+
+        Returns:
+            连接对象，没有可用连接时返回 None
+        """
+        if self_id is not None:
+            account = self.accounts.get(self_id)
+            return account.connection if account else None
+
+        online = [a.connection for a in self.accounts.values() if a.connection]
+        return online[0] if len(online) == 1 else None
+
+    def get_accounts(self) -> List[Dict[str, Any]]:
+        """获取所有账号的状态"""
+        return [account.to_dict() for account in self.accounts.values()]
+
+
+# 全局连接注册表实例
+_connection_registry: Optional[NapCatConnectionRegistry] = None
+
+
+def get_connection_registry() -> NapCatConnectionRegistry:
+    """获取连接注册表实例"""
+    global _connection_registry
+    if _connection_registry is None:
+        _connection_registry = NapCatConnectionRegistry()
+    return _connection_registry
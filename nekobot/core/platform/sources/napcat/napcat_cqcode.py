@@ -0,0 +1,130 @@
+"""
+CQ 码解析
+用于处理 NapCat 以字符串格式（message_post_format = string）上报的消息
+"""
+
+from typing import Dict, Any, List
+
+_CQ_START = "[CQ:"
+
+
+def escape(text: str, escape_comma: bool = False) -> str:
+    """
+    转义 CQ 码特殊字符
+
+    Args:
+        text: 原始文本
+        escape_comma: 是否转义逗号（CQ 码参数值中需要）
+
+    Returns:
+        转义后的文本
+    """
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "[" in text:
+        text = text.replace("[", "&#91;")
+    if "]" in text:
+        text = text.replace("]", "&#93;")
+    if escape_comma and "," in text:
+        text = text.replace(",", "&#44;")
+    return text
+
+
+def unescape(text: str) -> str:
+    """
+    反转义 CQ 码特殊字符
+
+    Args:
+        text: 转义后的文本
+
+    Returns:
+        原始文本
+    """
+    if "&" not in text:
+        return text
+    return (
+        text.replace("&#44;", ",")
+        .replace("&#91;", "[")
+        .replace("&#93;", "]")
+        .replace("&amp;", "&")
+    )
+
+
+def _parse_cq_code(body: str) -> Dict[str, Any]:
+    """解析单个 CQ 码的内容（不含首尾的 "[CQ:" 和 "]"）"""
+    parts = body.split(",")
+    data = {}
+    for part in parts[1:]:
+        key, sep, value = part.partition("=")
+        if sep:
+            data[key] = unescape(value)
+    return {"type": parts[0], "data": data}
+
+
+def parse_cq_message(message: str) -> List[Dict[str, Any]]:
+    """
+    将 CQ 码字符串解析为 OneBot V11 消息段列表
+
+    单次扫描字符串，结果与数组格式上报的消息段结构一致，
+    例如 "[CQ:at,qq=123] 你好" 解析为
+    [{"type": "at", "data": {"qq": "123"}}, {"type": "text", "data": {"text": " 你好"}}]
+
+    Args:
+        message: CQ 码字符串
+
+    Returns:
+        消息段列表
+    """
+    segments = []
+    pos = 0
+    length = len(message)
+
+    while pos < length:
+        start = message.find(_CQ_START, pos)
+        if start < 0:
+            break
+
+        end = message.find("]", start)
+        if end < 0:
+            break
+
+        if start > pos:
+            segments.append(
+                {"type": "text", "data": {"text": unescape(message[pos:start])}}
+            )
+        segments.append(_parse_cq_code(message[start + 4 : end]))
+        pos = end + 1
+
+    if pos < length:
+        segments.append({"type": "text", "data": {"text": unescape(message[pos:])}})
+
+    return segments
+
+
+def to_cq_message(segments: List[Dict[str, Any]]) -> str:
+    """
+    将 OneBot V11 消息段列表序列化为 CQ 码字符串
+
+    Args:
+        segments: 消息段列表
+
+    Returns:
+        CQ 码字符串
+    """
+    parts = []
+    for seg in segments:
+        seg_type = seg.get("type")
+        data = seg.get("data") or {}
+
+        if seg_type == "text":
+            parts.append(escape(str(data.get("text", ""))))
+            continue
+
+        params = "".join(
+            f",{key}={escape(str(value), escape_comma=True)}"
+            for key, value in data.items()
+            if value is not None
+        )
+        parts.append(f"[CQ:{seg_type}{params}]")
+
+    return "".join(parts)
@@ -0,0 +1,168 @@
+"""
+NapCat 入站事件去重
+重连或多个连接上报同一账号时，同一事件可能到达多次，在分发前按时间窗口过滤
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Hashable, Tuple
+
+from nekobot.utils.logger import get_logger
+
+logger = get_logger("napcat.dedup")
+
+
+# 通知事件中区分不同事件的字段（都是标量，可以直接作为键的一部分）
+_NOTICE_KEY_FIELDS = (
+    "time",
+    "notice_type",
+    "sub_type",
+    "group_id",
+    "user_id",
+    "operator_id",
+    "target_id",
+    "message_id",
+    "duration",
+)
+
+
+def get_dedup_key(event_data: Dict[str, Any]) -> Optional[Tuple]:
+    """
+    获取事件的去重键
+
+    Args:
+        event_data: 解码后的事件数据
+
+    Returns:
+        - 消息: ("message", self_id, message_id)
+        - 请求: ("request", self_id, flag)，flag 是 NapCat 为每个请求生成的标识
+        - 通知: ("notice", self_id, time, notice_type, ...)，通知没有唯一 ID，
+          使用区分事件的字段（同一事件重复上报时这些字段完全相同）
+        - 其他事件返回 None（不去重）
+    """
+    post_type = event_data.get("post_type")
+    self_id = event_data.get("self_id")
+    if post_type == "message" or post_type == "message_sent":
+        message_id = event_data.get("message_id")
+        if message_id is None:
+            return None
+        return ("message", self_id, message_id)
+
+    if post_type == "request":
+        flag = event_data.get("flag")
+        if flag is None:
+            return None
+        return ("request", self_id, flag)
+
+    if post_type == "notice":
+        return ("notice", self_id) + tuple(
+            event_data.get(field) for field in _NOTICE_KEY_FIELDS
+        )
+
+    return None
+
+
+class DedupWindow:
+    """
+    有时间上限和容量上限的去重集合
+
+    每个类别（键的第一个元素）使用一个 OrderedDict，同一类别的键有效期相同，
+    插入顺序就是过期顺序，淘汰时只需从头部弹出，每次检查的均摊开销为 O(1)，
+    内存不超过 max_size 个键。
+
+    通知和请求没有唯一的消息 ID，键只能由时间（秒）、类型、QQ 号等字段组成，
+    同一秒内内容相同的合法事件（例如连续两次戳一戳）会得到相同的键，
+    因此它们使用短得多的有效期，只过滤多个连接同时上报的重复事件。
+    """
+
+    def __init__(
+        self, ttl: float = 300.0, notice_ttl: float = 10.0, max_size: int = 10000
+    ):
+        """
+        初始化去重窗口
+
+        Args:
+            ttl: 消息键的有效期（秒）
+            notice_ttl: 通知和请求键的有效期（秒）
+            max_size: 最多记住的键数量，超过时淘汰最早的键
+        """
+        self.ttl = ttl
+        self.notice_ttl = notice_ttl
+        self.max_size = max(1, max_size)
+        self._ttls = {"notice": notice_ttl, "request": notice_ttl}
+        # 类别 -> (键 -> 过期时间)
+        self._windows: Dict[Any, OrderedDict] = {}
+        self._size = 0
+
+        self.checked = 0
+        self.evicted = 0
+        self.hits: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _evict(self, now: float):
+        """淘汰过期的键和超出容量的键"""
+        for expires in self._windows.values():
+            while expires:
+                expire_at = next(iter(expires.values()))
+                if expire_at > now:
+                    break
+                expires.popitem(last=False)
+                self._size -= 1
+                self.evicted += 1
+
+        while self._size > self.max_size:
+            # 超出容量时淘汰最早过期的键
+            expires = min(
+                (w for w in self._windows.values() if w),
+                key=lambda w: next(iter(w.values())),
+            )
+            expires.popitem(last=False)
+            self._size -= 1
+            self.evicted += 1
+
+    def check(self, key: Hashable, now: Optional[float] = None) -> bool:
+        """
+        检查并记录键
+
+        Args:
+            key: 去重键，第一个元素作为类别（决定有效期和命中统计）
+            now: 当前时间戳，默认取 time.monotonic()
+
+        Returns:
+            True 表示窗口内已出现过（重复事件）
+        """
+        now = time.monotonic() if now is None else now
+        self.checked += 1
+
+        category = key[0] if isinstance(key, tuple) else "other"
+        expires = self._windows.get(category)
+        if expires is None:
+            expires = self._windows[category] = OrderedDict()
+
+        expire_at = expires.get(key)
+        if expire_at is not None and expire_at > now:
+            self.hits[category] = self.hits.get(category, 0) + 1
+            return True
+
+        if expire_at is not None:
+            # 已过期但尚未淘汰，重新插入到尾部
+            del expires[key]
+            self._size -= 1
+        expires[key] = now + self._ttls.get(category, self.ttl)
+        self._size += 1
+        self._evict(now)
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取去重统计信息"""
+        return {
+            "ttl": self.ttl,
+            "notice_ttl": self.notice_ttl,
+            "max_size": self.max_size,
+            "size": self._size,
+            "checked": self.checked,
+            "evicted": self.evicted,
+            "hits": dict(self.hits),
+        }
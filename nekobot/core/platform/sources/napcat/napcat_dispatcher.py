@@ -0,0 +1,208 @@
+"""
+NapCat 事件分发器
+使用有界的工作协程池并发处理事件，同一会话内的事件保持顺序
+"""
+
+import asyncio
+from collections import deque
+from typing import Dict, Any, Optional, List, Hashable, Deque
+from nekobot.utils.logger import get_logger
+from nekobot.core.platform.sources.napcat.napcat_event import NapCatEvent, EventHandler
+
+logger = get_logger("napcat.dispatcher")
+
+
+def get_conversation_key(event: NapCatEvent) -> Optional[Hashable]:
+    """
+    获取事件所属会话的键
+
+    Args:
+        event: 事件对象
+
+    Returns:
+        群聊为 ("group", self_id, group_id)，私聊为 ("private", self_id, user_id)，
+        无法归属会话的事件返回 None
+    """
+    raw_event = event.raw_event
+    group_id = raw_event.get("group_id")
+    if group_id:
+        return ("group", raw_event.get("self_id"), group_id)
+
+    user_id = raw_event.get("user_id")
+    if user_id:
+        return ("private", raw_event.get("self_id"), user_id)
+
+    return None
+
+
+class EventDispatcher:
+    """
+    事件分发器
+
+    每个会话（群或私聊）一个先进先出队列，同一会话的事件按到达顺序串行处理；
+    有事件待处理的会话排队等待空闲的工作协程，因此不同会话的事件并行处理，
+    一个会话的处理器很慢时只会积压这个会话自己的事件。
+    """
+
+    def __init__(
+        self,
+        event_handler: EventHandler,
+        workers: int = 8,
+        queue_size: int = 1000,
+        conversation_size: int = 100,
+    ):
+        """
+        初始化事件分发器
+
+        Args:
+            event_handler: 事件处理器
+            workers: 工作协程数量（同时处理的会话数上限）
+            queue_size: 所有会话合计最多积压的事件数
+            conversation_size: 单个会话最多积压的事件数，超过时丢弃该会话的新事件
+        """
+        self.event_handler = event_handler
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.conversation_size = max(1, min(conversation_size, self.queue_size))
+
+        self._conversations: Dict[Hashable, Deque[NapCatEvent]] = {}
+        self._ready: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self._space = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._queued = 0
+        self._unfinished = 0
+        self._sequence = 0
+        self._processed = 0
+        self._failed = 0
+        self._dropped = 0
+
+    @property
+    def is_running(self) -> bool:
+        """分发器是否已启动"""
+        return bool(self._tasks)
+
+    def start(self):
+        """启动工作协程（重复调用无副作用）"""
+        if self._tasks:
+            return
+
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(
+            f"事件分发器已启动: {self.workers} 个工作协程, 队列容量 {self.queue_size}, "
+            f"单个会话 {self.conversation_size}"
+        )
+
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待已投递的事件全部处理完毕（包括正在执行的处理器）
+
+        Args:
+            timeout: 最长等待时间（秒），None 表示一直等待
+
+        Returns:
+            是否在超时前处理完毕
+        """
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def stop(self):
+        """停止所有工作协程，未处理的事件将被丢弃"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._conversations.clear()
+        self._ready = asyncio.Queue()
+        self._queued = 0
+        self._unfinished = 0
+        self._idle.set()
+        self._space.set()
+        logger.info("事件分发器已停止")
+
+    async def dispatch(self, event: NapCatEvent) -> bool:
+        """
+        投递事件
+
+        只有所有会话合计积压达到 queue_size 时才会等待，从而把压力反馈给调用方
+        （即连接的入站队列转发协程，入站队列随之积压并按水位线丢弃；
+        WebSocket 读取协程不会因此停下）。单个会话积压达到 conversation_size 时
+        直接丢弃该会话的新事件，不会影响其他会话的投递。
+
+        Args:
+            event: 事件对象
+
+        Returns:
+            False 表示事件因所属会话积压过多被丢弃
+        """
+        if not self._tasks:
+            self.start()
+
+        key = get_conversation_key(event)
+        if key is None:
+            # 无法归属会话的事件互不相关，各自作为一个会话
+            self._sequence += 1
+            key = ("event", self._sequence)
+
+        events = self._conversations.get(key)
+        if events is not None and len(events) >= self.conversation_size:
+            self._dropped += 1
+            if self._dropped == 1:
+                logger.warning(f"会话 {key} 积压过多，开始丢弃该会话的新事件")
+            return False
+
+        while self._queued >= self.queue_size:
+            self._space.clear()
+            await self._space.wait()
+
+        # 等待期间会话可能已处理完毕并被移除
+        events = self._conversations.get(key)
+        if events is None:
+            events = self._conversations[key] = deque()
+            self._ready.put_nowait(key)
+        events.append(event)
+        self._queued += 1
+        self._unfinished += 1
+        self._idle.clear()
+        return True
+
+    async def _worker(self):
+        """工作协程：每次取一个有事件待处理的会话，处理其中最早的一个事件"""
+        while True:
+            key = await self._ready.get()
+            events = self._conversations[key]
+            event = events.popleft()
+            self._queued -= 1
+            self._space.set()
+            try:
+                await self.event_handler.handle_event(event)
+                self._processed += 1
+            except Exception as e:
+                self._failed += 1
+                logger.error(f"事件处理失败: {e}", exc_info=True)
+            finally:
+                # 处理完一个事件后排到队尾，避免繁忙的会话占住工作协程
+                if events:
+                    self._ready.put_nowait(key)
+                else:
+                    del self._conversations[key]
+                self._unfinished -= 1
+                if self._unfinished == 0:
+                    self._idle.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取分发器统计信息"""
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "conversation_size": self.conversation_size,
+            "queued": self._queued,
+            "conversations": len(self._conversations),
+            "processed": self._processed,
+            "failed": self._failed,
+            "dropped": self._dropped,
+        }
@@ -2,8 +2,25 @@
 NapCat 事件处理
 """
 
-from typing import Dict, Any, Optional, Callable, List
+import time
+import asyncio
+from typing import (
+    Dict,
+    Any,
+    Optional,
+    Callable,
+    List,
+    Iterable,
+    FrozenSet,
+    Tuple,
+    Union,
+    Set,
+)
 from enum import Enum
+from nekobot.utils.logger import get_logger
+from nekobot.core.platform.sources.napcat.napcat_cqcode import parse_cq_message
+
+logger = get_logger("napcat.event")
 
 
 class MessageType(str, Enum):
@@ -22,38 +39,169 @@ class PostType(str, Enum):
     META_EVENT = "meta_event"
 
 
+class _RawField:
+    """
+    事件字段描述符
+
+    读取时直接从原始事件数据中取值，不在实例上复制一份；
+    赋值时写回原始事件数据，保证 to_dict() 与属性一致。
+    这些字段取值不需要任何转换，原始事件数据本身就是缓存，
+    因此不再额外占用槽位；需要计算的派生值（如消息段索引）才缓存在槽位中。
+    """
+
+    __slots__ = ("key",)
+
+    def __init__(self):
+        self.key = ""
+
+    def __set_name__(self, owner, name: str):
+        self.key = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return obj.raw_event.get(self.key)
+
+    def __set__(self, obj, value):
+        obj.raw_event[self.key] = value
+
+
 class NapCatEvent:
-    """NapCat 事件基类"""
+    """
+    NapCat 事件基类
+
+    事件对象只持有原始事件数据，各字段通过 _RawField 按需读取，
+    并使用 __slots__ 避免为每个事件分配 __dict__。
+    """
+
+    __slots__ = ("raw_event",)
+
+    post_type = _RawField()
+    time = _RawField()
+    self_id = _RawField()
 
     def __init__(self, raw_event: Dict[str, Any]):
         self.raw_event = raw_event
-        self.post_type = raw_event.get("post_type")
-        self.time = raw_event.get("time")
-        self.self_id = raw_event.get("self_id")
 
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
         return self.raw_event
 
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.raw_event!r}>"
+
+
+class SegmentIndex:
+    """
+    消息段索引
+
+    单次遍历消息段，按类型分组并预先提取纯文本、@ 目标和回复 ID，
+    MessageEvent 的各个访问方法都从这里读取，不再重复遍历消息。
+    CQ 码字符串格式的消息会先解析为消息段，两种上报格式的结果一致。
+    """
+
+    __slots__ = ("by_type", "text", "at_targets", "at_all", "reply_ids")
+
+    def __init__(self, message: Any):
+        self.by_type: Dict[str, List[Dict[str, Any]]] = {}
+        self.at_targets: Set[int] = set()
+        self.at_all = False
+        self.reply_ids: List[int] = []
+
+        # 字符串格式上报的消息先解析为消息段
+        if isinstance(message, str):
+            message = parse_cq_message(message)
+
+        text_parts = []
+        if isinstance(message, list):
+            by_type = self.by_type
+            for seg in message:
+                seg_type = seg.get("type")
+                segs = by_type.get(seg_type)
+                if segs is None:
+                    by_type[seg_type] = [seg]
+                else:
+                    segs.append(seg)
+
+                if seg_type == "text":
+                    text_parts.append(seg.get("data", {}).get("text", ""))
+                elif seg_type == "at":
+                    qq = seg.get("data", {}).get("qq")
+                    if qq == "all":
+                        self.at_all = True
+                    elif qq:
+                        try:
+                            self.at_targets.add(int(qq))
+                        except (TypeError, ValueError):
+                            pass
+                elif seg_type == "reply":
+                    reply_id = seg.get("data", {}).get("id")
+                    if reply_id is not None:
+                        try:
+                            self.reply_ids.append(int(reply_id))
+                        except (TypeError, ValueError):
+                            pass
+
+        self.text = "".join(text_parts).strip()
+
+    def get(self, seg_type: str) -> List[Dict[str, Any]]:
+        """获取指定类型的消息段"""
+        return self.by_type.get(seg_type, [])
+
+    def get_data_field(self, seg_type: str, field: str) -> List[Any]:
+        """获取指定类型消息段的某个 data 字段（忽略空值）"""
+        result = []
+        for seg in self.by_type.get(seg_type, ()):
+            value = seg.get("data", {}).get(field)
+            if value:
+                result.append(value)
+        return result
+
 
 class MessageEvent(NapCatEvent):
     """消息事件"""
 
+    __slots__ = ("_segments",)
+
+    message_type = _RawField()
+    sub_type = _RawField()
+    message_id = _RawField()
+    user_id = _RawField()
+    raw_message = _RawField()
+    font = _RawField()
+
+    # 群消息特有字段（私聊消息中为 None）
+    group_id = _RawField()
+    anonymous = _RawField()
+
     def __init__(self, raw_event: Dict[str, Any]):
         super().__init__(raw_event)
-        self.message_type = raw_event.get("message_type")
-        self.sub_type = raw_event.get("sub_type")
-        self.message_id = raw_event.get("message_id")
-        self.user_id = raw_event.get("user_id")
-        self.message = raw_event.get("message")
-        self.raw_message = raw_event.get("raw_message")
-        self.font = raw_event.get("font")
-        self.sender = raw_event.get("sender", {})
-
-        # 群消息特有字段
-        if self.message_type == MessageType.GROUP:
-            self.group_id = raw_event.get("group_id")
-            self.anonymous = raw_event.get("anonymous")
+        self._segments: Optional[SegmentIndex] = None
+
+    @property
+    def message(self) -> Any:
+        """消息内容"""
+        return self.raw_event.get("message")
+
+    @message.setter
+    def message(self, value: Any):
+        self.raw_event["message"] = value
+        self._segments = None
+
+    @property
+    def sender(self) -> Dict[str, Any]:
+        """发送者信息（缺失时写入一个空字典，保证多次访问返回同一个对象）"""
+        sender = self.raw_event.get("sender")
+        if not isinstance(sender, dict):
+            sender = self.raw_event["sender"] = {}
+        return sender
+
+    @property
+    def segments(self) -> SegmentIndex:
+        """消息段索引（首次访问时构建）"""
+        if self._segments is None:
+            self._segments = SegmentIndex(self.raw_event.get("message"))
+        return self._segments
 
     def is_group_message(self) -> bool:
         """是否为群消息"""
@@ -63,29 +211,58 @@ class MessageEvent(NapCatEvent):
         """是否为私聊消息"""
         return self.message_type == MessageType.PRIVATE
 
-    def get_plain_text(self) -> str:
-        """获取纯文本内容"""
-        if isinstance(self.message, str):
-            return self.message
+    def get_segments(self, seg_type: str) -> List[Dict[str, Any]]:
+        """
+        获取指定类型的消息段
 
-        text_parts = []
-        if isinstance(self.message, list):
-            for seg in self.message:
-                if seg.get("type") == "text":
-                    text_parts.append(seg.get("data", {}).get("text", ""))
+        Args:
+            seg_type: 消息段类型，如 "text"、"image"、"face"
 
-        return "".join(text_parts).strip()
+        Returns:
+            消息段列表
+        """
+        return self.segments.get(seg_type)
+
+    def get_plain_text(self) -> str:
+        """获取纯文本内容"""
+        return self.segments.text
 
     def get_images(self) -> List[str]:
         """获取图片列表"""
-        images = []
-        if isinstance(self.message, list):
-            for seg in self.message:
-                if seg.get("type") == "image":
-                    file = seg.get("data", {}).get("file")
-                    if file:
-                        images.append(file)
-        return images
+        return self.segments.get_data_field("image", "file")
+
+    def get_faces(self) -> List[str]:
+        """获取 QQ 表情 ID 列表"""
+        return self.segments.get_data_field("face", "id")
+
+    def get_records(self) -> List[str]:
+        """获取语音文件列表"""
+        return self.segments.get_data_field("record", "file")
+
+    def get_files(self) -> List[Dict[str, Any]]:
+        """获取文件消息段的数据列表"""
+        return [seg.get("data", {}) for seg in self.segments.get("file")]
+
+    def get_forwards(self) -> List[str]:
+        """获取合并转发 ID 列表"""
+        return self.segments.get_data_field("forward", "id")
+
+    def get_json_messages(self) -> List[str]:
+        """获取 JSON 卡片消息的原始数据列表"""
+        return self.segments.get_data_field("json", "data")
+
+    def get_at_targets(self) -> Set[int]:
+        """获取被 @ 的 QQ 号集合（不含 @全体成员）"""
+        return self.segments.at_targets
+
+    def has_at_all(self) -> bool:
+        """是否 @全体成员"""
+        return self.segments.at_all
+
+    def get_reply_id(self) -> Optional[int]:
+        """获取回复的消息 ID，没有回复时返回 None"""
+        reply_ids = self.segments.reply_ids
+        return reply_ids[0] if reply_ids else None
 
     def has_at(self, qq: Optional[int] = None) -> bool:
         """
@@ -97,73 +274,64 @@ class MessageEvent(NapCatEvent):
         Returns:
             是否包含 @
         """
-        if not isinstance(self.message, list):
-            return False
-
-        for seg in self.message:
-            if seg.get("type") == "at":
-                if qq is None:
-                    return True
-                at_qq = seg.get("data", {}).get("qq")
-                if at_qq and int(at_qq) == qq:
-                    return True
-
-        return False
+        if qq is None:
+            return bool(self.segments.get("at"))
+        return qq in self.segments.at_targets
 
 
 class NoticeEvent(NapCatEvent):
     """通知事件"""
 
-    def __init__(self, raw_event: Dict[str, Any]):
-        super().__init__(raw_event)
-        self.notice_type = raw_event.get("notice_type")
-        self.sub_type = raw_event.get("sub_type")
+    __slots__ = ()
+
+    notice_type = _RawField()
+    sub_type = _RawField()
 
 
 class GroupNoticeEvent(NoticeEvent):
     """群通知事件"""
 
-    def __init__(self, raw_event: Dict[str, Any]):
-        super().__init__(raw_event)
-        self.group_id = raw_event.get("group_id")
-        self.operator_id = raw_event.get("operator_id")
-        self.user_id = raw_event.get("user_id")
+    __slots__ = ()
+
+    group_id = _RawField()
+    operator_id = _RawField()
+    user_id = _RawField()
 
 
 class RequestEvent(NapCatEvent):
     """请求事件"""
 
-    def __init__(self, raw_event: Dict[str, Any]):
-        super().__init__(raw_event)
-        self.request_type = raw_event.get("request_type")
-        self.sub_type = raw_event.get("sub_type")
-        self.comment = raw_event.get("comment")
-        self.flag = raw_event.get("flag")
+    __slots__ = ()
+
+    request_type = _RawField()
+    sub_type = _RawField()
+    comment = _RawField()
+    flag = _RawField()
 
 
 class FriendRequestEvent(RequestEvent):
     """好友请求事件"""
 
-    def __init__(self, raw_event: Dict[str, Any]):
-        super().__init__(raw_event)
-        self.user_id = raw_event.get("user_id")
+    __slots__ = ()
+
+    user_id = _RawField()
 
 
 class GroupRequestEvent(RequestEvent):
     """加群请求事件"""
 
-    def __init__(self, raw_event: Dict[str, Any]):
-        super().__init__(raw_event)
-        self.group_id = raw_event.get("group_id")
-        self.user_id = raw_event.get("user_id")
+    __slots__ = ()
+
+    group_id = _RawField()
+    user_id = _RawField()
 
 
 class MetaEvent(NapCatEvent):
     """元事件"""
 
-    def __init__(self, raw_event: Dict[str, Any]):
-        super().__init__(raw_event)
-        self.meta_event_type = raw_event.get("meta_event_type")
+    __slots__ = ()
+
+    meta_event_type = _RawField()
 
 
 def parse_event(raw_event: Dict[str, Any]) -> NapCatEvent:
@@ -198,49 +366,384 @@ def parse_event(raw_event: Dict[str, Any]) -> NapCatEvent:
         return NapCatEvent(raw_event)
 
 
-class EventHandler:
-    """事件处理器"""
+class HandlerStats:
+    """单个处理器的调用统计"""
 
     def __init__(self):
-        self.message_handlers: List[Callable] = []
-        self.notice_handlers: List[Callable] = []
-        self.request_handlers: List[Callable] = []
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def record(self, elapsed: float, error: bool = False, timeout: bool = False):
+        """记录一次调用"""
+        self.calls += 1
+        self.total_time += elapsed
+        if elapsed > self.max_time:
+            self.max_time = elapsed
+        if error:
+            self.errors += 1
+        if timeout:
+            self.timeouts += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "avg_ms": (
+                round(self.total_time / self.calls * 1000, 3) if self.calls else 0
+            ),
+            "max_ms": round(self.max_time * 1000, 3),
+        }
+
+
+def _normalize_ids(ids: Optional[Iterable]) -> Optional[FrozenSet[int]]:
+    """将群号/QQ 号过滤条件规范化为整数集合"""
+    if ids is None:
+        return None
+    if isinstance(ids, (int, str)):
+        ids = [ids]
+    return frozenset(int(i) for i in ids)
+
+
+def _normalize_prefix(prefix: Optional[Union[str, Iterable[str]]]) -> Optional[Tuple]:
+    """将命令前缀过滤条件规范化为元组（供 str.startswith 使用）"""
+    if prefix is None:
+        return None
+    if isinstance(prefix, str):
+        return (prefix,)
+    return tuple(prefix)
+
+
+class RegisteredHandler:
+    """
+    已注册的处理器
+
+    除处理函数外还保存注册时声明的过滤条件，由 EventHandler 编译进分发索引。
+    """
+
+    def __init__(
+        self,
+        func: Callable,
+        kind: str,
+        timeout: Optional[float] = None,
+        sub_type: Optional[str] = None,
+        group_ids: Optional[Iterable] = None,
+        user_ids: Optional[Iterable] = None,
+        prefix: Optional[Union[str, Iterable[str]]] = None,
+    ):
+        self.func = func
+        self.kind = kind
+        self.timeout = timeout
+        self.sub_type = sub_type
+        self.group_ids = _normalize_ids(group_ids)
+        self.user_ids = _normalize_ids(user_ids)
+        self.prefix = _normalize_prefix(prefix)
+        self.name = f"{func.__module__}.{getattr(func, '__qualname__', repr(func))}"
+        self.stats = HandlerStats()
+
+    @property
+    def needs_check(self) -> bool:
+        """是否有分发索引无法覆盖、需要逐个事件检查的过滤条件"""
+        return self.user_ids is not None or self.prefix is not None
+
+    async def __call__(self, event: NapCatEvent):
+        """调用处理器，异常和超时只记录不抛出"""
+        start = time.perf_counter()
+        try:
+            if self.timeout:
+                await asyncio.wait_for(self.func(event), self.timeout)
+            else:
+                await self.func(event)
+        except asyncio.TimeoutError:
+            self.stats.record(time.perf_counter() - start, timeout=True)
+            logger.warning(f"{self.kind}处理器超时 ({self.timeout}s): {self.name}")
+        except Exception as e:
+            self.stats.record(time.perf_counter() - start, error=True)
+            logger.error(f"{self.kind}处理器错误 [{self.name}]: {e}", exc_info=True)
+        else:
+            self.stats.record(time.perf_counter() - start)
+
+
+class _Route:
+    """
+    编译后的分发路由
+
+    对应一个 (post_type, 子类型) 组合，按群号预先算好候选处理器列表。
+    """
+
+    def __init__(self, handlers: List[RegisteredHandler]):
+        self.default = [h for h in handlers if h.group_ids is None]
+        self.by_group: Dict[int, List[RegisteredHandler]] = {}
+
+        group_ids = set()
+        for handler in handlers:
+            if handler.group_ids is not None:
+                group_ids |= handler.group_ids
+        for group_id in group_ids:
+            self.by_group[group_id] = [
+                h for h in handlers if h.group_ids is None or group_id in h.group_ids
+            ]
+
+        self.needs_check = any(h.needs_check for h in handlers)
+
+    def select(self, group_id: Optional[int]) -> List[RegisteredHandler]:
+        """根据群号获取候选处理器"""
+        if self.by_group and group_id is not None:
+            return self.by_group.get(group_id, self.default)
+        return self.default
+
+
+# 各上报类型对应的子类型字段
+_SUB_TYPE_FIELDS = {
+    PostType.MESSAGE: "message_type",
+    PostType.NOTICE: "notice_type",
+    PostType.REQUEST: "request_type",
+}
+
+
+class EventHandler:
+    """
+    事件处理器
+
+    注册处理器时可以声明过滤条件（消息类型、通知类型、群号、QQ 号、命令前缀），
+    这些条件会被编译成分发索引，事件只会调度给匹配的处理器。
+    同一事件的多个处理器并发执行，事件的总耗时取决于最慢的处理器。
+    """
+
+    def __init__(self, handler_timeout: Optional[float] = None):
+        """
+        初始化事件处理器
+
+        Args:
+            handler_timeout: 默认的单个处理器超时时间（秒），None 表示不限制
+        """
+        self.handler_timeout = handler_timeout
+        self.message_handlers: List[RegisteredHandler] = []
+        self.notice_handlers: List[RegisteredHandler] = []
+        self.request_handlers: List[RegisteredHandler] = []
+
+        self._handlers_by_post_type = {
+            PostType.MESSAGE: self.message_handlers,
+            PostType.NOTICE: self.notice_handlers,
+            PostType.REQUEST: self.request_handlers,
+        }
+        self._routes: Dict[Tuple[str, Optional[str]], _Route] = {}
+
+    def _register(
+        self,
+        post_type: PostType,
+        kind: str,
+        func: Optional[Callable],
+        timeout: Optional[float],
+        **filters,
+    ):
+        """注册处理器，同时支持 @on_xxx 和 @on_xxx(...) 两种写法"""
+
+        def decorator(f: Callable):
+            self._handlers_by_post_type[post_type].append(
+                RegisteredHandler(
+                    f,
+                    kind,
+                    timeout if timeout is not None else self.handler_timeout,
+                    **filters,
+                )
+            )
+            # 处理器变化后重新编译分发索引
+            self._routes.clear()
+            return f
+
+        if func is None:
+            return decorator
+        return decorator(func)
+
+    def on_message(
+        self,
+        func: Optional[Callable] = None,
+        *,
+        timeout: Optional[float] = None,
+        message_type: Optional[str] = None,
+        group_ids: Optional[Iterable] = None,
+        user_ids: Optional[Iterable] = None,
+        prefix: Optional[Union[str, Iterable[str]]] = None,
+    ):
+        """
+        注册消息处理器
+
+        Args:
+            func: 处理函数
+            timeout: 超时时间（秒）
+            message_type: 只处理指定类型的消息 ("group" 或 "private")
+            group_ids: 只处理这些群的消息
+            user_ids: 只处理这些用户的消息
+            prefix: 只处理以指定前缀（可以是多个）开头的消息
+        """
+        return self._register(
+            PostType.MESSAGE,
+            "消息",
+            func,
+            timeout,
+            sub_type=message_type,
+            group_ids=group_ids,
+            user_ids=user_ids,
+            prefix=prefix,
+        )
+
+    def on_notice(
+        self,
+        func: Optional[Callable] = None,
+        *,
+        timeout: Optional[float] = None,
+        notice_type: Optional[str] = None,
+        group_ids: Optional[Iterable] = None,
+        user_ids: Optional[Iterable] = None,
+    ):
+        """
+        注册通知处理器
+
+        Args:
+            func: 处理函数
+            timeout: 超时时间（秒）
+            notice_type: 只处理指定类型的通知（如 "group_increase"）
+            group_ids: 只处理这些群的通知
+            user_ids: 只处理这些用户的通知
+        """
+        return self._register(
+            PostType.NOTICE,
+            "通知",
+            func,
+            timeout,
+            sub_type=notice_type,
+            group_ids=group_ids,
+            user_ids=user_ids,
+        )
+
+    def on_request(
+        self,
+        func: Optional[Callable] = None,
+        *,
+        timeout: Optional[float] = None,
+        request_type: Optional[str] = None,
+        group_ids: Optional[Iterable] = None,
+        user_ids: Optional[Iterable] = None,
+    ):
+        """
+        注册请求处理器
 
-    def on_message(self, func: Callable):
-        """注册消息处理器"""
-        self.message_handlers.append(func)
-        return func
+        Args:
+            func: 处理函数
+            timeout: 超时时间（秒）
+            request_type: 只处理指定类型的请求 ("friend" 或 "group")
+            group_ids: 只处理这些群的请求
+            user_ids: 只处理这些用户的请求
+        """
+        return self._register(
+            PostType.REQUEST,
+            "请求",
+            func,
+            timeout,
+            sub_type=request_type,
+            group_ids=group_ids,
+            user_ids=user_ids,
+        )
+
+    def remove_handler(self, func: Callable) -> bool:
+        """
+        注销处理器
 
-    def on_notice(self, func: Callable):
-        """注册通知处理器"""
-        self.notice_handlers.append(func)
-        return func
+        Args:
+            func: 注册时使用的处理函数
 
-    def on_request(self, func: Callable):
-        """注册请求处理器"""
-        self.request_handlers.append(func)
-        return func
+        Returns:
+            是否找到并注销了处理器
+        """
+        removed = False
+        for handlers in self._handlers_by_post_type.values():
+            kept = [h for h in handlers if h.func is not func]
+            if len(kept) != len(handlers):
+                handlers[:] = kept
+                removed = True
+        if removed:
+            self._routes.clear()
+        return removed
+
+    def _get_route(self, post_type: str, sub_type: Optional[str]) -> Optional[_Route]:
+        """获取（必要时编译）分发路由"""
+        key = (post_type, sub_type)
+        route = self._routes.get(key)
+        if route is None:
+            handlers = self._handlers_by_post_type.get(post_type)
+            if handlers is None:
+                return None
+            route = _Route(
+                [h for h in handlers if h.sub_type is None or h.sub_type == sub_type]
+            )
+            self._routes[key] = route
+        return route
+
+    def get_matched_handlers(self, event: NapCatEvent) -> List[RegisteredHandler]:
+        """
+        获取匹配事件的处理器
+
+        Args:
+            event: 事件对象
+
+        Returns:
+            按注册顺序排列的处理器列表
+        """
+        raw_event = event.raw_event
+        post_type = raw_event.get("post_type")
+        sub_type_field = _SUB_TYPE_FIELDS.get(post_type)
+        if sub_type_field is None:
+            return []
+
+        route = self._get_route(post_type, raw_event.get(sub_type_field))
+        handlers = route.select(raw_event.get("group_id"))
+        if not route.needs_check:
+            return handlers
+
+        user_id = raw_event.get("user_id")
+        text = None
+        matched = []
+        for handler in handlers:
+            if handler.user_ids is not None and user_id not in handler.user_ids:
+                continue
+            if handler.prefix is not None:
+                if text is None:
+                    text = (
+                        event.get_plain_text() if isinstance(event, MessageEvent) else ""
+                    )
+                if not text.startswith(handler.prefix):
+                    continue
+            matched.append(handler)
+        return matched
 
     async def handle_event(self, event: NapCatEvent):
         """处理事件"""
-        if isinstance(event, MessageEvent):
-            for handler in self.message_handlers:
-                try:
-                    await handler(event)
-                except Exception as e:
-                    print(f"消息处理器错误: {e}")
-
-        elif isinstance(event, NoticeEvent):
-            for handler in self.notice_handlers:
-                try:
-                    await handler(event)
-                except Exception as e:
-                    print(f"通知处理器错误: {e}")
-
-        elif isinstance(event, RequestEvent):
-            for handler in self.request_handlers:
-                try:
-                    await handler(event)
-                except Exception as e:
-                    print(f"请求处理器错误: {e}")
-
+        handlers = self.get_matched_handlers(event)
+
+        if len(handlers) == 1:
+            await handlers[0](event)
+        elif handlers:
+            await asyncio.gather(*(handler(event) for handler in handlers))
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """获取所有处理器的统计信息"""
+        result = []
+        for handlers in (
+            self.message_handlers,
+            self.notice_handlers,
+            self.request_handlers,
+        ):
+            for handler in handlers:
+                result.append(
+                    {
+                        "name": handler.name,
+                        "kind": handler.kind,
+                        **handler.stats.to_dict(),
+                    }
+                )
+        return result
@@ -0,0 +1,239 @@
+"""
+NapCat 最近消息记录
+按会话保存最近收到和发出的消息，get_msg 和回复链查询优先在本地完成
+"""
+
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Any, Optional, Tuple, Deque, List
+
+from nekobot.utils.logger import get_logger
+from nekobot.core.platform.sources.napcat.napcat_codec import loads, dumps
+
+logger = get_logger("napcat.history")
+
+# 与 get_msg 返回格式相同的字段
+_RECORD_FIELDS = (
+    "message_id",
+    "real_id",
+    "time",
+    "message_type",
+    "sub_type",
+    "group_id",
+    "user_id",
+    "sender",
+    "message",
+    "raw_message",
+)
+
+
+def conversation_key(record: Dict[str, Any]) -> Tuple[str, int]:
+    """
+    获取消息所属的会话
+
+    Returns:
+        ("group", 群号) 或 ("private", 对方 QQ 号)
+    """
+    if record.get("message_type") == "group":
+        return ("group", record.get("group_id"))
+    return ("private", record.get("target_id", record.get("user_id")))
+
+
+class _Conversation:
+    """单个会话的消息环形缓冲区"""
+
+    __slots__ = ("message_ids", "bytes")
+
+    def __init__(self):
+        self.message_ids: Deque[int] = deque()
+        self.bytes = 0
+
+
+class MessageHistory:
+    """
+    最近消息记录
+
+    每个会话保留最近 max_messages 条、总大小不超过 max_bytes 的消息，
+    超出时淘汰最早的消息；会话数超过 max_conversations 时淘汰最久不活跃的会话。
+    记录的格式与 get_msg 的返回值相同，以编码后的 JSON 保存，
+    每次查询返回新解码的副本，调用方修改返回值不会影响记录。
+    """
+
+    def __init__(
+        self,
+        max_messages: int = 200,
+        max_bytes: int = 256 * 1024,
+        max_conversations: int = 2000,
+    ):
+        """
+        初始化消息记录
+
+        Args:
+            max_messages: 每个会话最多保留的消息条数
+            max_bytes: 每个会话最多保留的消息大小（字节，按 JSON 编码后的长度估算）
+            max_conversations: 最多保留的会话数
+        """
+        self.max_messages = max(1, max_messages)
+        self.max_bytes = max_bytes
+        self.max_conversations = max(1, max_conversations)
+
+        # message_id -> (会话, 编码后的记录)
+        self._messages: Dict[int, Tuple[Tuple[str, int], bytes]] = {}
+        self._conversations: OrderedDict = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __contains__(self, message_id: int) -> bool:
+        return message_id in self._messages
+
+    def add(self, record: Dict[str, Any], key: Optional[Tuple[str, int]] = None):
+        """
+        记录一条消息
+
+        Args:
+            record: get_msg 格式的消息，必须包含 message_id
+            key: 所属会话，默认根据 record 判断
+        """
+        message_id = record.get("message_id")
+        if message_id is None:
+            return
+        message_id = int(message_id)
+        if message_id in self._messages:
+            # 重复记录（例如 get_msg 重新获取）时以最后一次为准
+            self._remove(message_id)
+
+        key = key or conversation_key(record)
+        encoded = dumps(record)
+        size = len(encoded)
+        conversation = self._conversations.get(key)
+        if conversation is None:
+            conversation = self._conversations[key] = _Conversation()
+            while len(self._conversations) > self.max_conversations:
+                _, oldest = self._conversations.popitem(last=False)
+                for old_id in oldest.message_ids:
+                    self._messages.pop(old_id, None)
+                    self.evicted += 1
+        else:
+            self._conversations.move_to_end(key)
+
+        conversation.message_ids.append(message_id)
+        conversation.bytes += size
+        self._messages[message_id] = (key, encoded)
+
+        ids = conversation.message_ids
+        while len(ids) > 1 and (
+            len(ids) > self.max_messages or conversation.bytes > self.max_bytes
+        ):
+            old_id = ids.popleft()
+            entry = self._messages.pop(old_id, None)
+            if entry is not None:
+                conversation.bytes -= len(entry[1])
+            self.evicted += 1
+
+    def _remove(self, message_id: int):
+        """删除一条消息"""
+        key, encoded = self._messages.pop(message_id)
+        conversation = self._conversations.get(key)
+        if conversation is not None:
+            try:
+                conversation.message_ids.remove(message_id)
+                conversation.bytes -= len(encoded)
+            except ValueError:
+                pass
+
+    def record_event(self, raw_event: Dict[str, Any]):
+        """
+        记录收到的消息事件
+
+        Args:
+            raw_event: 消息事件的原始数据
+        """
+        self.add(
+            {field: raw_event[field] for field in _RECORD_FIELDS if field in raw_event}
+        )
+
+    def record_sent(
+        self,
+        message_id: int,
+        message_type: str,
+        target_id: int,
+        message: Any,
+        sender: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        记录发出的消息
+
+        Args:
+            message_id: 发送接口返回的消息 ID
+            message_type: "group" 或 "private"
+            target_id: 群号或对方 QQ 号
+            message: 消息内容
+            sender: 机器人的发送者信息 (user_id / nickname)
+        """
+        sender = sender or {}
+        record = {
+            "message_id": message_id,
+            "time": int(time.time()),
+            "message_type": message_type,
+            "user_id": sender.get("user_id"),
+            "sender": sender,
+            "message": message,
+        }
+        if message_type == "group":
+            record["group_id"] = target_id
+        # 私聊记录中只有机器人自己的 user_id，会话由调用方指定
+        self.add(record, (message_type, target_id))
+
+    def get(self, message_id: int) -> Optional[Dict[str, Any]]:
+        """
+        查询消息
+
+        Args:
+            message_id: 消息 ID
+
+        Returns:
+            get_msg 格式的消息（副本），不在记录中时返回 None
+        """
+        entry = self._messages.get(int(message_id))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return loads(entry[1])
+
+    def get_recent(
+        self, key: Tuple[str, int], limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """
+        获取会话最近的消息
+
+        Args:
+            key: ("group", 群号) 或 ("private", 对方 QQ 号)
+            limit: 最多返回的条数
+
+        Returns:
+            按时间顺序排列的消息
+        """
+        conversation = self._conversations.get(key)
+        if conversation is None:
+            return []
+        ids = list(conversation.message_ids)[-limit:]
+        return [loads(self._messages[message_id][1]) for message_id in ids]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        lookups = self.hits + self.misses
+        return {
+            "messages": len(self._messages),
+            "conversations": len(self._conversations),
+            "bytes": sum(c.bytes for c in self._conversations.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evicted": self.evicted,
+        }
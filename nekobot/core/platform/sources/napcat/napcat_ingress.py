@@ -0,0 +1,201 @@
+"""
+NapCat 入站队列
+每个连接一个有界队列，积压时按策略丢弃低优先级事件
+"""
+
+import asyncio
+from typing import Dict, Any, Optional, Iterable, Set
+from nekobot.utils.logger import get_logger
+from nekobot.core.platform.sources.napcat.napcat_event import NapCatEvent
+
+logger = get_logger("napcat.ingress")
+
+# 默认丢弃策略：队列占用比例达到水位线后开始丢弃对应类别的事件，
+# 水位线越低越先被丢弃。消息、请求等其他事件只在队列已满时被丢弃
+DEFAULT_WATERMARKS = {
+    "meta": 0.5,
+    "notice": 0.75,
+    "muted_group": 0.9,
+}
+
+
+class IngressQueue:
+    """
+    有界入站队列
+
+    丢弃顺序（默认）：
+        1. 元事件（心跳、生命周期）
+        2. 通知事件
+        3. 来自被禁言群或黑名单群的消息（共用 muted_group 水位线）
+        4. 队列已满时丢弃所有新事件（overflow）
+    put_nowait() 从不等待：API 响应与事件共用同一个 WebSocket 连接，
+    读取连接的协程一旦阻塞，处理器等待的 API 响应也无法被读取，形成死锁。
+    """
+
+    def __init__(
+        self,
+        capacity: int = 500,
+        watermarks: Optional[Dict[str, float]] = None,
+        blacklist_groups: Optional[Iterable[int]] = None,
+    ):
+        """
+        初始化入站队列
+
+        Args:
+            capacity: 队列容量
+            watermarks: 各类别开始丢弃时的队列占用比例
+            blacklist_groups: 黑名单群号
+        """
+        self.capacity = max(1, capacity)
+
+        watermarks = {**DEFAULT_WATERMARKS, **(watermarks or {})}
+        self._thresholds = {
+            category: int(self.capacity * ratio)
+            for category, ratio in watermarks.items()
+        }
+        self._min_threshold = min(self._thresholds.values())
+
+        self.blacklist_groups: Set[int] = {int(g) for g in blacklist_groups or ()}
+        self.muted_groups: Set[int] = set()
+
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=self.capacity)
+        self._space = asyncio.Event()
+        self.accepted = 0
+        self.peak_depth = 0
+        self.shed: Dict[str, int] = {}
+        self.closed = False
+
+    @property
+    def depth(self) -> int:
+        """当前积压的事件数"""
+        return self._queue.qsize()
+
+    def _record_shed(self, reason: str):
+        """记录一次丢弃"""
+        count = self.shed.get(reason, 0)
+        if count == 0:
+            logger.warning(
+                f"入站队列积压 ({self.depth}/{self.capacity})，开始丢弃事件: {reason}"
+            )
+        self.shed[reason] = count + 1
+
+    def _over(self, category: str) -> bool:
+        """当前积压是否已超过指定类别的水位线"""
+        threshold = self._thresholds.get(category)
+        return threshold is not None and self._queue.qsize() >= threshold
+
+    def shed_meta(self) -> bool:
+        """
+        判断是否应丢弃元事件（在解码前调用）
+
+        Returns:
+            True 表示应丢弃
+        """
+        if self._over("meta"):
+            self._record_shed("meta")
+            return True
+        return False
+
+    def _track_mute(self, raw_event: Dict[str, Any]):
+        """根据群禁言通知维护机器人被禁言的群"""
+        if raw_event.get("notice_type") != "group_ban":
+            return
+
+        group_id = raw_event.get("group_id")
+        user_id = raw_event.get("user_id")
+        # user_id 为 0 表示全体禁言，否则只关心机器人自身被禁言
+        if user_id != 0 and user_id != raw_event.get("self_id"):
+            return
+
+        if raw_event.get("sub_type") == "ban" and raw_event.get("duration", 1) != 0:
+            self.muted_groups.add(group_id)
+        else:
+            self.muted_groups.discard(group_id)
+
+    def _shed_reason(self, event: NapCatEvent) -> Optional[str]:
+        """判断事件是否应被丢弃，返回丢弃原因"""
+        raw_event = event.raw_event
+        post_type = raw_event.get("post_type")
+
+        if post_type == "notice":
+            self._track_mute(raw_event)
+
+        if self._queue.qsize() < self._min_threshold:
+            return None
+
+        if post_type == "notice":
+            return "notice" if self._over("notice") else None
+
+        if post_type == "meta_event":
+            return "meta" if self._over("meta") else None
+
+        if post_type == "message" and self._over("muted_group"):
+            group_id = raw_event.get("group_id")
+            if group_id in self.muted_groups:
+                return "muted_group"
+            if group_id in self.blacklist_groups:
+                return "blacklisted_group"
+
+        return None
+
+    def put_nowait(self, event: NapCatEvent) -> bool:
+        """
+        放入事件，不等待
+
+        Args:
+            event: 事件对象
+
+        Returns:
+            False 表示事件被丢弃
+        """
+        reason = self._shed_reason(event)
+        if reason is None and self._queue.full():
+            reason = "overflow"
+        if reason is not None:
+            self._record_shed(reason)
+            return False
+
+        self._queue.put_nowait(event)
+        self.accepted += 1
+        depth = self._queue.qsize()
+        if depth > self.peak_depth:
+            self.peak_depth = depth
+        return True
+
+    async def get(self) -> Optional[NapCatEvent]:
+        """取出事件，队列关闭且已取空后返回 None"""
+        if self.closed and self._queue.empty():
+            return None
+        event = await self._queue.get()
+        self._space.set()
+        return event
+
+    async def wait_for_space(self):
+        """
+        等待队列有空位
+
+        供回放等进程内的数据源做背压使用；WebSocket 读取协程不应调用。
+        """
+        while self._queue.full():
+            self._space.clear()
+            await self._space.wait()
+
+    def close(self):
+        """关闭队列，已入队的事件仍会被取出（重复调用无副作用，不会等待）"""
+        if self.closed:
+            return
+        self.closed = True
+        # 队列已满时不放入结束标记，由 get() 在取空后返回 None
+        if not self._queue.full():
+            self._queue.put_nowait(None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取队列统计信息"""
+        return {
+            "capacity": self.capacity,
+            "depth": self.depth,
+            "peak_depth": self.peak_depth,
+            "accepted": self.accepted,
+            "shed": dict(self.shed),
+            "muted_groups": sorted(self.muted_groups),
+        }
@@ -0,0 +1,462 @@
+"""
+NapCat 合成负载生成器
+在本机模拟多个 NapCat 客户端通过反向 WebSocket 连接 NekoBot，按目标速率上报
+群消息、私聊消息、通知和心跳，并提供模拟的 NapCat API 服务，使出站调用在本地完成。
+结果以 JSON 输出，便于在不同版本之间对比。
+"""
+
+import sys
+import time
+import queue
+import random
+import asyncio
+import itertools
+import multiprocessing
+from typing import Dict, Any, Optional, List
+
+import aiohttp
+import psutil
+from aiohttp import web
+
+from nekobot import __version__
+from nekobot.utils.logger import get_logger
+from nekobot.core.platform.sources.napcat.napcat_codec import loads, dumps
+from nekobot.core.platform.sources.napcat.napcat_stats import percentile
+
+logger = get_logger("napcat.loadgen")
+
+# 默认事件比例
+DEFAULT_MIX = {"group": 0.7, "private": 0.15, "notice": 0.1, "heartbeat": 0.05}
+
+# 上报数据中记录发送时间的字段，用于计算分发延迟
+SENT_AT_FIELD = "_loadgen_sent_at"
+
+_NOTICE_TYPES = ("group_increase", "group_recall", "notify")
+
+
+def ok_response(echo: Optional[str] = None) -> Dict[str, Any]:
+    """模拟 NapCat 的成功响应"""
+    response = {"status": "ok", "retcode": 0, "data": {"message_id": 1}}
+    if echo is not None:
+        response["echo"] = echo
+    return response
+
+
+class EventFactory:
+    """按比例生成 OneBot 上报数据"""
+
+    def __init__(
+        self, self_id: int, mix: Dict[str, float], groups: int = 50, users: int = 500
+    ):
+        """
+        初始化生成器
+
+        Args:
+            self_id: 机器人 QQ 号
+            mix: 各类事件的比例
+            groups: 群数量
+            users: 用户数量
+        """
+        self.self_id = self_id
+        self.kinds = list(mix)
+        self.weights = [mix[kind] for kind in self.kinds]
+        self.groups = [100000000 + i for i in range(groups)]
+        self.users = [200000000 + i for i in range(users)]
+        self._message_ids = itertools.count(1)
+
+    def _message(self, message_type: str, now: float) -> Dict[str, Any]:
+        """生成消息事件"""
+        user_id = random.choice(self.users)
+        text = f"负载测试消息 {random.randint(0, 1 << 30)}"
+        event = {
+            "time": int(now),
+            "self_id": self.self_id,
+            "post_type": "message",
+            "message_type": message_type,
+            "sub_type": "normal" if message_type == "group" else "friend",
+            "message_id": next(self._message_ids),
+            "user_id": user_id,
+            "message": [{"type": "text", "data": {"text": text}}],
+            "raw_message": text,
+            "font": 14,
+            "sender": {"user_id": user_id, "nickname": f"用户{user_id}"},
+        }
+        if message_type == "group":
+            event["group_id"] = random.choice(self.groups)
+        return event
+
+    def make(self, kind: Optional[str] = None) -> bytes:
+        """
+        生成一条上报数据
+
+        Args:
+            kind: 事件类别，默认按比例随机选择
+
+        Returns:
+            编码后的上报数据
+        """
+        kind = kind or random.choices(self.kinds, self.weights)[0]
+        now = time.time()
+
+        if kind in ("group", "private"):
+            event = self._message(kind, now)
+        elif kind == "notice":
+            event = {
+                "time": int(now),
+                "self_id": self.self_id,
+                "post_type": "notice",
+                "notice_type": random.choice(_NOTICE_TYPES),
+                "group_id": random.choice(self.groups),
+                "user_id": random.choice(self.users),
+            }
+        else:
+            event = {
+                "time": int(now),
+                "self_id": self.self_id,
+                "post_type": "meta_event",
+                "meta_event_type": "heartbeat",
+                "status": {"online": True, "good": True},
+                "interval": 30000,
+            }
+
+        event[SENT_AT_FIELD] = now
+        return dumps(event)
+
+
+async def run_fake_client(
+    url: str,
+    self_id: int,
+    rate: float,
+    duration: float,
+    mix: Dict[str, float],
+    access_token: Optional[str] = None,
+) -> Dict[str, int]:
+    """
+    模拟一个 NapCat 客户端
+
+    Args:
+        url: NekoBot 反向 WebSocket 地址
+        self_id: 机器人 QQ 号
+        rate: 每秒上报的事件数
+        duration: 持续时间（秒）
+        mix: 各类事件的比例
+        access_token: 访问令牌
+
+    Returns:
+        各类事件的发送数量，以及应答的 API 调用数（api）
+    """
+    factory = EventFactory(self_id, mix)
+    sent = dict.fromkeys(mix, 0)
+    sent["api"] = 0
+    headers = {"X-Self-ID": str(self_id)}
+    if access_token:
+        headers["Authorization"] = f"Bearer {access_token}"
+
+    async with aiohttp.ClientSession() as session:
+        async with session.ws_connect(url, headers=headers, max_msg_size=0) as ws:
+
+            async def answer_api_calls():
+                """应答 NekoBot 通过 WebSocket 发出的 API 调用"""
+                async for msg in ws:
+                    if msg.type not in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                        break
+                    request = loads(msg.data)
+                    await ws.send_bytes(dumps(ok_response(request.get("echo"))))
+                    sent["api"] += 1
+
+            reader = asyncio.create_task(answer_api_calls())
+            start = time.perf_counter()
+            total = 0
+            while True:
+                elapsed = time.perf_counter() - start
+                if elapsed >= duration:
+                    break
+                # 按目标速率补齐应发送的事件，每个周期批量发送
+                for _ in range(int(elapsed * rate) - total):
+                    kind = random.choices(factory.kinds, factory.weights)[0]
+                    await ws.send_bytes(factory.make(kind))
+                    sent[kind] += 1
+                    total += 1
+                await asyncio.sleep(0.005)
+
+            # 留出时间应答最后一批事件触发的 API 调用
+            await asyncio.sleep(1.0)
+            reader.cancel()
+    return sent
+
+
+def _client_process(
+    url: str,
+    clients: int,
+    base_self_id: int,
+    rate: float,
+    duration: float,
+    mix: Dict[str, float],
+    access_token: Optional[str],
+    results,
+):
+    """在独立进程中运行所有模拟客户端，避免其 CPU 开销计入被测进程"""
+
+    async def run_all():
+        return await asyncio.gather(
+            *(
+                run_fake_client(
+                    url, base_self_id + i, rate / clients, duration, mix, access_token
+                )
+                for i in range(clients)
+            )
+        )
+
+    totals: Dict[str, int] = {}
+    for sent in asyncio.run(run_all()):
+        for kind, count in sent.items():
+            totals[kind] = totals.get(kind, 0) + count
+    results.put(totals)
+
+
+async def start_action_server(host: str, port: int) -> web.AppRunner:
+    """
+    启动模拟的 NapCat HTTP API 服务
+
+    Args:
+        host: 监听地址
+        port: 监听端口
+
+    Returns:
+        服务运行器，调用 cleanup() 停止
+    """
+
+    async def handle(request):
+        await request.read()
+        return web.Response(body=dumps(ok_response()), content_type="application/json")
+
+    app = web.Application()
+    app.router.add_post("/{action}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def _latency_summary(values: List[float]) -> Dict[str, float]:
+    """延迟分位数（毫秒）"""
+    values = sorted(values)
+    return {
+        "p50": round(percentile(values, 0.5) * 1000, 3),
+        "p90": round(percentile(values, 0.9) * 1000, 3),
+        "p99": round(percentile(values, 0.99) * 1000, 3),
+        "max": round(values[-1] * 1000, 3) if values else 0.0,
+    }
+
+
+class LoadGenerator:
+    """
+    合成负载测试
+
+    被测进程中运行 NapCatWebSocketServer 与模拟的 NapCat HTTP API，
+    模拟客户端在独立进程中运行。一部分群消息的处理器会调用 send_group_msg，
+    经由 api_transport 指定的方式发回模拟客户端或模拟 HTTP API。
+    """
+
+    def __init__(
+        self,
+        clients: int = 4,
+        rate: float = 1000,
+        duration: float = 30,
+        mix: Optional[Dict[str, float]] = None,
+        reply_ratio: float = 0.1,
+        api_transport: str = "ws",
+        workers: int = 8,
+        host: str = "127.0.0.1",
+        port: int = 36299,
+        http_port: int = 36300,
+        base_self_id: int = 10000,
+    ):
+        """
+        初始化负载测试
+
+        Args:
+            clients: 模拟客户端（账号）数量
+            rate: 所有客户端合计每秒上报的事件数
+            duration: 上报持续时间（秒）
+            mix: 各类事件的比例，默认 DEFAULT_MIX
+            reply_ratio: 触发 send_group_msg 的群消息比例
+            api_transport: 出站调用方式，"ws" 或 "http"
+            workers: 事件分发工作协程数量
+            host: 监听地址
+            port: 反向 WebSocket 服务器端口
+            http_port: 模拟 NapCat HTTP API 端口
+            base_self_id: 第一个模拟账号的 QQ 号
+        """
+        self.clients = max(1, clients)
+        self.rate = rate
+        self.duration = duration
+        self.mix = mix or dict(DEFAULT_MIX)
+        self.reply_ratio = reply_ratio
+        self.api_transport = api_transport
+        self.workers = workers
+        self.host = host
+        self.port = port
+        self.http_port = http_port
+        self.base_self_id = base_self_id
+
+        self._dispatch_latencies: List[float] = []
+        self._api_latencies: List[float] = []
+        self._api_errors = 0
+
+    def _create_adapters(self):
+        """每个模拟账号一个适配器"""
+        from nekobot.core.platform.sources.napcat.napcat_adapter import NapCatAdapter
+
+        return {
+            self.base_self_id + i: NapCatAdapter(
+                {
+                    "host": self.host,
+                    "port": self.http_port,
+                    "api_transport": self.api_transport,
+                    "self_id": self.base_self_id + i,
+                }
+            )
+            for i in range(self.clients)
+        }
+
+    def _register_handlers(self, server, adapters):
+        """注册记录延迟的处理器"""
+        pending = set()
+
+        async def reply(adapter, group_id):
+            start = time.perf_counter()
+            try:
+                await adapter.send_group_msg(group_id, adapter.build_text_message("pong"))
+                self._api_latencies.append(time.perf_counter() - start)
+            except Exception:
+                self._api_errors += 1
+
+        async def on_event(event):
+            raw_event = event.raw_event
+            sent_at = raw_event.get(SENT_AT_FIELD)
+            if sent_at is not None:
+                self._dispatch_latencies.append(time.time() - sent_at)
+
+            if raw_event.get("group_id") and raw_event.get("post_type") == "message":
+                if random.random() < self.reply_ratio:
+                    adapter = adapters[raw_event["self_id"]]
+                    # 不阻塞分发，与插件在后台回复的行为一致
+                    task = asyncio.create_task(reply(adapter, raw_event["group_id"]))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+
+        server.on_message(on_event)
+        server.on_notice(on_event)
+        return pending
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        运行负载测试
+
+        Returns:
+            测试报告
+        """
+        from nekobot.core.platform.sources.napcat.napcat_server import (
+            NapCatWebSocketServer,
+        )
+
+        process = psutil.Process()
+        rss_start = process.memory_info().rss
+
+        action_server = await start_action_server(self.host, self.http_port)
+        server = NapCatWebSocketServer(
+            host=self.host, port=self.port, workers=self.workers
+        )
+        server_task = asyncio.create_task(server.run())
+        adapters = self._create_adapters()
+        for adapter in adapters.values():
+            await adapter.transport.start()
+        pending = self._register_handlers(server, adapters)
+        await asyncio.sleep(0.5)
+
+        results = multiprocessing.Queue()
+        client_process = multiprocessing.Process(
+            target=_client_process,
+            args=(
+                f"ws://{self.host}:{self.port}/ws",
+                self.clients,
+                self.base_self_id,
+                self.rate,
+                self.duration,
+                self.mix,
+                server.access_token,
+                results,
+            ),
+            daemon=True,
+        )
+
+        cpu_start = process.cpu_times()
+        start = time.perf_counter()
+        client_process.start()
+
+        rss_peak = rss_start
+        while client_process.is_alive():
+            rss_peak = max(rss_peak, process.memory_info().rss)
+            await asyncio.sleep(0.5)
+        elapsed = time.perf_counter() - start
+        cpu_end = process.cpu_times()
+
+        try:
+            sent = results.get(timeout=5)
+        except queue.Empty:
+            logger.error("模拟客户端进程异常退出，未返回发送统计")
+            sent = {}
+
+        # 等待已收到的事件处理完毕
+        for _ in range(50):
+            if server.dispatcher.get_stats()["queued"] == 0:
+                break
+            await asyncio.sleep(0.1)
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        rss_end = process.memory_info().rss
+
+        stats = server.get_stats()
+        server_task.cancel()
+        for adapter in adapters.values():
+            await adapter.disconnect()
+        await action_server.cleanup()
+
+        handled = len(self._dispatch_latencies)
+        cpu_seconds = (cpu_end.user - cpu_start.user) + (
+            cpu_end.system - cpu_start.system
+        )
+        mb = 1024 * 1024
+        return {
+            "version": __version__,
+            "python": sys.version.split()[0],
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "config": {
+                "clients": self.clients,
+                "rate": self.rate,
+                "duration": self.duration,
+                "mix": self.mix,
+                "reply_ratio": self.reply_ratio,
+                "api_transport": self.api_transport,
+                "workers": self.workers,
+            },
+            "sent": sent,
+            "events_handled": handled,
+            "events_per_second": round(handled / elapsed, 1) if elapsed else 0,
+            "dispatch_latency_ms": _latency_summary(self._dispatch_latencies),
+            "api_calls": len(self._api_latencies),
+            "api_errors": self._api_errors,
+            "api_latency_ms": _latency_summary(self._api_latencies),
+            "cpu_ms_per_1k_events": (
+                round(cpu_seconds * 1000 / handled * 1000, 2) if handled else None
+            ),
+            "rss_mb": {
+                "start": round(rss_start / mb, 1),
+                "peak": round(rss_peak / mb, 1),
+                "end": round(rss_end / mb, 1),
+                "growth": round((rss_end - rss_start) / mb, 1),
+            },
+            "shed": stats["shed"],
+            "dedup": stats["dedup"],
+        }
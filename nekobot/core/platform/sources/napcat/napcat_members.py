@@ -0,0 +1,398 @@
+"""
+NapCat 群成员索引
+连接后在后台批量拉取所有群的成员列表，存入紧凑的索引，
+用于 @ 解析、"谁是 X" 等按 QQ 号 / 群名片 / 昵称前缀的查询
+"""
+
+import sys
+import time
+import asyncio
+from array import array
+from bisect import bisect_left
+from typing import Dict, Any, Optional, List, Callable, Awaitable, Iterable, Set
+
+from nekobot.utils.logger import get_logger
+
+logger = get_logger("napcat.members")
+
+# role 字段的紧凑编码
+_ROLES = ("member", "admin", "owner")
+_ROLE_CODES = {role: code for code, role in enumerate(_ROLES)}
+
+
+class _PrefixIndex:
+    """
+    前缀索引：按小写键排序的 (键, 成员下标) 两个平行数组，
+    前缀查询为一次二分查找加顺序扫描
+    """
+
+    __slots__ = ("keys", "positions")
+
+    def __init__(self, names: List[str]):
+        pairs = sorted(
+            (sys.intern(name.casefold()), pos) for pos, name in enumerate(names) if name
+        )
+        self.keys: List[str] = [key for key, _ in pairs]
+        self.positions = array("i", (pos for _, pos in pairs))
+
+    def find(self, prefix: str, limit: int) -> List[int]:
+        """查找键以 prefix 开头的成员下标"""
+        prefix = prefix.casefold()
+        keys = self.keys
+        found = []
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix) and len(found) < limit:
+            found.append(self.positions[i])
+            i += 1
+        return found
+
+    def nbytes(self) -> int:
+        return sys.getsizeof(self.keys) + sys.getsizeof(self.positions)
+
+
+class GroupMemberIndex:
+    """
+    单个群的成员索引
+
+    成员按 QQ 号排序存放在 array 中，昵称和群名片使用 sys.intern 驻留，
+    多个群中相同的字符串只保存一份。按 QQ 号查询为二分查找，
+    按群名片 / 昵称查询为前缀索引上的二分查找。
+    """
+
+    __slots__ = (
+        "group_id",
+        "user_ids",
+        "roles",
+        "nicknames",
+        "cards",
+        "_by_card",
+        "_by_nickname",
+        "updated_at",
+        "_nbytes",
+        "_string_bytes",
+    )
+
+    def __init__(self, group_id: int, members: Iterable[Dict[str, Any]]):
+        """
+        构建索引
+
+        Args:
+            group_id: 群号
+            members: get_group_member_list 返回的成员列表
+        """
+        rows = sorted(
+            (
+                (
+                    int(m["user_id"]),
+                    m.get("nickname") or "",
+                    m.get("card") or "",
+                    m.get("role"),
+                )
+                for m in members
+                if m.get("user_id") is not None
+            ),
+            key=lambda row: row[0],
+        )
+        self.group_id = group_id
+        self.user_ids = array("q", (row[0] for row in rows))
+        self.roles = array("b", (_ROLE_CODES.get(row[3], 0) for row in rows))
+        self.nicknames: List[str] = [sys.intern(row[1]) for row in rows]
+        self.cards: List[str] = [sys.intern(row[2]) for row in rows]
+        self._by_card = _PrefixIndex(self.cards)
+        self._by_nickname = _PrefixIndex(self.nicknames)
+        self.updated_at = time.time()
+        # 索引建立后不再变化，内存占用在这里算好，查询统计信息时不必遍历成员
+        self._nbytes = self._measure()
+        self._string_bytes = sum(sys.getsizeof(s) for s in self.strings())
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def _member(self, pos: int) -> Dict[str, Any]:
+        return {
+            "user_id": self.user_ids[pos],
+            "nickname": self.nicknames[pos],
+            "card": self.cards[pos],
+            "role": _ROLES[self.roles[pos]],
+        }
+
+    def get(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """
+        按 QQ 号查询成员
+
+        Returns:
+            {"user_id", "nickname", "card", "role"}，不在群中时返回 None
+        """
+        user_id = int(user_id)
+        pos = bisect_left(self.user_ids, user_id)
+        if pos < len(self.user_ids) and self.user_ids[pos] == user_id:
+            return self._member(pos)
+        return None
+
+    def __contains__(self, user_id: int) -> bool:
+        pos = bisect_left(self.user_ids, int(user_id))
+        return pos < len(self.user_ids) and self.user_ids[pos] == int(user_id)
+
+    def find_by_card(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """按群名片前缀查询成员（不区分大小写）"""
+        return [self._member(pos) for pos in self._by_card.find(prefix, limit)]
+
+    def find_by_nickname(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """按昵称前缀查询成员（不区分大小写）"""
+        return [self._member(pos) for pos in self._by_nickname.find(prefix, limit)]
+
+    def search(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        按群名片或昵称前缀查询成员，群名片匹配的排在前面
+
+        Args:
+            prefix: 名称前缀
+            limit: 最多返回的成员数
+        """
+        seen: Set[int] = set()
+        result = []
+        for pos in self._by_card.find(prefix, limit) + self._by_nickname.find(
+            prefix, limit
+        ):
+            if pos not in seen and len(result) < limit:
+                seen.add(pos)
+                result.append(self._member(pos))
+        return result
+
+    def nbytes(self) -> int:
+        """索引自身的数组和列表占用的内存（字节，不含字符串）"""
+        return self._nbytes
+
+    def string_bytes(self) -> int:
+        """索引引用的字符串占用的内存（字节，与其他群共享的部分也计算在内）"""
+        return self._string_bytes
+
+    def _measure(self) -> int:
+        """计算索引自身的数组和列表占用的内存"""
+        return (
+            self.user_ids.buffer_info()[1] * self.user_ids.itemsize
+            + len(self.roles)
+            + sys.getsizeof(self.nicknames)
+            + sys.getsizeof(self.cards)
+            + self._by_card.nbytes()
+            + self._by_nickname.nbytes()
+        )
+
+    def strings(self) -> Set[str]:
+        """索引引用的字符串（驻留后可能被多个群共享）"""
+        strings = set(self.nicknames)
+        strings.update(self.cards)
+        strings.update(self._by_card.keys)
+        strings.update(self._by_nickname.keys)
+        strings.discard("")
+        return strings
+
+
+class GroupMemberDirectory:
+    """
+    群成员目录
+
+    连接成功后调用 start() 在后台拉取所有群的成员列表，同时进行的请求数
+    不超过 concurrency；之后收到成员变动通知时在后台重新拉取对应的群。
+    """
+
+    def __init__(
+        self,
+        fetch_groups: Callable[[], Awaitable[List[Dict[str, Any]]]],
+        fetch_members: Callable[[int], Awaitable[List[Dict[str, Any]]]],
+        concurrency: int = 8,
+        refresh_delay: float = 5.0,
+    ):
+        """
+        初始化成员目录
+
+        Args:
+            fetch_groups: 获取群列表的协程函数
+            fetch_members: 获取群成员列表的协程函数 fetch_members(group_id)
+            concurrency: 同时拉取的群数量上限
+            refresh_delay: 收到成员变动通知后延迟多久重新拉取（秒），
+                同一群在此期间的多次变动只拉取一次
+        """
+        self.fetch_groups = fetch_groups
+        self.fetch_members = fetch_members
+        self.concurrency = max(1, concurrency)
+        self.refresh_delay = refresh_delay
+
+        self.groups: Dict[int, GroupMemberIndex] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+        self._refreshing: Dict[int, asyncio.Task] = {}
+
+        self.prefetch_total = 0
+        self.prefetch_done = 0
+        self.prefetch_failed = 0
+        self.prefetch_seconds: Optional[float] = None
+
+    def start(self) -> asyncio.Task:
+        """
+        在后台拉取所有群的成员列表
+
+        Returns:
+            预取任务，可以 await 等待预取完成
+        """
+        if self._task is None or self._task.done():
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._task = asyncio.create_task(self.prefetch())
+        return self._task
+
+    async def stop(self):
+        """停止拉取"""
+        tasks = list(self._refreshing.values())
+        if self._task is not None:
+            tasks.append(self._task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._refreshing.clear()
+
+    async def _load(self, group_id: int) -> bool:
+        """拉取一个群的成员列表并重建索引"""
+        async with self._semaphore:
+            try:
+                members = await self.fetch_members(group_id)
+            except Exception as e:
+                logger.warning(f"拉取群 {group_id} 成员列表失败: {e}")
+                return False
+        self.groups[group_id] = GroupMemberIndex(group_id, members or [])
+        return True
+
+    async def prefetch(self):
+        """拉取所有群的成员列表"""
+        started = time.monotonic()
+        try:
+            groups = await self.fetch_groups()
+        except Exception as e:
+            logger.error(f"拉取群列表失败，跳过成员预取: {e}")
+            return
+
+        group_ids = [int(g["group_id"]) for g in groups or [] if "group_id" in g]
+        self.prefetch_total = len(group_ids)
+        self.prefetch_done = 0
+        self.prefetch_failed = 0
+        self.prefetch_seconds = None
+        # 已退出的群
+        for group_id in set(self.groups) - set(group_ids):
+            del self.groups[group_id]
+
+        async def load(group_id: int):
+            if await self._load(group_id):
+                self.prefetch_done += 1
+            else:
+                self.prefetch_failed += 1
+
+        await asyncio.gather(*(load(group_id) for group_id in group_ids))
+        self.prefetch_seconds = round(time.monotonic() - started, 3)
+        logger.info(
+            f"群成员预取完成: {self.prefetch_done}/{self.prefetch_total} 个群, "
+            f"{sum(len(index) for index in self.groups.values())} 名成员, "
+            f"耗时 {self.prefetch_seconds} 秒"
+        )
+
+    def refresh(self, group_id: int):
+        """在后台重新拉取一个群的成员列表（延迟合并多次调用）"""
+        if group_id in self._refreshing or self._semaphore is None:
+            return
+
+        async def delayed():
+            try:
+                await asyncio.sleep(self.refresh_delay)
+                await self._load(group_id)
+            finally:
+                self._refreshing.pop(group_id, None)
+
+        self._refreshing[group_id] = asyncio.create_task(delayed())
+
+    def on_notice(self, raw_event: Dict[str, Any], self_id: Optional[int] = None):
+        """
+        根据通知事件更新索引
+
+        Args:
+            raw_event: 通知事件的原始数据
+            self_id: 机器人 QQ 号
+        """
+        notice_type = raw_event.get("notice_type")
+        if notice_type not in (
+            "group_increase",
+            "group_decrease",
+            "group_admin",
+            "group_card",
+        ):
+            return
+        group_id = raw_event.get("group_id")
+        if group_id is None:
+            return
+        if (
+            notice_type == "group_decrease"
+            and self_id is not None
+            and raw_event.get("user_id") == self_id
+        ):
+            # 机器人自己退群或被踢
+            self.groups.pop(group_id, None)
+            return
+        self.refresh(group_id)
+
+    def get(self, group_id: int) -> Optional[GroupMemberIndex]:
+        """获取群的成员索引，尚未拉取时返回 None"""
+        return self.groups.get(int(group_id))
+
+    def get_member(self, group_id: int, user_id: int) -> Optional[Dict[str, Any]]:
+        """按群号和 QQ 号查询成员"""
+        index = self.groups.get(int(group_id))
+        return index.get(user_id) if index is not None else None
+
+    def search(
+        self, group_id: int, prefix: str, limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """按群名片或昵称前缀查询群成员"""
+        index = self.groups.get(int(group_id))
+        return index.search(prefix, limit) if index is not None else []
+
+    def get_stats(self, per_group: bool = False) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        默认只汇总各群建立索引时算好的数字，开销与群数成正比；
+        per_group 为 True 时还会遍历所有成员，计算共享字符串只计一次的准确内存占用。
+
+        Args:
+            per_group: 是否包含每个群的成员数和内存占用
+        """
+        groups = self.groups.values()
+        stats = {
+            "groups": len(self.groups),
+            "members": sum(len(index) for index in groups),
+            # 与其他群共享的字符串按群重复计算，是实际占用的上限
+            "bytes": sum(index.nbytes() + index.string_bytes() for index in groups),
+            "prefetch": {
+                "total": self.prefetch_total,
+                "done": self.prefetch_done,
+                "failed": self.prefetch_failed,
+                "running": self._task is not None and not self._task.done(),
+                "seconds": self.prefetch_seconds,
+            },
+            "refreshing": len(self._refreshing),
+        }
+        if per_group:
+            all_strings: Set[str] = set()
+            for index in groups:
+                all_strings |= index.strings()
+            # 所有群合计，共享的字符串只计一次
+            stats["unique_bytes"] = sum(index.nbytes() for index in groups) + sum(
+                sys.getsizeof(s) for s in all_strings
+            )
+            stats["per_group"] = {
+                group_id: {
+                    "members": len(index),
+                    "bytes": index.nbytes(),
+                    # 本群引用的字符串，与其他群共享的部分会重复计算
+                    "string_bytes": index.string_bytes(),
+                }
+                for group_id, index in self.groups.items()
+            }
+        return stats
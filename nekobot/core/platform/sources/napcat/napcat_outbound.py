@@ -0,0 +1,540 @@
+"""
+NapCat 出站消息调度
+按发送目标（群/私聊）排队，使用令牌桶控制每个目标和整个账号的发送速率，
+避免发送过快触发 QQ 风控；可选地把短时间内发往同一目标的多条消息合并发送
+"""
+
+import time
+import asyncio
+from collections import OrderedDict, deque
+from typing import (
+    Dict,
+    Any,
+    Optional,
+    Callable,
+    Awaitable,
+    Hashable,
+    List,
+    Deque,
+    Tuple,
+    Set,
+)
+
+from nekobot.utils.logger import get_logger
+from nekobot.core.platform.sources.napcat.napcat_stats import percentile
+
+logger = get_logger("napcat.outbound")
+
+# 优先级：数值越小越先发送
+PRIORITY_HIGH = 0  # 管理员指令的回复等
+PRIORITY_NORMAL = 1  # 普通回复
+PRIORITY_LOW = 2  # 群发、定时推送
+
+_LANE_NAMES = ("high", "normal", "low")
+
+# 保留最近多少次发送的排队时间用于统计
+_WAIT_SAMPLES = 1000
+
+
+class TokenBucket:
+    """令牌桶：平均每秒 rate 个令牌，最多积攒 burst 个"""
+
+    def __init__(self, rate: float, burst: float):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数
+            burst: 令牌上限（允许的突发数量）
+        """
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        """按经过的时间补充令牌"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """距离下一个令牌可用还需等待的时间（秒），0 表示可以立即发送"""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self, now: float):
+        """消耗一个令牌"""
+        self._refill(now)
+        self.tokens -= 1
+
+
+class OutboundJob:
+    """一条等待发送的消息"""
+
+    def __init__(
+        self,
+        target: Hashable,
+        action: str,
+        params: Dict[str, Any],
+        priority: int,
+        future: asyncio.Future,
+    ):
+        self.target = target
+        self.action = action
+        self.params = params
+        self.priority = priority
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+
+# 可以合并的发送接口
+_MERGEABLE_ACTIONS = ("send_group_msg", "send_private_msg", "send_msg")
+
+# 只能单独发送的消息段类型，包含这些消息段的消息不参与合并
+_STANDALONE_SEGMENTS = frozenset(
+    (
+        "record",
+        "video",
+        "file",
+        "forward",
+        "node",
+        "music",
+        "json",
+        "xml",
+        "poke",
+        "dice",
+        "rps",
+        "markdown",
+    )
+)
+
+
+class MessageCoalescer:
+    """
+    出站消息合并
+
+    同一目标的消息在队列中等待 window 秒，期间到达的后续消息与之合并：
+    较短时拼接为一条消息（消息之间插入换行），总文本较长或条数较多时
+    改为一条合并转发消息，每条原消息作为一个节点。
+
+    以下消息不参与合并，只能单独发送（也会截断合并，保证顺序）：
+    - 消息内容不是消息段列表（例如 CQ 码字符串）
+    - 包含语音、视频、文件、转发等只能单独发送的消息段
+    - 排在后面且带有回复消息段的消息（回复消息段必须位于消息开头）
+    """
+
+    def __init__(
+        self,
+        window_ms: float = 50,
+        max_messages: int = 10,
+        forward_threshold: int = 300,
+        forward_min_messages: int = 5,
+        separator: str = "\n",
+    ):
+        """
+        初始化合并器
+
+        Args:
+            window_ms: 合并窗口（毫秒），消息最多为合并额外等待这么久
+            max_messages: 一次最多合并多少条消息
+            forward_threshold: 合并后文本总长度超过该值时改为合并转发消息
+            forward_min_messages: 合并条数达到该值时改为合并转发消息
+            separator: 拼接为一条消息时插入在原消息之间的文本
+        """
+        self.window = max(0.0, window_ms) / 1000
+        self.max_messages = max(1, max_messages)
+        self.forward_threshold = forward_threshold
+        self.forward_min_messages = max(2, forward_min_messages)
+        self.separator = separator
+
+        # 合并转发节点的发送者，连接成功后由适配器设置为机器人自己
+        self.self_id: Optional[int] = None
+        self.nickname = "NekoBot"
+
+        self.batches = 0
+        self.merged = 0
+        self.forwards = 0
+
+    @staticmethod
+    def _text_length(message: List[Dict]) -> int:
+        """消息中文本消息段的总长度"""
+        return sum(
+            len(seg.get("data", {}).get("text", ""))
+            for seg in message
+            if seg.get("type") == "text"
+        )
+
+    def mergeable(self, job: "OutboundJob", first: bool) -> bool:
+        """
+        判断消息能否参与合并
+
+        Args:
+            job: 待发送的消息
+            first: 是否为合并批次中的第一条
+        """
+        if job.action not in _MERGEABLE_ACTIONS:
+            return False
+        message = job.params.get("message")
+        if not isinstance(message, list) or not message:
+            return False
+        for seg in message:
+            seg_type = seg.get("type")
+            if seg_type in _STANDALONE_SEGMENTS:
+                return False
+            if seg_type == "reply" and not first:
+                return False
+        return True
+
+    def take(self, jobs: Deque["OutboundJob"]) -> List["OutboundJob"]:
+        """
+        从目标的队列头部取出一批可以合并的消息
+
+        Args:
+            jobs: 目标的待发送队列（非空）
+
+        Returns:
+            按提交顺序排列的消息列表，至少包含一条
+        """
+        batch = [jobs.popleft()]
+        if not self.mergeable(batch[0], True):
+            return batch
+        while jobs and len(batch) < self.max_messages:
+            if not self.mergeable(jobs[0], False):
+                break
+            batch.append(jobs.popleft())
+        return batch
+
+    def merge(self, batch: List["OutboundJob"]) -> Tuple[str, Dict[str, Any]]:
+        """
+        把一批消息合并为一次 API 调用
+
+        Args:
+            batch: take() 取出的消息（至少两条）
+
+        Returns:
+            (API 名称, 请求参数)
+        """
+        self.batches += 1
+        self.merged += len(batch)
+        messages = [job.params["message"] for job in batch]
+        kind, target_id = batch[0].target
+
+        total = sum(self._text_length(m) for m in messages)
+        if total > self.forward_threshold or len(batch) >= self.forward_min_messages:
+            self.forwards += 1
+            sender = {"nickname": self.nickname}
+            if self.self_id is not None:
+                sender["user_id"] = self.self_id
+            nodes = [
+                {"type": "node", "data": {**sender, "content": m}} for m in messages
+            ]
+            if kind == "private":
+                return "send_private_forward_msg", {
+                    "user_id": target_id,
+                    "messages": nodes,
+                }
+            return "send_group_forward_msg", {"group_id": target_id, "messages": nodes}
+
+        merged: List[Dict] = []
+        for message in messages:
+            if merged and self.separator:
+                merged.append({"type": "text", "data": {"text": self.separator}})
+            merged.extend(message)
+        params = dict(batch[0].params)
+        params["message"] = merged
+        return batch[0].action, params
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取合并统计信息"""
+        return {
+            "window_ms": round(self.window * 1000, 1),
+            "batches": self.batches,
+            "merged_messages": self.merged,
+            "forwards": self.forwards,
+            # 合并节省的 API 调用次数
+            "saved_calls": self.merged - self.batches,
+        }
+
+
+class OutboundScheduler:
+    """
+    出站消息调度器
+
+    - 每个目标一个令牌桶（群和私聊分别配置），整个账号再共用一个令牌桶
+    - 三条优先级通道，高优先级通道中有可发送的消息时先发送
+    - 同一通道内按目标轮转，群发 500 个群时不会让某个群长时间独占
+    - 同一目标、同一优先级的消息按提交顺序逐条发送，前一条完成后才发送下一条
+    - 开启合并时，同一目标、同一优先级中相邻的消息可能合并为一次发送，
+      合并后的各条消息得到相同的返回值（同一个 message_id）
+    """
+
+    def __init__(
+        self,
+        sender: Callable[[str, Dict[str, Any]], Awaitable[Any]],
+        account_rate: float = 5.0,
+        account_burst: float = 10,
+        group_rate: float = 1.0,
+        group_burst: float = 5,
+        private_rate: float = 1.0,
+        private_burst: float = 5,
+        max_in_flight: int = 4,
+        coalesce: Optional[Dict[str, Any]] = None,
+        on_sent: Optional[Callable[[Hashable, str, Dict[str, Any], Any], None]] = None,
+    ):
+        """
+        初始化调度器
+
+        Args:
+            sender: 实际发送的协程函数 sender(action, params)
+            account_rate: 账号每秒最多发送的消息数
+            account_burst: 账号允许的突发消息数
+            group_rate: 每个群每秒最多发送的消息数
+            group_burst: 每个群允许的突发消息数
+            private_rate: 每个私聊每秒最多发送的消息数
+            private_burst: 每个私聊允许的突发消息数
+            max_in_flight: 同时在途的发送请求数上限
+            coalesce: 消息合并配置 (enabled / window_ms / max_messages /
+                forward_threshold / forward_min_messages / separator)，默认不合并
+            on_sent: 每次实际发送成功后调用 on_sent(target, action, params, result)，
+                参数为实际调用的接口和合并后的请求参数，合并发送时只调用一次
+        """
+        self.sender = sender
+        self.on_sent = on_sent
+        self.account_bucket = TokenBucket(account_rate, account_burst)
+        self._bucket_config = {
+            "group": (group_rate, group_burst),
+            "private": (private_rate, private_burst),
+        }
+        self.max_in_flight = max(1, max_in_flight)
+
+        coalesce = dict(coalesce or {})
+        self.coalescer: Optional[MessageCoalescer] = None
+        if coalesce.pop("enabled", False):
+            self.coalescer = MessageCoalescer(**coalesce)
+
+        self._lanes: List[OrderedDict] = [OrderedDict() for _ in _LANE_NAMES]
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+        self._busy: set = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._idle = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        # 保存发送任务的引用，避免发送途中被垃圾回收
+        self._sending: Set[asyncio.Task] = set()
+
+        self.queued = 0
+        self.in_flight = 0
+        self.peak_depth = 0
+        self.sent = 0
+        self.failed = 0
+        self._waits: Deque[float] = deque(maxlen=_WAIT_SAMPLES)
+
+    def start(self):
+        """启动调度协程（重复调用无副作用）"""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """停止调度，未发送的消息以 ConnectionError 失败"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        for lane in self._lanes:
+            for jobs in lane.values():
+                for job in jobs:
+                    if not job.future.done():
+                        job.future.set_exception(ConnectionError("出站调度器已停止"))
+            lane.clear()
+        self.queued = 0
+        self._idle.set()
+
+    async def flush(self, timeout: float = 10.0) -> bool:
+        """
+        等待排队和在途的消息全部发送完毕
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            是否在超时前全部发送
+        """
+        try:
+            await asyncio.wait_for(self._wait_idle(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"出站消息未能在 {timeout} 秒内发送完毕: {self.queued} 条")
+            return False
+
+    async def _wait_idle(self):
+        """等待没有排队和在途的消息（每条消息发送完毕时重新检查）"""
+        while self.queued or self.in_flight:
+            self._idle.clear()
+            await self._idle.wait()
+        return True
+
+    def _bucket(self, target: Hashable) -> TokenBucket:
+        """获取目标的令牌桶"""
+        bucket = self._buckets.get(target)
+        if bucket is None:
+            config = self._bucket_config
+            rate, burst = config.get(target[0], config["group"])
+            bucket = TokenBucket(rate, burst)
+            self._buckets[target] = bucket
+        return bucket
+
+    async def submit(
+        self,
+        target: Hashable,
+        action: str,
+        params: Dict[str, Any],
+        priority: int = PRIORITY_NORMAL,
+    ) -> Any:
+        """
+        提交一条消息并等待发送完成
+
+        Args:
+            target: 发送目标，("group", 群号) 或 ("private", QQ 号)
+            action: API 名称
+            params: 请求参数
+            priority: 优先级 PRIORITY_HIGH / PRIORITY_NORMAL / PRIORITY_LOW
+
+        Returns:
+            sender 的返回值
+        """
+        self.start()
+        priority = min(max(priority, PRIORITY_HIGH), PRIORITY_LOW)
+        future = asyncio.get_running_loop().create_future()
+        lane = self._lanes[priority]
+        jobs = lane.get(target)
+        if jobs is None:
+            jobs = lane[target] = deque()
+        jobs.append(OutboundJob(target, action, params, priority, future))
+
+        self.queued += 1
+        if self.queued > self.peak_depth:
+            self.peak_depth = self.queued
+        self._wakeup.set()
+        return await future
+
+    def _next_job(self, now: float):
+        """
+        选出下一条可以发送的消息
+
+        Returns:
+            (消息列表, None)，或没有可发送的消息时 (None, 最短等待时间)
+        """
+        if self.in_flight >= self.max_in_flight:
+            return None, None
+
+        account_wait = self.account_bucket.wait_time(now)
+        if account_wait > 0:
+            return None, account_wait
+
+        coalescer = self.coalescer
+        min_wait = None
+        for lane in self._lanes:
+            for target in lane:
+                if target in self._busy:
+                    continue
+                jobs = lane[target]
+                wait = self._bucket(target).wait_time(now)
+                if coalescer is not None:
+                    # 队首消息在合并窗口内等待后续消息
+                    wait = max(wait, jobs[0].enqueued_at + coalescer.window - now)
+                if wait > 0:
+                    min_wait = wait if min_wait is None else min(min_wait, wait)
+                    continue
+
+                if coalescer is not None:
+                    batch = coalescer.take(jobs)
+                else:
+                    batch = [jobs.popleft()]
+                # 轮转：发送过的目标移到队尾
+                if jobs:
+                    lane.move_to_end(target)
+                else:
+                    del lane[target]
+                return batch, None
+        return None, min_wait
+
+    async def _run(self):
+        """调度协程"""
+        while True:
+            now = time.monotonic()
+            batch, wait = (None, None) if not self.queued else self._next_job(now)
+            if batch is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            target = batch[0].target
+            self.account_bucket.consume(now)
+            self._bucket(target).consume(now)
+            self.queued -= len(batch)
+            self.in_flight += 1
+            self._busy.add(target)
+            task = asyncio.create_task(self._send(batch))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _send(self, batch: List[OutboundJob]):
+        """发送一条消息（或合并后的一批消息）"""
+        now = time.monotonic()
+        for job in batch:
+            self._waits.append(now - job.enqueued_at)
+
+        if len(batch) == 1:
+            action, params = batch[0].action, batch[0].params
+        else:
+            action, params = self.coalescer.merge(batch)
+
+        try:
+            result = await self.sender(action, params)
+            self.sent += len(batch)
+            if self.on_sent is not None:
+                try:
+                    self.on_sent(batch[0].target, action, params, result)
+                except Exception as e:
+                    logger.warning(f"出站消息发送回调失败: {e}")
+            for job in batch:
+                if not job.future.done():
+                    job.future.set_result(result)
+        except Exception as e:
+            self.failed += len(batch)
+            for job in batch:
+                if not job.future.done():
+                    job.future.set_exception(e)
+        finally:
+            self.in_flight -= 1
+            self._busy.discard(batch[0].target)
+            self._wakeup.set()
+            self._idle.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取调度统计信息"""
+        waits = sorted(self._waits)
+        return {
+            "queued": self.queued,
+            "lanes": {
+                name: sum(len(jobs) for jobs in lane.values())
+                for name, lane in zip(_LANE_NAMES, self._lanes)
+            },
+            "waiting_targets": len({t for lane in self._lanes for t in lane}),
+            "in_flight": self.in_flight,
+            "peak_depth": self.peak_depth,
+            "sent": self.sent,
+            "failed": self.failed,
+            "wait_ms": {
+                "p50": round(percentile(waits, 0.5) * 1000, 1),
+                "p99": round(percentile(waits, 0.99) * 1000, 1),
+                "max": round(waits[-1] * 1000, 1) if waits else 0.0,
+            },
+            "coalesce": self.coalescer.get_stats() if self.coalescer else None,
+        }
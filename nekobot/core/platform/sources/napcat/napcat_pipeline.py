@@ -0,0 +1,328 @@
+"""
+NapCat 事件接入流程
+反向 WebSocket 服务器与正向 WebSocket 客户端共用：
+上报数据 -> 解码 -> 账号绑定 / 元事件 / API 响应 -> 入站队列 -> 分发器 -> 处理器
+"""
+
+import time
+import asyncio
+from typing import Dict, Any, Optional, Callable, List, Union
+from nekobot.utils.logger import get_logger
+from nekobot.core.platform.sources.napcat.napcat_event import parse_event, EventHandler
+from nekobot.core.platform.sources.napcat.napcat_dispatcher import EventDispatcher
+from nekobot.core.platform.sources.napcat.napcat_codec import loads, DECODE_ERRORS
+from nekobot.core.platform.sources.napcat.napcat_connection import (
+    NapCatConnection,
+    NapCatConnectionRegistry,
+    get_connection_registry,
+    is_meta_frame,
+)
+from nekobot.core.platform.sources.napcat.napcat_ingress import IngressQueue
+from nekobot.core.platform.sources.napcat.napcat_capture import FrameRecorder
+from nekobot.core.platform.sources.napcat.napcat_dedup import DedupWindow, get_dedup_key
+
+logger = get_logger("napcat.pipeline")
+
+
+class NapCatEventPipeline:
+    """
+    NapCat 事件接入流程
+
+    不关心连接是如何建立的，只负责处理连接上收到的数据。
+    连接建立后调用 attach()，每收到一条数据调用 handle_frame()，
+    连接断开后调用 detach()。
+    """
+
+    def __init__(
+        self,
+        workers: int = 8,
+        queue_size: int = 1000,
+        conversation_size: int = 100,
+        handler_timeout: Optional[float] = None,
+        heartbeat_max_missed: int = 2,
+        ingress: Optional[Dict[str, Any]] = None,
+        registry: Optional[NapCatConnectionRegistry] = None,
+        capture: Optional[Dict[str, Any]] = None,
+        dedup: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        初始化接入流程
+
+        Args:
+            workers: 事件分发工作协程数量
+            queue_size: 事件分发队列总容量
+            conversation_size: 单个会话（群或私聊）最多积压的事件数
+            handler_timeout: 单个处理器的默认超时时间（秒）
+            heartbeat_max_missed: 连续丢失多少个心跳后认为连接不健康
+            ingress: 每个连接的入站队列配置 (capacity / watermarks / blacklist_groups)
+            registry: 连接注册表，默认使用全局注册表
+            capture: 上报数据录制配置 (enabled / directory / segment_size_mb)
+            dedup: 入站去重配置 (enabled / ttl / notice_ttl / max_size)，默认开启
+        """
+        self.event_handler = EventHandler(handler_timeout=handler_timeout)
+        self.dispatcher = EventDispatcher(
+            self.event_handler,
+            workers=workers,
+            queue_size=queue_size,
+            conversation_size=conversation_size,
+        )
+        self.heartbeat_max_missed = heartbeat_max_missed
+        self.ingress_config = ingress or {}
+        self.registry = registry or get_connection_registry()
+        self._connections: Dict[int, NapCatConnection] = {}
+        self._pumps: Dict[int, asyncio.Task] = {}
+        self.closing = False
+        self._drained: Optional[bool] = None
+        self._closed_shed: Dict[str, int] = {}
+        self._watchdog_task: Optional[asyncio.Task] = None
+
+        capture = dict(capture or {})
+        self.recorder: Optional[FrameRecorder] = None
+        if capture.pop("enabled", False):
+            self.recorder = FrameRecorder(**capture)
+            logger.info(f"已开启上报数据录制: {self.recorder.directory}")
+
+        dedup = dict(dedup or {})
+        self.dedup: Optional[DedupWindow] = None
+        if dedup.pop("enabled", True):
+            self.dedup = DedupWindow(**dedup)
+
+    def create_connection(
+        self,
+        remote: Optional[str] = None,
+        self_id: Optional[int] = None,
+        sender: Optional[Callable] = None,
+    ) -> NapCatConnection:
+        """
+        创建连接对象（入站队列使用本流程的配置）
+
+        Args:
+            remote: 对端地址
+            self_id: 机器人 QQ 号（可能为空）
+            sender: 向对端发送数据的协程函数
+
+        Returns:
+            连接对象
+        """
+        return NapCatConnection(
+            remote=remote,
+            self_id=self_id,
+            ingress=IngressQueue(**self.ingress_config),
+            sender=sender,
+        )
+
+    def attach(self, connection: NapCatConnection):
+        """
+        登记新连接并开始把它的入站事件交给分发器
+
+        Args:
+            connection: 连接对象
+        """
+        self.registry.add(connection)
+        self._connections[connection.conn_id] = connection
+        self.dispatcher.start()
+        self._start_watchdog()
+        self._pumps[connection.conn_id] = asyncio.create_task(self._pump(connection))
+        logger.info(f"NapCat 连接已建立: {connection.describe()}")
+
+    async def detach(self, connection: NapCatConnection):
+        """
+        注销连接，已入队的事件仍会交给分发器处理
+
+        Args:
+            connection: 连接对象
+        """
+        connection.fail_pending()
+        connection.ingress.close()
+        pump_task = self._pumps.pop(connection.conn_id, None)
+        if pump_task is not None:
+            # drain() 超时时转发任务可能已被取消
+            await asyncio.gather(pump_task, return_exceptions=True)
+        self._connections.pop(connection.conn_id, None)
+        self.registry.remove(connection)
+        for reason, count in connection.ingress.shed.items():
+            self._closed_shed[reason] = self._closed_shed.get(reason, 0) + count
+
+    async def handle_frame(
+        self, connection: NapCatConnection, data: Union[str, bytes]
+    ):
+        """
+        处理一条上报数据
+
+        Args:
+            connection: 收到数据的连接
+            data: WebSocket 收到的原始数据
+        """
+        connection.on_frame()
+        if self.recorder is not None:
+            self.recorder.record(data, connection.last_frame_at)
+
+        try:
+            # 心跳、生命周期等元事件只更新连接状态，不进入分发流程；
+            # 积压时直接丢弃，连解码也省掉
+            if is_meta_frame(data):
+                if not connection.ingress.shed_meta():
+                    event_data = loads(data)
+                    self._bind_account(connection, event_data)
+                    connection.handle_meta_event(event_data)
+                return
+
+            event_data = loads(data)
+
+            # 通过 WebSocket 发出的 API 调用的响应
+            if "post_type" not in event_data and "echo" in event_data:
+                if not connection.resolve_response(event_data):
+                    logger.debug(f"收到无对应调用的 API 响应: {event_data.get('echo')}")
+                return
+
+            # 关闭过程中只处理 API 响应，保证处理中的事件仍能发出回复
+            if self.closing:
+                return
+
+            self._bind_account(connection, event_data)
+            post_type = event_data.get("post_type")
+            if post_type == "meta_event":
+                connection.handle_meta_event(event_data)
+                return
+
+            logger.debug(f"收到事件: {post_type}")
+            if self.dedup is not None:
+                key = get_dedup_key(event_data)
+                if key is not None and self.dedup.check(key):
+                    logger.debug(f"过滤重复事件: {key}")
+                    return
+            if connection.account is not None:
+                connection.account.on_event()
+
+            # 解析事件并放入入站队列，不等待处理完成。队列满时丢弃而不是等待：
+            # API 响应也从这个连接读取，阻塞在这里会让等待响应的处理器超时
+            event = parse_event(event_data)
+            connection.ingress.put_nowait(event)
+
+        except DECODE_ERRORS as e:
+            logger.error(f"JSON 解析失败: {e}")
+        except Exception as e:
+            logger.error(f"事件处理失败: {e}", exc_info=True)
+
+    def _bind_account(
+        self, connection: NapCatConnection, event_data: Dict[str, Any]
+    ):
+        """连接未携带 X-Self-ID 时，根据首个事件中的 self_id 绑定账号"""
+        if connection.account is None:
+            self_id = event_data.get("self_id")
+            if self_id:
+                self.registry.bind(connection, self_id)
+
+    async def _pump(self, connection: NapCatConnection):
+        """把连接入站队列中的事件转交给分发器"""
+        while True:
+            event = await connection.ingress.get()
+            if event is None:
+                return
+            try:
+                await self.dispatcher.dispatch(event)
+            except Exception as e:
+                logger.error(f"事件分发失败: {e}", exc_info=True)
+
+    def _start_watchdog(self):
+        """启动心跳检查任务（重复调用无副作用）"""
+        if self._watchdog_task is None or self._watchdog_task.done():
+            self._watchdog_task = asyncio.create_task(self._heartbeat_watchdog())
+
+    async def _heartbeat_watchdog(self, check_interval: float = 5.0):
+        """定期检查所有连接的心跳"""
+        while True:
+            await asyncio.sleep(check_interval)
+            for connection in list(self.registry.connections.values()):
+                connection.check_heartbeat(self.heartbeat_max_missed)
+
+    async def drain(self, timeout: float = 10.0) -> bool:
+        """
+        停止接收新事件，并等待已收到的事件处理完毕
+
+        调用后连接仍然保持，处理器发出的 API 调用照常收到响应；
+        入站队列中的事件继续交给分发器，分发器中的事件（包括正在执行的处理器）
+        在 timeout 秒内处理完毕。超时后剩余的事件被丢弃。
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            是否在超时前处理完毕（重复调用时返回第一次的结果）
+        """
+        if self._drained is not None:
+            return self._drained
+        self.closing = True
+        started = time.monotonic()
+
+        async def drain_all():
+            for connection in list(self._connections.values()):
+                connection.ingress.close()
+            await asyncio.gather(*self._pumps.values())
+            return await self.dispatcher.drain()
+
+        try:
+            drained = await asyncio.wait_for(drain_all(), timeout)
+        except asyncio.TimeoutError:
+            drained = False
+            # 转发协程可能仍在等待分发器的空位，先取消再停止分发器
+            pumps = list(self._pumps.values())
+            for task in pumps:
+                task.cancel()
+            await asyncio.gather(*pumps, return_exceptions=True)
+
+        queued = self.dispatcher.get_stats()["queued"]
+        await self.dispatcher.stop()
+        if self._watchdog_task is not None:
+            self._watchdog_task.cancel()
+
+        self._drained = drained
+        if drained:
+            logger.info(
+                f"NapCat 事件已全部处理完毕，用时 {time.monotonic() - started:.2f} 秒"
+            )
+        else:
+            logger.warning(
+                f"等待 NapCat 事件处理超时（{timeout} 秒），丢弃 {queued} 个未处理的事件"
+            )
+        return drained
+
+    def close(self):
+        """关闭接入流程持有的资源（写入录制缓冲区）"""
+        if self.recorder is not None:
+            self.recorder.close()
+
+    def get_connections(self) -> List[Dict[str, Any]]:
+        """获取所有连接的状态"""
+        return [
+            connection.to_dict() for connection in self.registry.connections.values()
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计信息（连接、入站队列、分发器）"""
+        shed = dict(self._closed_shed)
+        for connection in self.registry.connections.values():
+            for reason, count in connection.ingress.shed.items():
+                shed[reason] = shed.get(reason, 0) + count
+
+        return {
+            "accounts": self.registry.get_accounts(),
+            "connections": self.get_connections(),
+            "shed": shed,
+            "dedup": self.dedup.get_stats() if self.dedup is not None else None,
+            "capture": self.recorder.get_stats() if self.recorder else None,
+            "dispatcher": self.dispatcher.get_stats(),
+            "handlers": self.event_handler.get_stats(),
+        }
+
+    def on_message(self, func: Optional[Callable] = None, **kwargs):
+        """注册消息处理器（装饰器）"""
+        return self.event_handler.on_message(func, **kwargs)
+
+    def on_notice(self, func: Optional[Callable] = None, **kwargs):
+        """注册通知处理器（装饰器）"""
+        return self.event_handler.on_notice(func, **kwargs)
+
+    def on_request(self, func: Optional[Callable] = None, **kwargs):
+        """注册请求处理器（装饰器）"""
+        return self.event_handler.on_request(func, **kwargs)
@@ -0,0 +1,159 @@
+"""
+NapCat 上报数据回放
+把录制的数据按原速、N 倍速或最快速度重新送入接入流程，统计吞吐量与分发延迟
+"""
+
+import time
+import asyncio
+from typing import Dict, Any, Optional, List, Tuple
+
+from nekobot.core.platform.sources.napcat.napcat_event import parse_event, EventHandler
+from nekobot.core.platform.sources.napcat.napcat_codec import loads
+from nekobot.core.platform.sources.napcat.napcat_connection import (
+    NapCatConnectionRegistry,
+    is_meta_frame,
+)
+from nekobot.core.platform.sources.napcat.napcat_pipeline import NapCatEventPipeline
+from nekobot.core.platform.sources.napcat.napcat_stats import percentile
+
+
+class FrameReplayer:
+    """
+    上报数据回放器
+
+    target 为 "pipeline" 时，数据经过与 WebSocket 服务器完全相同的接入流程
+    （元事件快速路径、入站队列、分发器），延迟为数据送入到处理器执行完毕的时间；
+    为 "handler" 时只调用 parse_event() 和 EventHandler.handle_event()，
+    用于单独观察事件解析与处理器的开销。
+    """
+
+    def __init__(
+        self,
+        target: str = "pipeline",
+        pipeline: Optional[NapCatEventPipeline] = None,
+        event_handler: Optional[EventHandler] = None,
+    ):
+        """
+        初始化回放器
+
+        Args:
+            target: "pipeline" 或 "handler"
+            pipeline: 接入流程，默认新建（使用独立的连接注册表）
+            event_handler: target 为 "handler" 时使用的事件处理器，默认取接入流程的处理器
+        """
+        if target not in ("pipeline", "handler"):
+            raise ValueError(f"未知的回放目标: {target}")
+        self.target = target
+        self.pipeline = pipeline or NapCatEventPipeline(
+            registry=NapCatConnectionRegistry()
+        )
+        self.event_handler = event_handler or self.pipeline.event_handler
+
+        self._latencies: List[float] = []
+        self._started: Dict[int, float] = {}
+        self._frame_started = 0.0
+        self._events = 0
+
+    def _instrument(self, connection):
+        """记录每个事件送入入站队列的时间和处理完毕的时间"""
+        ingress_put = connection.ingress.put_nowait
+        handle_event = self.event_handler.handle_event
+
+        def put(event):
+            self._started[id(event)] = self._frame_started
+            accepted = ingress_put(event)
+            if not accepted:
+                self._started.pop(id(event), None)
+            return accepted
+
+        async def timed_handle_event(event):
+            try:
+                await handle_event(event)
+            finally:
+                started = self._started.pop(id(event), None)
+                if started is not None:
+                    self._latencies.append(time.perf_counter() - started)
+
+        connection.ingress.put_nowait = put
+        self.event_handler.handle_event = timed_handle_event
+
+    async def _feed_handler(self, data: bytes):
+        """直接解析并处理一条数据"""
+        if is_meta_frame(data):
+            return
+        event_data = loads(data)
+        if "post_type" not in event_data or event_data["post_type"] == "meta_event":
+            return
+
+        started = time.perf_counter()
+        await self.event_handler.handle_event(parse_event(event_data))
+        self._latencies.append(time.perf_counter() - started)
+        self._events += 1
+
+    async def replay(
+        self, frames: List[Tuple[float, bytes]], speed: float = 0
+    ) -> Dict[str, Any]:
+        """
+        回放上报数据
+
+        Args:
+            frames: (到达时间戳, 原始数据) 列表
+            speed: 回放倍速，1 为原速，0 表示不等待、以最快速度回放
+
+        Returns:
+            回放报告（吞吐量与延迟分位数，单位毫秒）
+        """
+        self._latencies = []
+        self._started = {}
+        self._events = 0
+
+        connection = None
+        if self.target == "pipeline":
+            connection = self.pipeline.create_connection(remote="replay")
+            self._instrument(connection)
+            self.pipeline.attach(connection)
+
+        first_at = frames[0][0] if frames else 0.0
+        start = time.perf_counter()
+        for arrived_at, data in frames:
+            if speed > 0:
+                delay = (arrived_at - first_at) / speed - (time.perf_counter() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            if connection is None:
+                await self._feed_handler(data)
+            else:
+                # 入站队列满时接入流程会丢弃事件；最快速度回放时等待空位，
+                # 测量的是处理能力而不是丢弃速度
+                if speed <= 0:
+                    await connection.ingress.wait_for_space()
+                self._frame_started = time.perf_counter()
+                await self.pipeline.handle_frame(connection, data)
+        fed = time.perf_counter() - start
+
+        if connection is not None:
+            # 等待入站队列和分发器中的事件全部处理完毕
+            await self.pipeline.detach(connection)
+            await self.pipeline.dispatcher.drain()
+            self._events = connection.ingress.accepted
+            await self.pipeline.dispatcher.stop()
+            del self.event_handler.handle_event
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(self._latencies)
+        return {
+            "target": self.target,
+            "speed": speed,
+            "frames": len(frames),
+            "events": self._events,
+            "feed_seconds": round(fed, 3),
+            "elapsed_seconds": round(elapsed, 3),
+            "frames_per_second": round(len(frames) / elapsed, 1) if elapsed else 0,
+            "events_per_second": round(self._events / elapsed, 1) if elapsed else 0,
+            "latency_ms": {
+                "p50": round(percentile(latencies, 0.5) * 1000, 3),
+                "p99": round(percentile(latencies, 0.99) * 1000, 3),
+                "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+            },
+        }
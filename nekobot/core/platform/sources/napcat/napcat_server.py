@@ -4,11 +4,13 @@ NapCat WebSocket 服务器
 """
 
 import asyncio
-import json
-from typing import Optional, Callable
+from typing import Dict, Any, Optional, Callable, List
 from quart import Quart, websocket as quart_websocket
 from nekobot.utils.logger import get_logger
-from nekobot.core.platform.sources.napcat.napcat_event import parse_event, EventHandler
+from nekobot.core.platform.sources.napcat.napcat_connection import (
+    NapCatConnectionRegistry,
+)
+from nekobot.core.platform.sources.napcat.napcat_pipeline import NapCatEventPipeline
 
 logger = get_logger("napcat.server")
 
@@ -16,7 +18,24 @@ logger = get_logger("napcat.server")
 class NapCatWebSocketServer:
     """NapCat WebSocket 服务器"""
 
-    def __init__(self, host: str = "0.0.0.0", port: int = 6299, access_token: Optional[str] = None):
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 6299,
+        access_token: Optional[str] = None,
+        workers: int = 8,
+        queue_size: int = 1000,
+        conversation_size: int = 100,
+        handler_timeout: Optional[float] = None,
+        heartbeat_max_missed: int = 2,
+        ingress: Optional[Dict[str, Any]] = None,
+        registry: Optional[NapCatConnectionRegistry] = None,
+        capture: Optional[Dict[str, Any]] = None,
+        dedup: Optional[Dict[str, Any]] = None,
+        pipeline: Optional[NapCatEventPipeline] = None,
+        app: Optional[Quart] = None,
+        path: str = "/ws",
+    ):
         """
         初始化 WebSocket 服务器
 
@@ -24,25 +43,68 @@ class NapCatWebSocketServer:
             host: 监听地址
             port: 监听端口
             access_token: 访问令牌（可选）
+            workers: 事件分发工作协程数量
+            queue_size: 事件分发队列总容量
+            conversation_size: 单个会话（群或私聊）最多积压的事件数
+            handler_timeout: 单个处理器的默认超时时间（秒）
+            heartbeat_max_missed: 连续丢失多少个心跳后认为连接不健康
+            ingress: 每个连接的入站队列配置 (capacity / watermarks / blacklist_groups)
+            registry: 连接注册表，默认使用全局注册表
+            capture: 上报数据录制配置 (enabled / directory / segment_size_mb)
+            dedup: 入站去重配置 (enabled / ttl / notice_ttl / max_size)
+            pipeline: 事件接入流程，传入时忽略上面的分发与入站队列参数
+            app: 挂载到已有的 Quart 应用（例如 Web 仪表盘），不传时单独监听 host:port
+            path: WebSocket 路由路径
         """
         self.host = host
         self.port = port
         self.access_token = access_token
-        self.event_handler = EventHandler()
-
-        self.app = Quart(f"napcat_ws_{port}")
-        self._setup_routes()
-
-        logger.info(f"NapCat WebSocket 服务器初始化: {host}:{port}")
+        self.pipeline = pipeline or NapCatEventPipeline(
+            workers=workers,
+            queue_size=queue_size,
+            conversation_size=conversation_size,
+            handler_timeout=handler_timeout,
+            heartbeat_max_missed=heartbeat_max_missed,
+            ingress=ingress,
+            registry=registry,
+            capture=capture,
+            dedup=dedup,
+        )
+        self.event_handler = self.pipeline.event_handler
+        self.dispatcher = self.pipeline.dispatcher
+        self.registry = self.pipeline.registry
+        self._sockets: Dict[int, Any] = {}
+        self._shutdown_event = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.path = path
+        self.mounted = app is not None
+        self.app = app or Quart(f"napcat_ws_{port}")
+        self.register_routes(self.app, path)
+
+        if self.mounted:
+            logger.info(f"NapCat WebSocket 服务器初始化: 挂载于主应用 {path}")
+        else:
+            logger.info(f"NapCat WebSocket 服务器初始化: {host}:{port}")
+
+    def register_routes(self, app: Quart, path: str = "/ws"):
+        """
+        在 Quart 应用上注册 OneBot WebSocket 路由
 
-    def _setup_routes(self):
-        """设置路由"""
+        Args:
+            app: Quart 应用
+            path: 路由路径
+        """
 
-        @self.app.websocket("/ws")
+        @app.websocket(path, endpoint="napcat_onebot_ws")
         async def ws_handler():
             """WebSocket 连接处理"""
             logger.info("收到 WebSocket 连接请求")
 
+            if self.pipeline.closing:
+                await quart_websocket.close(1001, "服务器正在关闭")
+                return
+
             # 验证 access_token
             if self.access_token:
                 auth_header = quart_websocket.headers.get("Authorization")
@@ -57,47 +119,106 @@ class NapCatWebSocketServer:
                     await quart_websocket.close(1008, "认证失败")
                     return
 
-            logger.info("WebSocket 连接已建立")
+            # 多个账号可以连接同一个端口，通过 X-Self-ID 头区分
+            self_id = quart_websocket.headers.get("X-Self-ID")
+            ws = quart_websocket._get_current_object()
+            connection = self.pipeline.create_connection(
+                remote=quart_websocket.remote_addr,
+                self_id=int(self_id) if self_id and self_id.isdigit() else None,
+                sender=ws.send,
+            )
+            self.pipeline.attach(connection)
+            self._sockets[connection.conn_id] = ws
 
             try:
                 while True:
                     data = await quart_websocket.receive()
-
-                    try:
-                        event_data = json.loads(data)
-                        logger.debug(f"收到事件: {event_data.get('post_type')}")
-
-                        # 解析并处理事件
-                        event = parse_event(event_data)
-                        await self.event_handler.handle_event(event)
-
-                    except json.JSONDecodeError as e:
-                        logger.error(f"JSON 解析失败: {e}")
-                    except Exception as e:
-                        logger.error(f"事件处理失败: {e}", exc_info=True)
+                    await self.pipeline.handle_frame(connection, data)
 
             except Exception as e:
                 logger.warning(f"WebSocket 连接断开: {e}")
+            finally:
+                self._sockets.pop(connection.conn_id, None)
+                await self.pipeline.detach(connection)
+
+    def get_connections(self) -> List[Dict[str, Any]]:
+        """获取所有连接的状态"""
+        return self.pipeline.get_connections()
 
-    def on_message(self, func: Callable):
+    def get_stats(self) -> Dict[str, Any]:
+        """获取服务器统计信息（连接、入站队列、分发器）"""
+        return self.pipeline.get_stats()
+
+    def on_message(self, func: Optional[Callable] = None, **kwargs):
         """注册消息处理器（装饰器）"""
-        return self.event_handler.on_message(func)
+        return self.event_handler.on_message(func, **kwargs)
 
-    def on_notice(self, func: Callable):
+    def on_notice(self, func: Optional[Callable] = None, **kwargs):
         """注册通知处理器（装饰器）"""
-        return self.event_handler.on_notice(func)
+        return self.event_handler.on_notice(func, **kwargs)
 
-    def on_request(self, func: Callable):
+    def on_request(self, func: Optional[Callable] = None, **kwargs):
         """注册请求处理器（装饰器）"""
-        return self.event_handler.on_request(func)
+        return self.event_handler.on_request(func, **kwargs)
 
     async def run(self):
-        """运行服务器"""
+        """运行服务器（挂载到主应用时由主应用负责监听，这里无需操作）"""
+        if self.mounted:
+            return
         logger.info(f"NapCat WebSocket 服务器启动: ws://{self.host}:{self.port}")
-        await self.app.run_task(host=self.host, port=self.port)
+        await self.app.run_task(
+            host=self.host, port=self.port, shutdown_trigger=self._shutdown_event.wait
+        )
 
     async def start_background(self):
         """在后台启动服务器"""
-        asyncio.create_task(self.run())
+        if self.mounted:
+            return
+        self._task = asyncio.create_task(self.run())
         logger.info("NapCat WebSocket 服务器已在后台启动")
 
+    async def stop(self, timeout: float = 10.0):
+        """
+        平滑关闭服务器
+
+        依次：拒绝新连接并停止接收新事件 -> 等待已收到的事件处理完毕
+        （处理器仍可通过现有连接调用 API）-> 关闭所有连接 -> 停止监听。
+
+        Args:
+            timeout: 等待事件处理完毕的最长时间（秒）
+        """
+        await self.pipeline.drain(timeout)
+
+        for ws in list(self._sockets.values()):
+            try:
+                await ws.close(1001, "服务器关闭")
+            except Exception as e:
+                logger.debug(f"关闭 WebSocket 连接失败: {e}")
+
+        self._shutdown_event.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, 5.0)
+            except asyncio.TimeoutError:
+                self._task.cancel()
+            except Exception as e:
+                logger.warning(f"NapCat WebSocket 服务器退出异常: {e}")
+            self._task = None
+
+        self.pipeline.close()
+        logger.info("NapCat WebSocket 服务器已关闭")
+
+
+# 全局 NapCat WebSocket 服务器实例（未启用时为 None）
+_napcat_server: Optional[NapCatWebSocketServer] = None
+
+
+def set_napcat_server(server: Optional[NapCatWebSocketServer]):
+    """设置全局 NapCat WebSocket 服务器实例"""
+    global _napcat_server
+    _napcat_server = server
+
+
+def get_napcat_server() -> Optional[NapCatWebSocketServer]:
+    """获取全局 NapCat WebSocket 服务器实例"""
+    return _napcat_server
@@ -0,0 +1,14 @@
+"""
+NapCat 统计工具
+出站队列、回放、负载测试共用的统计函数
+"""
+
+from typing import List
+
+
+def percentile(sorted_values: List[float], ratio: float) -> float:
+    """计算已排序数据的分位数"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * ratio))
+    return sorted_values[index]
@@ -0,0 +1,379 @@
+"""
+NapCat API 传输层
+支持通过 HTTP 或反向 WebSocket 调用 OneBot API
+"""
+
+import time
+import random
+import asyncio
+from typing import Dict, Any, Optional
+
+import aiohttp
+
+from nekobot.utils.logger import get_logger
+from nekobot.core.platform.sources.napcat.napcat_codec import (
+    loads,
+    dumps,
+    DECODE_ERRORS,
+)
+from nekobot.core.platform.sources.napcat.napcat_connection import (
+    NapCatConnectionRegistry,
+    get_connection_registry,
+)
+
+logger = get_logger("napcat.transport")
+
+
+class CircuitOpenError(ConnectionError):
+    """熔断器打开时快速失败"""
+
+
+class CircuitBreaker:
+    """
+    熔断器
+
+    连续失败 failure_threshold 次后打开，打开期间的调用直接失败，
+    不再发起请求、也不会堆积等待中的协程；reset_timeout 秒后进入半开状态，
+    放行一个探测请求，成功则关闭，失败则重新打开。
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        初始化熔断器
+
+        Args:
+            failure_threshold: 连续失败多少次后打开
+            reset_timeout: 打开后多久允许探测（秒）
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.opened_count = 0
+        self.rejected = 0
+        self._probing = False
+
+    def allow(self) -> bool:
+        """是否允许发起调用"""
+        if self.state == self.CLOSED:
+            return True
+
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self._probing = False
+
+        # 半开状态只放行一个探测请求
+        if self._probing:
+            self.rejected += 1
+            return False
+        self._probing = True
+        return True
+
+    def record_success(self):
+        """记录一次成功"""
+        if self.state != self.CLOSED:
+            logger.info("NapCat API 已恢复，熔断器关闭")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def release(self):
+        """
+        调用既未成功也未失败（例如被取消）时释放探测名额，
+        否则半开状态会一直拒绝后续调用
+        """
+        self._probing = False
+
+    def record_failure(self):
+        """记录一次失败"""
+        self.failures += 1
+        self._probing = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(
+                    f"NapCat API 连续失败 {self.failures} 次，熔断 {self.reset_timeout} 秒"
+                )
+                self.opened_count += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        retry_in = None
+        if self.state == self.OPEN:
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout": self.reset_timeout,
+            "retry_in": retry_in,
+            "opened_count": self.opened_count,
+            "rejected": self.rejected,
+        }
+
+
+class _ServerError(Exception):
+    """NapCat 返回 5xx，视为暂时性故障"""
+
+
+# 只读接口重复调用没有副作用，超时或 5xx 后也可以重试
+_IDEMPOTENT_PREFIXES = ("get_", "can_")
+
+
+class HttpApiTransport:
+    """
+    通过 NapCat HTTP API 调用
+
+    使用长连接连接池；暂时性故障按指数退避重试，
+    连续失败时由熔断器快速失败。发送消息等非只读接口只在连接未建立时重试，
+    避免请求已到达 NapCat 但响应超时导致重复发送。
+    """
+
+    name = "http"
+
+    def __init__(
+        self,
+        base_url: str,
+        headers: Optional[Dict[str, str]] = None,
+        pool_size: int = 32,
+        keepalive_timeout: float = 30.0,
+        connect_timeout: float = 3.0,
+        read_timeout: float = 10.0,
+        max_retries: int = 2,
+        retry_backoff: float = 0.2,
+        breaker_threshold: int = 5,
+        breaker_reset: float = 30.0,
+    ):
+        """
+        初始化 HTTP 传输
+
+        Args:
+            base_url: NapCat HTTP API 地址
+            headers: 请求头
+            pool_size: 连接池大小（NapCat 只有一个地址，即单主机连接数上限）
+            keepalive_timeout: 空闲连接保持时间（秒）
+            connect_timeout: 建立连接超时（秒）
+            read_timeout: 读取响应超时（秒）
+            max_retries: 暂时性故障的最大重试次数
+            retry_backoff: 首次重试前的等待时间（秒），之后每次翻倍
+            breaker_threshold: 连续失败多少次后熔断
+            breaker_reset: 熔断后多久尝试恢复（秒）
+        """
+        self.base_url = base_url
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(
+            total=None, connect=connect_timeout, sock_read=read_timeout
+        )
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff = retry_backoff
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset)
+
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+
+    async def start(self):
+        """创建 HTTP 会话"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300,
+            )
+            self.session = aiohttp.ClientSession(
+                headers=self.headers, connector=connector, timeout=self.timeout
+            )
+
+    async def close(self):
+        """关闭 HTTP 会话"""
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    async def _post(self, action: str, params: Optional[Dict]) -> Dict[str, Any]:
+        """发送一次请求"""
+        url = f"{self.base_url}/{action}"
+        async with self.session.post(url, data=dumps(params or {})) as resp:
+            if resp.status >= 500:
+                raise _ServerError(f"HTTP {resp.status}")
+            return loads(await resp.read())
+
+    def _should_retry(self, action: str, error: Exception) -> bool:
+        """判断失败的调用能否重试"""
+        # 连接未建立，请求一定没有到达 NapCat
+        if isinstance(error, aiohttp.ClientConnectorError):
+            return True
+        if action.startswith(_IDEMPOTENT_PREFIXES):
+            return isinstance(
+                error, (aiohttp.ClientError, asyncio.TimeoutError, _ServerError)
+            )
+        return False
+
+    async def call(self, action: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        调用 API
+
+        Args:
+            action: API 名称
+            params: 请求参数
+
+        Returns:
+            NapCat 的原始响应
+        """
+        if not self.session:
+            raise RuntimeError("NapCat 未连接")
+
+        self.calls += 1
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"NapCat API 已熔断，暂停调用: {action}")
+
+            try:
+                result = await self._post(action, params)
+            except (
+                aiohttp.ClientError,
+                asyncio.TimeoutError,
+                _ServerError,
+                *DECODE_ERRORS,
+            ) as e:
+                self.breaker.record_failure()
+                if attempt >= self.max_retries or not self._should_retry(action, e):
+                    self.failures += 1
+                    raise
+            except BaseException:
+                # 被取消或其他异常：不计入失败，但必须释放半开状态的探测名额
+                self.breaker.release()
+                raise
+            else:
+                self.breaker.record_success()
+                return result
+
+            # 带随机抖动的指数退避
+            delay = self.retry_backoff * 2**attempt
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取传输层统计信息"""
+        return {
+            "transport": self.name,
+            "base_url": self.base_url,
+            "pool_size": self.pool_size,
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "breaker": self.breaker.to_dict(),
+        }
+
+
+class WebSocketApiTransport:
+    """
+    通过 NapCat 已建立的反向 WebSocket 连接调用
+
+    请求与上报事件共用同一个连接，不需要额外的 HTTP 端口和鉴权配置，
+    多个调用可以同时在途，响应按 echo 对应。
+    """
+
+    name = "ws"
+
+    def __init__(
+        self,
+        self_id: Optional[int] = None,
+        timeout: float = 10.0,
+        registry: Optional[NapCatConnectionRegistry] = None,
+    ):
+        """
+        初始化 WebSocket 传输
+
+        Args:
+            self_id: 机器人 QQ 号，None 表示使用唯一的在线账号
+            timeout: 单次调用超时时间（秒）
+            registry: 连接注册表，默认使用全局注册表
+        """
+        self.self_id = self_id
+        self.timeout = timeout
+        self.registry = registry or get_connection_registry()
+
+    async def start(self):
+        """WebSocket 连接由 NapCat 主动建立，这里无需操作"""
+        if self.registry.get(self.self_id) is None:
+            logger.info(f"等待 NapCat 反向 WebSocket 连接: {self.self_id or '任意账号'}")
+
+    async def close(self):
+        """WebSocket 连接由服务器管理，这里无需操作"""
+
+    async def call(self, action: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        调用 API
+
+        Args:
+            action: API 名称
+            params: 请求参数
+
+        Returns:
+            NapCat 的原始响应
+        """
+        connection = self.registry.get(self.self_id)
+        if connection is None:
+            raise RuntimeError(
+                f"没有可用的 NapCat WebSocket 连接: {self.self_id or '任意账号'}"
+            )
+        return await connection.call_api(action, params, timeout=self.timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取传输层统计信息"""
+        connection = self.registry.get(self.self_id)
+        return {
+            "transport": self.name,
+            "self_id": self.self_id,
+            "connected": connection is not None,
+            "connection": connection.to_dict() if connection else None,
+        }
+
+
+def create_transport(config: Dict[str, Any], base_url: str, headers: Dict[str, str]):
+    """
+    根据适配器配置创建传输层
+
+    Args:
+        config: 适配器配置，api_transport 为 "http"（默认）或 "ws"，
+            其余键见 NapCatAdapter 的说明
+        base_url: NapCat HTTP API 地址
+        headers: HTTP 请求头
+
+    Returns:
+        传输层实例
+    """
+    transport = config.get("api_transport", "http")
+    timeout = config.get("api_timeout", 10.0)
+    if transport == "ws":
+        return WebSocketApiTransport(self_id=config.get("self_id"), timeout=timeout)
+    if transport != "http":
+        raise ValueError(f"未知的 NapCat API 传输方式: {transport}")
+    return HttpApiTransport(
+        base_url,
+        headers,
+        pool_size=config.get("http_pool_size", 32),
+        keepalive_timeout=config.get("http_keepalive", 30.0),
+        connect_timeout=config.get("connect_timeout", 3.0),
+        read_timeout=timeout,
+        max_retries=config.get("max_retries", 2),
+        retry_backoff=config.get("retry_backoff", 0.2),
+        breaker_threshold=config.get("breaker_threshold", 5),
+        breaker_reset=config.get("breaker_reset", 30.0),
+    )
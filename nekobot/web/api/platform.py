@@ -5,6 +5,7 @@
 from quart import Blueprint, request, jsonify
 from nekobot.auth.jwt_auth import require_auth
 from nekobot.core.adapter_manager import get_adapter_manager
+from nekobot.core.platform.registry import get_adapter_registry
 from nekobot.utils.logger import get_logger
 
 logger = get_logger("api.platform")
@@ -22,13 +23,16 @@ async def list_platforms():
 
         result = []
         for name, adapter in adapters.items():
-            result.append(
-                {
-                    "name": name,
-                    "type": adapter["type"],
-                    "is_active": adapter["is_active"],
-                }
-            )
+            item = {
+                "name": name,
+                "type": adapter["type"],
+                "is_active": adapter["is_active"],
+                **manager.get_status(name),
+            }
+            instance = adapter.get("instance")
+            if instance is not None and hasattr(instance, "get_stats"):
+                item["stats"] = instance.get_stats()
+            result.append(item)
 
         return jsonify({"adapters": result}), 200
 
@@ -37,6 +41,42 @@ async def list_platforms():
         return jsonify({"error": "获取平台适配器列表失败"}), 500
 
 
+@platform_bp.route("/types", methods=["GET"])
+@require_auth
+async def list_platform_types():
+    """获取可用的平台适配器类型"""
+    try:
+        return jsonify({"types": get_adapter_registry().get_types()}), 200
+
+    except Exception as e:
+        logger.error(f"获取平台适配器类型失败: {e}")
+        return jsonify({"error": "获取平台适配器类型失败"}), 500
+
+
+@platform_bp.route("/<platform_name>/status", methods=["GET"])
+@require_auth
+async def get_platform_status(platform_name: str):
+    """获取平台适配器运行状态（连接状态、传输层、熔断器）"""
+    try:
+        manager = get_adapter_manager()
+        adapter = manager.get_adapter(platform_name)
+        if adapter is None:
+            return jsonify({"error": "平台适配器不存在"}), 404
+
+        instance = adapter.get("instance")
+        if instance is None:
+            return jsonify({"error": "平台适配器未运行"}), 404
+
+        result = {"name": platform_name, **manager.get_status(platform_name)}
+        if hasattr(instance, "get_stats"):
+            result.update(instance.get_stats())
+        return jsonify(result), 200
+
+    except Exception as e:
+        logger.error(f"获取平台适配器状态失败: {e}")
+        return jsonify({"error": "获取平台适配器状态失败"}), 500
+
+
 @platform_bp.route("/add", methods=["POST"])
 @require_auth
 async def add_platform():
@@ -51,6 +91,9 @@ async def add_platform():
         if not name or not platform_type:
             return jsonify({"error": "缺少必要参数"}), 400
 
+        if not get_adapter_registry().is_registered(platform_type):
+            return jsonify({"error": f"不支持的平台类型: {platform_type}"}), 400
+
         manager = get_adapter_manager()
         success = await manager.add_adapter(name, platform_type, config)
 
@@ -40,6 +40,35 @@ async def get_system_info():
         return jsonify({"error": "获取系统信息失败"}), 500
 
 
+@system_bp.route("/napcat", methods=["GET"])
+@require_auth
+async def get_napcat_stats():
+    """获取 NapCat 接入统计（连接状态、入站队列积压与丢弃计数、分发器）"""
+    try:
+        from nekobot.core.platform.sources.napcat.napcat_server import (
+            get_napcat_server,
+        )
+        from nekobot.core.platform.sources.napcat.napcat_client import (
+            get_napcat_client,
+        )
+
+        server = get_napcat_server()
+        client = get_napcat_client()
+        if server is None and client is None:
+            return jsonify({"error": "NapCat WebSocket 服务器与客户端均未启用"}), 404
+
+        pipeline = server.pipeline if server else client.pipeline
+        stats = pipeline.get_stats()
+        if client is not None:
+            stats["client"] = client.get_stats()
+
+        return jsonify(stats), 200
+
+    except Exception as e:
+        logger.error(f"获取 NapCat 统计信息失败: {e}")
+        return jsonify({"error": "获取 NapCat 统计信息失败"}), 500
+
+
 @system_bp.route("/version", methods=["GET"])
 async def get_version():
     """获取版本信息（无需认证）"""
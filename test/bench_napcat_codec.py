@@ -0,0 +1,91 @@
+"""
+OneBot JSON 编解码基准测试
+
+对比当前环境中可用的 JSON 编解码器（orjson / msgspec / json）解码 NapCat 上报数据的吞吐量
+
+运行方式:
+    python test/bench_napcat_codec.py [--rounds 20000] [--file frames.ndjson[.gz]]
+
+--file 指定录制的 NapCat 上报数据，每行一条原始 JSON；不指定时使用内置样例
+"""
+
+import sys
+import gzip
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from nekobot.core.platform.sources.napcat.napcat_codec import (  # noqa: E402
+    get_available_codecs,
+)
+
+# 内置样例：NapCat 实际上报的典型数据
+SAMPLE_FRAMES = [
+    b'{"time":1730000000,"self_id":10000,"post_type":"meta_event","meta_event_type":"heartbeat",'
+    b'"status":{"online":true,"good":true},"interval":30000}',
+    '{"self_id":10000,"user_id":20001,"time":1730000001,"message_id":-2147480001,'
+    '"message_seq":-2147480001,"real_id":-2147480001,"message_type":"group",'
+    '"sender":{"user_id":20001,"nickname":"喵喵","card":"群名片","role":"member"},'
+    '"raw_message":"[CQ:at,qq=10000] 今天天气怎么样？","font":14,"sub_type":"normal",'
+    '"message":[{"type":"at","data":{"qq":"10000"}},{"type":"text","data":{"text":" 今天天气怎么样？"}}],'
+    '"message_format":"array","post_type":"message","group_id":123456789}'.encode("utf-8"),
+    b'{"time":1730000002,"self_id":10000,"post_type":"notice","notice_type":"group_increase",'
+    b'"sub_type":"approve","group_id":123456789,"operator_id":0,"user_id":20002}',
+    '{"status":"ok","retcode":0,"data":['
+    + ",".join(
+        f'{{"group_id":123456789,"user_id":{20000 + i},"nickname":"成员{i}","card":"",'
+        f'"sex":"unknown","age":0,"join_time":1700000000,"last_sent_time":1730000000,'
+        f'"level":"1","role":"member","title":""}}'
+        for i in range(200)
+    )
+    + '],"message":"","wording":"","echo":"42"}',
+]
+
+
+def load_frames(path: str):
+    """读取录制的数据（每行一条 JSON，支持 gzip）"""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OneBot JSON 编解码基准测试")
+    parser.add_argument("--rounds", type=int, default=20000, help="测试轮数")
+    parser.add_argument("--file", help="录制的 NapCat 上报数据文件")
+    args = parser.parse_args()
+
+    frames = load_frames(args.file) if args.file else [
+        f if isinstance(f, bytes) else f.encode("utf-8") for f in SAMPLE_FRAMES
+    ]
+    total_bytes = sum(len(f) for f in frames)
+    rounds = max(1, args.rounds // len(frames))
+
+    print(f"样本: {len(frames)} 条, {total_bytes / 1024:.1f} KB, 轮数: {rounds}")
+    for name, codec in get_available_codecs().items():
+        decoded = [codec.loads(f) for f in frames]
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for frame in frames:
+                codec.loads(frame)
+        decode_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for obj in decoded:
+                codec.dumps(obj)
+        encode_time = time.perf_counter() - start
+
+        count = rounds * len(frames)
+        print(
+            f"{name:>8}: decode {count / decode_time:,.0f} frames/s "
+            f"({total_bytes * rounds / decode_time / 1024 / 1024:.1f} MB/s), "
+            f"encode {count / encode_time:,.0f} frames/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+CQ 码解析基准测试
+
+测量 CQ 码字符串解析和序列化的开销（按每 KB 消息计）
+
+运行方式:
+    python test/bench_napcat_cqcode.py [--size 4096] [--rounds 2000]
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from nekobot.core.platform.sources.napcat.napcat_cqcode import (  # noqa: E402
+    parse_cq_message,
+    to_cq_message,
+)
+
+SAMPLE_PARTS = [
+    "[CQ:reply,id=-2147480000]",
+    "[CQ:at,qq=10001] ",
+    "今天的天气怎么样？",
+    "[CQ:face,id=14]",
+    "[CQ:image,file=3a1b2c.image,url=https://gchat.qpic.cn/gchatpic_new/0/0-0-3A1B2C/0?term=2&amp;is_origin=0]",
+    "转义测试 &#91;不是 CQ 码&#93; &amp; 逗号,",
+    "[CQ:record,file=voice.amr]",
+    "hello world ",
+]
+
+
+def build_message(size: int) -> str:
+    """拼接出约 size 字节的 CQ 码消息"""
+    parts = []
+    length = 0
+    i = 0
+    while length < size:
+        part = SAMPLE_PARTS[i % len(SAMPLE_PARTS)]
+        parts.append(part)
+        length += len(part.encode("utf-8"))
+        i += 1
+    return "".join(parts)
+
+
+def bench(func, arg, rounds: int) -> float:
+    """运行若干轮，返回单次平均耗时（秒）"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(arg)
+    return (time.perf_counter() - start) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CQ 码解析基准测试")
+    parser.add_argument("--size", type=int, default=4096, help="消息大小（字节）")
+    parser.add_argument("--rounds", type=int, default=2000, help="测试轮数")
+    args = parser.parse_args()
+
+    message = build_message(args.size)
+    kb = len(message.encode("utf-8")) / 1024
+    segments = parse_cq_message(message)
+
+    parse_time = bench(parse_cq_message, message, args.rounds)
+    dump_time = bench(to_cq_message, segments, args.rounds)
+
+    print(f"消息大小: {kb:.2f} KB, 消息段数: {len(segments)}")
+    print(f"parse: {parse_time / kb * 1e6:.2f} us/KB")
+    print(f"dump:  {dump_time / kb * 1e6:.2f} us/KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+NapCat 事件分发基准测试
+
+对比两种分发方式的单事件开销:
+    - broadcast: 旧方式，每个处理器都收到所有消息，在处理器内部自行过滤群号和前缀
+    - indexed:   注册时声明过滤条件，由 EventHandler 的分发索引只调度匹配的处理器
+
+运行方式:
+    python test/bench_napcat_dispatch.py [--handlers 30] [--events 20000]
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from nekobot.core.platform.sources.napcat.napcat_event import (  # noqa: E402
+    EventHandler,
+    MessageEvent,
+    parse_event,
+)
+
+
+def build_events(count: int, groups: int):
+    """构造群消息事件"""
+    events = []
+    for i in range(count):
+        events.append(
+            parse_event(
+                {
+                    "post_type": "message",
+                    "message_type": "group",
+                    "self_id": 10000,
+                    "message_id": i,
+                    "group_id": 100 + i % groups,
+                    "user_id": 20000 + i % 97,
+                    "message": [{"type": "text", "data": {"text": f"/cmd{i % 5} hello"}}],
+                }
+            )
+        )
+    return events
+
+
+async def run_broadcast(events, handler_count: int) -> float:
+    """旧方式：逐个 await 所有处理器，由处理器自行过滤"""
+    handlers = []
+    for i in range(handler_count):
+        group_id = 100 + i
+
+        async def handler(event, group_id=group_id):
+            if event.group_id != group_id:
+                return
+            if not event.get_plain_text().startswith("/cmd"):
+                return
+
+        handlers.append(handler)
+
+    start = time.perf_counter()
+    for event in events:
+        if isinstance(event, MessageEvent):
+            for handler in handlers:
+                try:
+                    await handler(event)
+                except Exception as e:
+                    print(f"消息处理器错误: {e}")
+    return time.perf_counter() - start
+
+
+async def run_indexed(events, handler_count: int) -> float:
+    """新方式：注册时声明过滤条件"""
+    event_handler = EventHandler()
+    for i in range(handler_count):
+
+        async def handler(event):
+            return None
+
+        event_handler.on_message(handler, group_ids=[100 + i], prefix="/cmd")
+
+    start = time.perf_counter()
+    for event in events:
+        await event_handler.handle_event(event)
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="NapCat 事件分发基准测试")
+    parser.add_argument("--handlers", type=int, default=30, help="处理器数量")
+    parser.add_argument("--events", type=int, default=20000, help="事件数量")
+    parser.add_argument("--groups", type=int, default=60, help="群数量")
+    args = parser.parse_args()
+
+    events = build_events(args.events, args.groups)
+
+    for name, runner in (("broadcast", run_broadcast), ("indexed", run_indexed)):
+        elapsed = await runner(events, args.handlers)
+        print(
+            f"{name:>10}: {elapsed:.3f}s, "
+            f"{args.events / elapsed:,.0f} events/s, "
+            f"{elapsed / args.events * 1e6:.2f} us/event"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
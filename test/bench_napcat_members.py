@@ -0,0 +1,118 @@
+"""
+NapCat 群成员索引基准测试
+
+生成模拟的群成员数据，测量预取耗时、索引内存占用以及
+按 QQ 号 / 名称前缀查询的耗时
+
+运行方式:
+    python test/bench_napcat_members.py [--groups 300] [--members 2500]
+"""
+
+import sys
+import time
+import random
+import string
+import asyncio
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from nekobot.core.platform.sources.napcat.napcat_members import (  # noqa: E402
+    GroupMemberDirectory,
+)
+
+# 模拟常见昵称在多个群中重复出现
+NAME_POOL_SIZE = 50000
+
+
+def make_name_pool(size: int):
+    """生成昵称池"""
+    rng = random.Random(1)
+    alphabet = string.ascii_letters + "猫狗鱼鸟喵汪星月风花雪"
+    return ["".join(rng.choices(alphabet, k=rng.randint(2, 10))) for _ in range(size)]
+
+
+def make_members(group_id: int, count: int, names):
+    """生成一个群的成员列表"""
+    rng = random.Random(group_id)
+    members = []
+    for i in range(count):
+        members.append(
+            {
+                "group_id": group_id,
+                "user_id": rng.randint(10000, 4_000_000_000),
+                "nickname": rng.choice(names),
+                "card": rng.choice(names) if rng.random() < 0.4 else "",
+                "role": "owner" if i == 0 else ("admin" if i < 5 else "member"),
+            }
+        )
+    return members
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="NapCat 群成员索引基准测试")
+    parser.add_argument("--groups", type=int, default=300, help="群数量")
+    parser.add_argument("--members", type=int, default=2500, help="每个群的成员数")
+    parser.add_argument("--concurrency", type=int, default=8, help="预取并发数")
+    parser.add_argument("--latency", type=float, default=0.02, help="模拟接口延迟（秒）")
+    args = parser.parse_args()
+
+    names = make_name_pool(NAME_POOL_SIZE)
+    data = {
+        group_id: make_members(group_id, args.members, names)
+        for group_id in range(1, args.groups + 1)
+    }
+
+    async def fetch_groups():
+        return [{"group_id": group_id} for group_id in data]
+
+    async def fetch_members(group_id):
+        await asyncio.sleep(args.latency)
+        return data[group_id]
+
+    directory = GroupMemberDirectory(
+        fetch_groups, fetch_members, concurrency=args.concurrency
+    )
+    await directory.start()
+
+    started = time.perf_counter()
+    directory.get_stats()
+    summary_ms = (time.perf_counter() - started) * 1000
+    stats = directory.get_stats(per_group=True)
+    print(
+        f"预取: {stats['prefetch']['done']} 个群, {stats['members']} 名成员, "
+        f"耗时 {stats['prefetch']['seconds']} 秒 (并发 {args.concurrency})"
+    )
+    groups = list(stats["per_group"].values())
+    owned = sum(g["bytes"] for g in groups) / len(groups)
+    strings = sum(g["string_bytes"] for g in groups) / len(groups)
+    print(
+        f"内存: 每群索引 {owned / 1024:.1f} KB + 字符串 {strings / 1024:.1f} KB, "
+        f"合计 {stats['unique_bytes'] / 1024 / 1024:.1f} MB（共享字符串只计一次）"
+    )
+    print(f"汇总统计 get_stats(): {summary_ms:.3f} ms")
+
+    rng = random.Random(2)
+    queries = []
+    for _ in range(100000):
+        group_id = rng.randint(1, args.groups)
+        member = rng.choice(data[group_id])
+        queries.append((group_id, member["user_id"], member["nickname"][:2]))
+
+    start = time.perf_counter()
+    for group_id, user_id, _ in queries:
+        directory.get_member(group_id, user_id)
+    by_id = (time.perf_counter() - start) / len(queries) * 1e6
+
+    start = time.perf_counter()
+    for group_id, _, prefix in queries:
+        directory.search(group_id, prefix, limit=5)
+    by_prefix = (time.perf_counter() - start) / len(queries) * 1e6
+
+    print(f"按 QQ 号查询: {by_id:.2f} us/次")
+    print(f"按名称前缀查询 (limit=5): {by_prefix:.2f} us/次")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,154 @@
+"""
+NapCat API 传输方式基准测试
+
+在本机启动模拟的 NapCat（HTTP API + 反向 WebSocket 客户端），
+对比 NapCatAdapter 使用 HTTP 与 WebSocket 两种方式发送消息的延迟
+
+运行方式:
+    python test/bench_napcat_transport.py [--calls 2000] [--concurrency 16]
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from aiohttp import web, ClientSession, WSMsgType  # noqa: E402
+
+from nekobot.core.platform.sources.napcat.napcat_adapter import NapCatAdapter  # noqa: E402
+from nekobot.core.platform.sources.napcat.napcat_server import (  # noqa: E402
+    NapCatWebSocketServer,
+)
+from nekobot.core.platform.sources.napcat.napcat_codec import loads, dumps  # noqa: E402
+
+SELF_ID = 10000
+HTTP_PORT = 36300
+WS_PORT = 36299
+
+
+def ok_response(echo=None):
+    """模拟 NapCat 的成功响应"""
+    response = {"status": "ok", "retcode": 0, "data": {"message_id": 1}}
+    if echo is not None:
+        response["echo"] = echo
+    return response
+
+
+async def start_fake_http_api() -> web.AppRunner:
+    """启动模拟的 NapCat HTTP API"""
+
+    async def handle(request):
+        await request.read()
+        return web.Response(body=dumps(ok_response()), content_type="application/json")
+
+    app = web.Application()
+    app.router.add_post("/{action}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", HTTP_PORT).start()
+    return runner
+
+
+async def connect_fake_ws_client(session: ClientSession):
+    """模拟 NapCat 连接反向 WebSocket 服务器（等待服务器启动）"""
+    for _ in range(50):
+        try:
+            return await session.ws_connect(
+                f"ws://127.0.0.1:{WS_PORT}/ws", headers={"X-Self-ID": str(SELF_ID)}
+            )
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("模拟 NapCat 客户端连接失败")
+
+
+async def serve_fake_ws_client(ws):
+    """模拟 NapCat 反向 WebSocket 客户端：应答所有 API 调用"""
+    async for msg in ws:
+        if msg.type not in (WSMsgType.TEXT, WSMsgType.BINARY):
+            break
+        request = loads(msg.data)
+        await ws.send_bytes(dumps(ok_response(request.get("echo"))))
+
+
+async def measure(adapter: NapCatAdapter, calls: int, concurrency: int):
+    """测量发送延迟，返回 (每次调用的延迟列表, 总耗时)"""
+    message = adapter.build_text_message("ping")
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_call():
+        async with semaphore:
+            start = time.perf_counter()
+            await adapter.send_group_msg(123456789, message)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_call() for _ in range(calls)))
+    return latencies, time.perf_counter() - start
+
+
+def report(name: str, latencies, elapsed: float):
+    """输出延迟统计"""
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(
+        f"{name:>5}: {len(latencies) / elapsed:,.0f} calls/s, "
+        f"mean {statistics.mean(latencies) * 1000:.3f} ms, "
+        f"p50 {p50:.3f} ms, p99 {p99:.3f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="NapCat API 传输方式基准测试")
+    parser.add_argument("--calls", type=int, default=2000, help="调用次数")
+    parser.add_argument("--concurrency", type=int, default=16, help="并发调用数")
+    args = parser.parse_args()
+
+    http_runner = await start_fake_http_api()
+    server = NapCatWebSocketServer(host="127.0.0.1", port=WS_PORT)
+    await server.start_background()
+
+    # 服务器登记模拟 NapCat 的连接后才能通过 WebSocket 调用
+    attached = asyncio.Event()
+    attach = server.pipeline.attach
+
+    def attach_and_notify(connection):
+        attach(connection)
+        attached.set()
+
+    server.pipeline.attach = attach_and_notify
+
+    async with ClientSession() as session:
+        ws = await connect_fake_ws_client(session)
+        client_task = asyncio.create_task(serve_fake_ws_client(ws))
+        await asyncio.wait_for(attached.wait(), 5.0)
+
+        # 测量传输层本身，不经过出站限速队列
+        http_adapter = NapCatAdapter(
+            {"host": "127.0.0.1", "port": HTTP_PORT, "outbound": {"enabled": False}}
+        )
+        ws_adapter = NapCatAdapter(
+            {"api_transport": "ws", "self_id": SELF_ID, "outbound": {"enabled": False}}
+        )
+
+        for name, adapter in (("http", http_adapter), ("ws", ws_adapter)):
+            await adapter.transport.start()
+            await measure(adapter, min(100, args.calls), args.concurrency)  # 预热
+            latencies, elapsed = await measure(adapter, args.calls, args.concurrency)
+            report(name, latencies, elapsed)
+            await adapter.disconnect()
+
+        await ws.close()
+        await client_task
+
+    await server.stop()
+    await http_runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())